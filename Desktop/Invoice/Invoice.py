@@ -1,35 +1,65 @@
+import time
+STARTUP_STARTED = time.perf_counter() # 시작 시간 측정 기준
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog, colorchooser # colorchooser 임포트
-from reportlab.pdfgen import canvas
-from reportlab.pdfbase.ttfonts import TTFont
-from reportlab.pdfbase import pdfmetrics
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.lib import colors
-from datetime import datetime, timedelta
+from contextlib import contextmanager
+from datetime import datetime
+import importlib.util
 import os
 import io
 import json
-from tkcalendar import DateEntry # tkcalendar 임포트
-
-# PDF 미리보기를 위한 라이브러리
-try:
-    import fitz  # PyMuPDF
-    from PIL import Image, ImageTk
-    PREVIEW_ENABLED = True
-except ImportError:
-    PREVIEW_ENABLED = False
-
-# --- 고정 정보 ---
-SUPPLIER_INFO = {
-    "ko": {
-        "name": "주식회사 애드캐리", "reg_num": "582-88-01950",
-        "address": "서울특별시 금천구 가산디지털1로 204, 904호", "phone": "02-6925-0147", "email": "adc@adcarry.co.kr"
-    },
-    "en": {
-        "name": "ADCARRY Corp.", "reg_num": "582-88-01950",
-        "address": ["904, 204, Gasan digital 1-ro,", "Geumcheon-gu, Seoul, Republic of Korea"], "phone": "+82-2-6925-0147", "email": "adc@adcarry.co.kr"
-    }
-}
+import sys
+import threading
+
+from i18n import I18N
+from invoice_data import DEFAULT_COLORS, CUSTOMER_FIELDS, ISSUER_FIELDS, make_file_name
+from document_model import InvoiceDocument
+from item_grid import VirtualItemGrid
+from persistence import WriteBehindQueue
+from preset_store import PresetStore, PRESET_DB
+from doc_numbers import DocNumberAllocator, DOC_NUMBER_DB, DEFAULT_FORMAT, parse_doc_date
+from search_index import PrefixIndex, MAX_RESULTS
+from preview_worker import PreviewWorker, PreviewCancelled
+from preview_cache import PageRasterCache, page_content_key, fit_zoom, fit_size
+from timing import SpanTimer
+
+# PDF 미리보기를 위한 라이브러리 (PyMuPDF, Pillow)
+# 가져오는 데 시간이 걸리므로 설치 여부만 확인하고, 실제로는 처음 미리보기를 만들 때 가져옵니다.
+PREVIEW_ENABLED = importlib.util.find_spec("fitz") is not None and importlib.util.find_spec("PIL") is not None
+fitz = Image = ImageTk = None
+
+def load_preview_libraries():
+    global fitz, Image, ImageTk
+    if fitz is None:
+        from PIL import Image as pil_image, ImageTk as pil_image_tk
+        import fitz as pymupdf # PyMuPDF
+        Image, ImageTk = pil_image, pil_image_tk
+        fitz = pymupdf
+
+# --- 시작 시간 측정 (python Invoice.py --startup-timing 또는 INVOICE_STARTUP_TIMING=1) ---
+STARTUP_TIMING = "--startup-timing" in sys.argv or os.environ.get("INVOICE_STARTUP_TIMING") == "1"
+startup_marks = []
+
+def mark_startup(label):
+    if STARTUP_TIMING:
+        startup_marks.append((label, time.perf_counter()))
+
+def print_startup_report():
+    if not STARTUP_TIMING or not startup_marks: return
+    print("--- startup timing ---")
+    previous = STARTUP_STARTED
+    for label, timestamp in startup_marks:
+        print(f"{label:<16} {(timestamp - STARTUP_STARTED) * 1000:8.1f} ms  (+{(timestamp - previous) * 1000:.1f} ms)")
+        previous = timestamp
+    startup_marks.clear()
+
+# --- 미리보기 단계별 시간 (python Invoice.py --preview-timing 또는 INVOICE_PREVIEW_TIMING=1) ---
+# 측정은 항상 하고, 이 옵션을 켜면 시작할 때부터 미리보기에 시간 표를 겹쳐 보여주고 종료할 때 로그에 남깁니다.
+# 실행 중에는 F12 로 시간 표를 켜고 끄며, Ctrl+F12 로 지금까지의 통계를 로그에 씁니다.
+PREVIEW_TIMING = "--preview-timing" in sys.argv or os.environ.get("INVOICE_PREVIEW_TIMING") == "1"
+PREVIEW_TIMING_LOG = "preview_timing.log"
+
+mark_startup("imports")
 
 class InvoiceGenerator:
     def __init__(self, root):
@@ -42,104 +72,72 @@ class InvoiceGenerator:
         self.language = tk.StringVar(value="ko")
         self.doc_type = tk.StringVar(value="invoice")
         self.doc_number = tk.StringVar(value=datetime.now().strftime('%Y%m%d-%H%M%S'))
+        self.provisional_doc_number = None # 입력란에 표시만 하고 아직 발급하지 않은 번호
         self.doc_date = tk.StringVar(value=datetime.now().strftime('%Y-%m-%d')) # 작성일 변수
         self.use_default_save_path = tk.BooleanVar(value=False) # 기본 저장 경로 사용 여부
         self.filename_var = tk.StringVar(value="Invoice") # 파일 이름 입력 변수
         self.add_date_prefix = tk.BooleanVar(value=True) # 날짜 접두사 추가 여부
         self.after_id = None # For debouncing preview updates
-        self.preview_images = [] # 미리보기 이미지 리스트 초기화
+        self.batch_depth = 0 # batch_update() 중첩 깊이
+        self.batch_preview_pending = False # 일괄 변경 중에 미리보기 요청이 있었는지
+        self.preview_images = {} # 페이지 번호 -> 미리보기 이미지 (보고 있는 페이지 주변만, 나머지는 page_cache 에)
+        self.preview_page_count = 0
+        self.current_page = 0
+        self.pdf_buffer = None # 마지막으로 렌더링된 PDF
+        self.preview_worker = PreviewWorker() # 미리보기는 백그라운드에서 렌더링
+        self.preview_poll_id = None
+        self.first_preview_shown = False # 시작 시간 보고는 첫 미리보기에서 한 번만
+        self.page_cache = PageRasterCache() # 내용이 같은 페이지는 다시 래스터화하지 않음
+        self.preview_raster_size = None # 현재 미리보기 이미지를 래스터화한 캔버스 크기
+        self.preview_document_pending = False # 문서 렌더링(또는 새 크기로 래스터화) 결과를 기다리는 중
+        self.preview_current = False # pdf_buffer 가 지금 입력 내용으로 렌더링한 결과인지 (저장할 때 그대로 써도 되는지)
+        self.preview_document = None # (PDF 버퍼, fitz 문서) - 페이지를 필요할 때 래스터화하려고 열어 둠 (작업자 스레드 전용)
+        self.resize_after_id = None
+        self.timings = SpanTimer() # 미리보기 단계별 소요 시간 (작업자/메인 스레드 공용)
+        self.render_cache = None # 저장할 때 렌더링한 PDF 의 디스크 캐시 (처음 쓸 때 메인 스레드에서 엶)
+        self.preview_submitted_at = 0.0
+        self.show_timing_overlay = PREVIEW_TIMING
+        self.persistence = WriteBehindQueue() # 설정/프리셋 저장은 백그라운드에서 모아서 씀
+        self.settings = {} # settings.json 내용
 
         # --- 색상 변수 초기화 ---
-        self.primary_color = tk.StringVar(value="#4A90E2") # 기본 파란색
-        self.secondary_color = tk.StringVar(value="#F0F0F0") # 밝은 회색
-        self.text_color = tk.StringVar(value="#333333") # 어두운 회색
-        self.light_text_color = tk.StringVar(value="#FFFFFF") # 흰색
-        self.border_color = tk.StringVar(value="#CCCCCC") # 중간 회색
-        self.invoice_title_color = tk.StringVar(value="#FFFFFF") # 청구서 제목 글자 색상 (기본 흰색)
+        self.primary_color = tk.StringVar(value=DEFAULT_COLORS["primary_color"]) # 기본 파란색
+        self.secondary_color = tk.StringVar(value=DEFAULT_COLORS["secondary_color"]) # 밝은 회색
+        self.text_color = tk.StringVar(value=DEFAULT_COLORS["text_color"]) # 어두운 회색
+        self.light_text_color = tk.StringVar(value=DEFAULT_COLORS["light_text_color"]) # 흰색
+        self.border_color = tk.StringVar(value=DEFAULT_COLORS["border_color"]) # 중간 회색
+        self.invoice_title_color = tk.StringVar(value=DEFAULT_COLORS["invoice_title_color"]) # 청구서 제목 글자 색상 (기본 흰색)
 
         # --- 다국어 텍스트 ---
-        self.i18n = {
-            "ko": {
-                "doc_type_label": "문서 종류", "invoice": "청구서", "quote": "견적서",
-                "supplier_info": "공급자 정보", "customer_info": "고객 정보", "item_info": "품목 정보",
-                "company_name": "상호:", "reg_num": "사업자등록번호:", "address": "주소:", "phone": "연락처:", "email": "이메일:",
-                "add_item": "품목 추가", "item": "품목", "quantity": "수량", "unit_price": "단가", "amount": "금액",
-                "save_path": "저장 경로", "browse": "찾아보기...", "preview": "미리보기 생성",
-                "save_pdf": "PDF로 저장", "page": "페이지", "of": "의", "preview_area": "미리보기",
-                "from": "From.", "to": "To.", "doc_num": "문서번호:", "date": "작성일자:",
-                "supply_amount": "공급가액", "vat": "세액 (10%)", "total_amount": "합계 금액",
-                "currency_symbol": "원", "dear": "귀하",
-                "issuer_info": "발행자 정보", "issuer_name": "이름:", "issuer_title": "직책:", "issuer_email": "이메일:", "issuer_phone": "연락처:",
-                "item_preset": "품목 프리셋", "preset_name": "프리셋 이름:", "save_preset": "프리셋 저장", "load_preset": "프리셋 불러오기", "delete_preset": "프리셋 삭제",
-                "issuer_preset": "발행자 프리셋", "save_issuer_preset": "발행자 프리셋 저장", "load_issuer_preset": "발행자 프리셋 불러오기", "delete_issuer_preset": "발행자 프리셋 삭제",
-                "bank_info": "입금안내", "bank_name": "은행명:", "account_num": "계좌번호:", "account_holder": "예금주:",
-                "error_fill_all": "모든 필수 필드를 채워주세요.", "error_numeric": "수량과 단가는 숫자로 입력해야 합니다.",
-                "error_path": "저장 경로를 지정해주세요.", "error_preview": "먼저 미리보기를 생성해주세요.",
-                "success_save": "가 다음 경로에 저장되었습니다:", "error_save": "PDF 파일을 저장하는 중 오류가 발생했습니다:\n",
-                "preset_saved": "프리셋이 저장되었습니다.", "preset_loaded": "프리셋이 불러와졌습니다.", "preset_deleted": "프리셋이 삭제되었습니다.",
-                "preset_name_empty": "프리셋 이름을 입력해주세요.", "preset_not_found": "선택된 프리셋을 찾을 수 없습니다.",
-                "confirm_delete_preset": "선택된 프리셋을 삭제하시겠습니까?",
-                "due_date": "납부기한:",
-                "validity_period": "유효기한:",
-                "color_settings_label": "색상 설정",
-                "invoice_title_color_label": "제목 글자 색상",
-                "single_item_preset": "단일 품목 프리셋",
-                "save_single_item_preset": "단일 품목 프리셋 저장",
-                "add_single_item": "단일 품목 추가",
-                "delete_single_item_preset": "단일 품목 프리셋 삭제",
-                "customer_preset": "고객 프리셋",
-                "save_customer_preset": "고객 프리셋 저장",
-                "load_customer_preset": "고객 프리셋 불러오기",
-                "delete_customer_preset": "고객 프리셋 삭제"
-            },
-            "en": {
-                "doc_type_label": "Document Type", "invoice": "INVOICE", "quote": "QUOTATION",
-                "supplier_info": "Supplier Information", "customer_info": "Customer Information", "item_info": "Item Information",
-                "company_name": "Company Name:", "reg_num": "Business Reg. No.:", "address": "Address:", "phone": "Phone:", "email": "Email:",
-                "add_item": "Add Item", "item": "Item", "quantity": "Quantity", "unit_price": "Unit Price", "amount": "Amount",
-                "save_path": "Save Path", "browse": "Browse...", "preview": "Generate Preview",
-                "save_pdf": "Save as PDF", "page": "Page", "of": "of", "preview_area": "Preview",
-                "from": "From.", "to": "To.", "doc_num": "Doc No.:", "date": "Date:",
-                "supply_amount": "Subtotal", "vat": "VAT (10%)", "total_amount": "Total Amount",
-                "currency_symbol": "$", "dear": "",
-                "issuer_info": "Issuer Information", "issuer_name": "Name:", "issuer_title": "Title:", "issuer_email": "Email:", "issuer_phone": "Phone:",
-                "item_preset": "Item Presets", "preset_name": "Preset Name:", "save_preset": "Save Preset", "load_preset": "Load Preset", "delete_preset": "Delete Preset",
-                "issuer_preset": "Issuer Presets", "save_issuer_preset": "Save Issuer Preset", "load_issuer_preset": "Load Issuer Preset", "delete_issuer_preset": "Delete Issuer Preset",
-                "bank_info": "Payment Information", "bank_name": "Bank Name:", "account_num": "Account No.:", "account_holder": "Account Holder:",
-                "error_fill_all": "Please fill in all required fields.", "error_numeric": "Quantity and Unit Price must be numbers.",
-                "error_path": "Please specify a save path.", "error_preview": "Please generate a preview first.",
-                "success_save": "has been saved to:", "error_save": "An error occurred while saving the PDF:\n",
-                "preset_saved": "Preset saved.", "preset_loaded": "Preset loaded.", "preset_deleted": "Preset deleted.",
-                "preset_name_empty": "Please enter a preset name.", "preset_not_found": "Selected preset not found.",
-                "confirm_delete_preset": "Are you sure you want to delete the selected preset?",
-                "due_date": "Due Date:",
-                "validity_period": "Valid Until:",
-                "color_settings_label": "Color Settings",
-                "invoice_title_color_label": "Title Color",
-                "single_item_preset": "Single Item Preset",
-                "save_single_item_preset": "Save Single Item Preset",
-                "add_single_item": "Add Single Item",
-                "delete_single_item_preset": "Delete Single Item Preset",
-                "customer_preset": "Customer Preset",
-                "save_customer_preset": "Save Customer Preset",
-                "load_customer_preset": "Load Customer Preset",
-                "delete_customer_preset": "Delete Customer Preset"
-            }
-        }
+        self.i18n = I18N
+
+        # --- 문서 모델 (위젯 값은 모델에 반영되고, 미리보기/저장은 모델에서 데이터를 만듦) ---
+        self.document = InvoiceDocument()
+        self.document.subscribe(lambda section, key: self._schedule_preview_update())
+        self.document_vars = [] # 입력란에 연결한 StringVar (참조 유지용)
 
-        self._register_fonts()
+        self.default_font = self.default_font_bold = None # 글꼴은 처음 PDF를 만들 때 등록
+        self.render_engine_lock = threading.Lock() # 메인 스레드와 미리보기 작업자가 동시에 처음 불러올 수 있음
+        self.fonts_missing = False
+        self.font_warning_shown = False
         self._create_widgets()
+        mark_startup("widgets")
+        self._show_next_doc_number() # 설정(번호 형식)을 읽은 뒤 표시 (발급은 저장할 때)
         self.language.trace_add("write", self.update_language) # Moved here
         self.doc_type.trace_add("write", self.update_language) # Moved here
-        self.customer_presets = {} # 고객 프리셋 초기화
-        self.single_item_presets = {} # 단일 품목 프리셋 초기화
-        self.color_presets = {} # 색상 프리셋 초기화
+        self._bind_var_to_document(self.language, "fields", "lang")
+        self._bind_var_to_document(self.doc_type, "fields", "doc_type")
+        for key in DEFAULT_COLORS:
+            self._bind_var_to_document(getattr(self, key), "colors", key)
+        self.preset_store = PresetStore(PRESET_DB, writer=self.persistence) # 프리셋 저장소 (처음 실행 시 기존 JSON 프리셋을 가져옴)
         self.load_presets() # 모든 위젯 생성 후 프리셋 로드
         self.load_issuer_presets() # 발행자 프리셋 로드
         self.load_customer_presets() # 
         self.load_color_presets() # 색상 프리셋 로드
         self.load_window_geometry()
-        self.update_language() # 초기 UI 텍스트 설정 및 미리보기 생성
+        mark_startup("presets")
+        self.update_language() # 초기 UI 텍스트 설정
+        self._schedule_preview_update(delay=0) # 초기 미리보기는 한 번만 생성
 
     def update_language(self, *args):
         lang = self.language.get()
@@ -183,7 +181,7 @@ class InvoiceGenerator:
         # 미리보기 및 저장 버튼 업데이트
         self.preview_button.config(text=t["preview"])
         self.save_pdf_button.config(text=t["save_pdf"])
-        self.page_label.config(text=f"{t['page']} {self.current_page + 1 if hasattr(self, 'current_page') else 1} {t['of']} {len(self.preview_images) if hasattr(self, 'preview_images') else 1}")
+        self.page_label.config(text=f"{t['page']} {self.current_page + 1 if hasattr(self, 'current_page') else 1} {t['of']} {self.preview_page_count if hasattr(self, 'preview_page_count') else 1}")
 
         # 미리보기 영역 프레임 업데이트
         self.preview_label_frame.config(text=t["preview_area"])
@@ -213,13 +211,46 @@ class InvoiceGenerator:
         self.bank_frame.config(text=t["bank_info"])
 
     def on_closing(self):
+        if PREVIEW_TIMING:
+            self.dump_timings()
         self.save_window_geometry()
+        self.preview_worker.close()
+        self.persistence.close(timeout=10) # 대기 중인 저장을 모두 마친 뒤 종료
+        self.preset_store.close()
+        if self.render_cache:
+            self.render_cache.close()
         self.root.destroy()
 
+    def _allocate_doc_number(self, reserve=True):
+        # 문서 번호 데이터베이스에서 새 번호를 받습니다. 형식은 settings.json 의 "doc_number_format".
+        # reserve=False 이면 다음에 발급될 번호를 알려 주기만 하고 순번은 쓰지 않습니다.
+        try:
+            allocator = DocNumberAllocator(DOC_NUMBER_DB, self.settings.get("doc_number_format") or DEFAULT_FORMAT)
+            try:
+                date = parse_doc_date(self.doc_date.get()) # 작성일의 순번 범위에서 발급
+                return allocator.allocate(date) if reserve else allocator.peek(date)
+            finally:
+                allocator.close()
+        except Exception as e:
+            print(f"DEBUG: Error allocating document number: {e}")
+            return datetime.now().strftime('%Y%m%d-%H%M%S') # 발급할 수 없으면 기존처럼 현재 시각 사용
+
+    def _show_next_doc_number(self):
+        # 새 문서에는 다음 번호를 미리 보여 주고, 실제 발급은 저장할 때 합니다 (프로그램을 열기만 해서는 번호를 쓰지 않음).
+        self.provisional_doc_number = self._allocate_doc_number(reserve=False)
+        self.doc_number.set(self.provisional_doc_number)
+
+    def _issue_doc_number(self):
+        # 저장 직전에 호출합니다. 입력란이 미리 보여 준 번호 그대로이면 번호를 발급하여 바꿉니다.
+        # 사용자가 직접 입력한 번호는 그대로 둡니다. 번호가 바뀌면 미리보기가 예약되어 저장 전에 다시 렌더링됩니다.
+        if self.provisional_doc_number is None or self.doc_number.get() != self.provisional_doc_number:
+            return
+        self.provisional_doc_number = None
+        self.doc_number.set(self._allocate_doc_number())
+
     def save_window_geometry(self):
         geom = self.root.geometry()
-        with open("window_geometry.json", "w") as f:
-            json.dump({"geometry": geom}, f)
+        self.persistence.write_json("window_geometry.json", {"geometry": geom})
 
     def load_window_geometry(self):
         if os.path.exists("window_geometry.json"):
@@ -235,31 +266,58 @@ class InvoiceGenerator:
         if color_code[1]: # 사용자가 색상을 선택하고 '확인'을 눌렀을 경우
             color_var.set(color_code[1].upper()) # 헥스 코드 (대문자로)
 
-    def _schedule_preview_update(self):
+    def _schedule_preview_update(self, delay=500):
+        if self.batch_depth:
+            self.batch_preview_pending = True # 일괄 변경이 끝날 때 한 번만 예약
+            return
         if self.after_id:
             self.root.after_cancel(self.after_id)
-        self.after_id = self.root.after(500, self.generate_preview) # 500ms (0.5초) 지연 후 미리보기 생성
+        self.after_id = self.root.after(delay, self.generate_preview) # 500ms (0.5초) 지연 후 미리보기 생성
 
-    def _register_fonts(self):
-        import sys
-        
-        def resource_path(relative_path):
-                try:
-                    base_path = sys._MEIPASS
-                except Exception:
-                    base_path = os.path.abspath(".")
-                return os.path.join(base_path, relative_path)
-        font_path = resource_path(os.path.join("fonts", "malgun.ttf"))
-        if os.path.exists(font_path):
-            pdfmetrics.registerFont(TTFont('MalgunGothic', font_path))
-            pdfmetrics.registerFont(TTFont('MalgunGothic-Bold', font_path))
-            pdfmetrics.registerFontFamily('MalgunGothic', normal='MalgunGothic', bold='MalgunGothic-Bold')
-            self.default_font = 'MalgunGothic'
-            self.default_font_bold = 'MalgunGothic-Bold'
-        else:
+    @contextmanager
+    def batch_update(self):
+        # 프리셋 적용처럼 여러 값을 한꺼번에 바꾸는 동안에는 변수 trace/이벤트가 요청하는
+        # 미리보기 예약을 모아 두었다가, 가장 바깥 블록이 끝날 때 한 번만 예약합니다.
+        self.batch_depth += 1
+        try:
+            yield
+        finally:
+            self.batch_depth -= 1
+            if self.batch_depth == 0 and self.batch_preview_pending:
+                self.batch_preview_pending = False
+                self._schedule_preview_update()
+
+    def _apply_and_preview(self, apply_func, *args):
+        with self.batch_update():
+            apply_func(*args)
+            self._schedule_preview_update()
+
+    def _load_render_engine(self):
+        # reportlab 과 글꼴은 시작 시간을 줄이기 위해 처음 PDF를 만들 때 불러옵니다.
+        # 미리보기 작업자 스레드에서도 호출되므로 Tk 위젯에 접근하지 않습니다.
+        import render_engine
+        with self.render_engine_lock:
+            if self.default_font is None:
+                fonts = render_engine.register_fonts()
+                self.fonts_missing = not render_engine.fonts_available()
+                self.default_font, self.default_font_bold = fonts
+        return render_engine
+
+    def _open_render_cache(self):
+        # 메인 스레드에서만 호출합니다. 미리보기는 캐시를 쓰지 않고, 저장/재발행할 때만 사용합니다.
+        if self.render_cache is None:
+            try:
+                from render_cache import RenderCache
+                self.render_cache = RenderCache()
+            except Exception as e:
+                print(f"DEBUG: Render cache disabled: {e}")
+                self.render_cache = False
+        return self.render_cache
+
+    def _show_font_warning(self):
+        if self.fonts_missing and not self.font_warning_shown:
+            self.font_warning_shown = True
             messagebox.showwarning("Font Warning", "Malgun Gothic font not found. PDF text may not display correctly.")
-            self.default_font = 'Helvetica' # Fallback
-            self.default_font_bold = 'Helvetica-Bold'
 
     def _create_entry_label(self, parent_frame, row, entry_widget, width=None):
         # 이 메서드는 레이블과 엔트리 위젯을 생성하고 그리드에 배치합니다.
@@ -270,6 +328,17 @@ class InvoiceGenerator:
             entry_widget.config(width=width)
         return label # 레이블 위젯을 반환하여 나중에 텍스트를 업데이트할 수 있도록 합니다.
 
+    def _bind_var_to_document(self, var, section, key):
+        # 변수 값이 바뀔 때마다 문서 모델의 해당 항목만 갱신합니다.
+        self.document.set(section, key, var.get())
+        var.trace_add("write", lambda *args: self.document.set(section, key, var.get()))
+
+    def _bind_entry_to_document(self, entry, section, key):
+        var = tk.StringVar(value=entry.get())
+        entry.config(textvariable=var)
+        self.document_vars.append(var)
+        self._bind_var_to_document(var, section, key)
+
     def _create_color_picker_row(self, parent_frame, label_text, color_var, row):
         label = ttk.Label(parent_frame, text=label_text)
         label.grid(row=row, column=0, sticky=tk.W, pady=2)
@@ -279,7 +348,6 @@ class InvoiceGenerator:
 
         color_button = ttk.Button(parent_frame, text="선택", command=lambda: self._pick_color(color_var))
         color_button.grid(row=row, column=2, sticky=tk.W, pady=2)
-        color_var.trace_add("write", lambda *args: self._schedule_preview_update())
 
     def _create_widgets(self):
         main_frame = ttk.Frame(self.root, padding="10")
@@ -325,14 +393,15 @@ class InvoiceGenerator:
         ttk.Label(doc_info_frame, text="번호:").grid(row=0, column=0, sticky=tk.W, pady=2)
         self.doc_number_entry = ttk.Entry(doc_info_frame, textvariable=self.doc_number, width=30)
         self.doc_number_entry.grid(row=0, column=1, sticky=tk.W, pady=2)
-        self.doc_number_entry.bind("<KeyRelease>", lambda e: self._schedule_preview_update())
+        self._bind_var_to_document(self.doc_number, "fields", "doc_number")
 
         ttk.Label(doc_info_frame, text="작성일:").grid(row=1, column=0, sticky=tk.W, pady=2)
+        from tkcalendar import DateEntry # tkcalendar 임포트
         self.doc_date_entry = DateEntry(doc_info_frame, selectmode='day', textvariable=self.doc_date, 
                                         date_pattern='yyyy-mm-dd', width=27, background='darkblue',
                                         foreground='white', borderwidth=2)
         self.doc_date_entry.grid(row=1, column=1, sticky=tk.W, pady=2)
-        self.doc_date_entry.bind("<<DateSelected>>", lambda e: self._schedule_preview_update())
+        self._bind_var_to_document(self.doc_date, "fields", "doc_date")
 
         # --- 발행자 정보 및 프리셋 ---
         self.issuer_preset_combined_frame = ttk.LabelFrame(doc_issuer_container_frame, padding="10")
@@ -360,11 +429,8 @@ class InvoiceGenerator:
             "phone": self._create_entry_label(self.customer_frame, 3, self.customer_phone, width=30),
             "email": self._create_entry_label(self.customer_frame, 4, self.customer_email, width=30)
         }
-        self.customer_name.bind("<KeyRelease>", lambda e: self._schedule_preview_update())
-        self.customer_reg_num.bind("<KeyRelease>", lambda e: self._schedule_preview_update())
-        self.customer_address.bind("<KeyRelease>", lambda e: self._schedule_preview_update())
-        self.customer_phone.bind("<KeyRelease>", lambda e: self._schedule_preview_update())
-        self.customer_email.bind("<KeyRelease>", lambda e: self._schedule_preview_update())
+        for key in CUSTOMER_FIELDS: # 입력란을 문서 모델에 연결
+            self._bind_entry_to_document(getattr(self, f"customer_{key}"), "customer", key)
 
         # 고객 프리셋
         self.customer_preset_frame = ttk.LabelFrame(customer_container_frame, padding="5")
@@ -372,14 +438,16 @@ class InvoiceGenerator:
         ttk.Label(self.customer_preset_frame, text="프리셋 이름:").grid(row=0, column=0, sticky=tk.W, pady=2)
         self.customer_preset_name_entry = ttk.Entry(self.customer_preset_frame, width=20)
         self.customer_preset_name_entry.grid(row=0, column=1, sticky=tk.W, pady=2)
-        self.customer_preset_combobox = ttk.Combobox(self.customer_preset_frame, state="readonly", width=25)
+        self.customer_preset_combobox = ttk.Combobox(self.customer_preset_frame, width=25) # 입력하면 고객 이름/사업자번호/이메일로 검색
         self.customer_preset_combobox.grid(row=1, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=5)
-        self.customer_preset_combobox.bind("<<ComboboxSelected>>", lambda e: (self.on_customer_preset_selected(e), self._schedule_preview_update()))
+        self.customer_preset_combobox.bind("<<ComboboxSelected>>", lambda e: self._apply_and_preview(self.on_customer_preset_selected, e))
+        self.customer_preset_combobox.bind("<KeyRelease>", self.on_customer_search)
+        self.customer_preset_combobox.bind("<Return>", self.on_customer_search_enter)
         customer_preset_button_frame = ttk.Frame(self.customer_preset_frame)
         customer_preset_button_frame.grid(row=2, column=0, columnspan=2, pady=5)
         self.save_customer_preset_button = ttk.Button(customer_preset_button_frame, text="고객 프리셋 저장", command=self.add_customer_preset)
         self.save_customer_preset_button.pack(side=tk.LEFT, padx=2)
-        self.load_customer_preset_button = ttk.Button(customer_preset_button_frame, text="고객 프리셋 불러오기", command=lambda: (self.apply_customer_preset(), self._schedule_preview_update()))
+        self.load_customer_preset_button = ttk.Button(customer_preset_button_frame, text="고객 프리셋 불러오기", command=lambda: self._apply_and_preview(self.apply_customer_preset))
         self.load_customer_preset_button.pack(side=tk.LEFT, padx=2)
         self.delete_customer_preset_button = ttk.Button(customer_preset_button_frame, text="고객 프리셋 삭제", command=self.delete_customer_preset)
         self.delete_customer_preset_button.pack(side=tk.LEFT, padx=2)
@@ -397,10 +465,8 @@ class InvoiceGenerator:
             "email": self._create_entry_label(self.issuer_frame, 2, self.issuer_email, width=30),
             "phone": self._create_entry_label(self.issuer_frame, 3, self.issuer_phone, width=30)
         }
-        self.issuer_name.bind("<KeyRelease>", lambda e: self._schedule_preview_update())
-        self.issuer_title.bind("<KeyRelease>", lambda e: self._schedule_preview_update())
-        self.issuer_email.bind("<KeyRelease>", lambda e: self._schedule_preview_update())
-        self.issuer_phone.bind("<KeyRelease>", lambda e: self._schedule_preview_update())
+        for key in ISSUER_FIELDS: # 입력란을 문서 모델에 연결
+            self._bind_entry_to_document(getattr(self, f"issuer_{key}"), "issuer", key)
 
         # 발행자 프리셋
         self.issuer_preset_frame = ttk.LabelFrame(self.issuer_preset_combined_frame, padding="5")
@@ -410,12 +476,12 @@ class InvoiceGenerator:
         self.issuer_preset_name_entry.grid(row=0, column=1, sticky=tk.W, pady=2)
         self.issuer_preset_combobox = ttk.Combobox(self.issuer_preset_frame, state="readonly", width=25)
         self.issuer_preset_combobox.grid(row=1, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=5)
-        self.issuer_preset_combobox.bind("<<ComboboxSelected>>", lambda e: (self.on_issuer_preset_selected(e), self._schedule_preview_update()))
+        self.issuer_preset_combobox.bind("<<ComboboxSelected>>", lambda e: self._apply_and_preview(self.on_issuer_preset_selected, e))
         issuer_preset_button_frame = ttk.Frame(self.issuer_preset_frame)
         issuer_preset_button_frame.grid(row=2, column=0, columnspan=2, pady=5)
         self.save_issuer_preset_button = ttk.Button(issuer_preset_button_frame, text="발행자 프리셋 저장", command=self.add_issuer_preset)
         self.save_issuer_preset_button.pack(side=tk.LEFT, padx=2)
-        self.load_issuer_preset_button = ttk.Button(issuer_preset_button_frame, text="발행자 프리셋 불러오기", command=lambda: (self.apply_issuer_preset(), self._schedule_preview_update()))
+        self.load_issuer_preset_button = ttk.Button(issuer_preset_button_frame, text="발행자 프리셋 불러오기", command=lambda: self._apply_and_preview(self.apply_issuer_preset))
         self.load_issuer_preset_button.pack(side=tk.LEFT, padx=2)
         self.delete_issuer_preset_button = ttk.Button(issuer_preset_button_frame, text="발행자 프리셋 삭제", command=self.delete_issuer_preset)
         self.delete_issuer_preset_button.pack(side=tk.LEFT, padx=2)
@@ -424,34 +490,22 @@ class InvoiceGenerator:
         # --- 품목 정보 ---
         self.items_frame = ttk.Frame(left_panel)
         self.items_frame.pack(fill=tk.X, pady=10)
-        # 품목 정보 입력란 열 너비 설정
-        self.items_frame.grid_columnconfigure(0, weight=1) # 품목 이름
-        self.items_frame.grid_columnconfigure(1, weight=1) # 수량
-        self.items_frame.grid_columnconfigure(2, weight=1) # 단가
-        self.items_frame.grid_columnconfigure(3, weight=1) # 금액
-        self.items = []
-
-        # 품목 헤더 레이블 생성 (한 번만 생성)
-        self.item_header_labels = {
-            "item": ttk.Label(self.items_frame, text="품목"),
-            "quantity": ttk.Label(self.items_frame, text="수량", anchor=tk.CENTER),
-            "unit_price": ttk.Label(self.items_frame, text="단가", anchor=tk.CENTER),
-            "amount": ttk.Label(self.items_frame, text="금액", anchor=tk.CENTER)
-        }
-        self.item_header_labels["item"].grid(row=0, column=0, padx=2, sticky=tk.W + tk.E)
-        self.item_header_labels["quantity"].grid(row=0, column=1, padx=2, sticky=tk.W + tk.E)
-        self.item_header_labels["unit_price"].grid(row=0, column=2, padx=2, sticky=tk.W + tk.E)
-        self.item_header_labels["amount"].grid(row=0, column=3, padx=2, sticky=tk.W + tk.E)
+        self.items_frame.grid_columnconfigure(0, weight=1)
+
+        # 품목 입력 표: 보이는 행 위젯만 만들어 두고 스크롤 시 재사용 (품목 데이터는 item_grid.rows)
+        self.item_grid = VirtualItemGrid(self.items_frame, self.document)
+        self.item_grid.grid(row=0, column=0, sticky="we")
+        self.item_header_labels = self.item_grid.header_labels
 
         item_buttons_frame = ttk.Frame(self.items_frame)
-        item_buttons_frame.grid(row=100, column=0, columnspan=4, pady=10)
+        item_buttons_frame.grid(row=100, column=0, pady=10)
 
-        self.add_item_button = ttk.Button(item_buttons_frame, command=lambda: (self.add_item_row(len(self.items)), self._schedule_preview_update()))
+        self.add_item_button = ttk.Button(item_buttons_frame, command=lambda: self._apply_and_preview(self.add_item_row))
         self.add_item_button.pack(side=tk.LEFT, padx=5)
 
         self.remove_item_button = ttk.Button(item_buttons_frame, text="품목 제거", command=self.remove_last_item_row)
         self.remove_item_button.pack(side=tk.LEFT, padx=5)
-        self.add_item_row(0) # Initial item row
+        self.add_item_row() # Initial item row
 
         # --- 품목 프리셋 컨테이너 (다중 품목 및 단일 품목 프리셋을 포함) ---
         self.item_preset_combined_frame = ttk.LabelFrame(left_panel, text="품목 정보", padding="10")
@@ -465,12 +519,12 @@ class InvoiceGenerator:
         self.preset_name_entry.grid(row=0, column=1, sticky=tk.W, pady=2)
         self.preset_combobox = ttk.Combobox(self.preset_frame, state="readonly", width=25)
         self.preset_combobox.grid(row=1, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=5)
-        self.preset_combobox.bind("<<ComboboxSelected>>", lambda e: (self.on_preset_selected(e), self._schedule_preview_update()))
+        self.preset_combobox.bind("<<ComboboxSelected>>", lambda e: self._apply_and_preview(self.on_preset_selected, e))
         preset_button_frame = ttk.Frame(self.preset_frame)
         preset_button_frame.grid(row=2, column=0, columnspan=2, pady=5)
         self.save_preset_button = ttk.Button(preset_button_frame, text="프리셋 저장", command=self.add_preset)
         self.save_preset_button.pack(side=tk.LEFT, padx=2)
-        self.load_preset_button = ttk.Button(preset_button_frame, text="프리셋 불러오기", command=lambda: (self.apply_preset(), self._schedule_preview_update()))
+        self.load_preset_button = ttk.Button(preset_button_frame, text="프리셋 불러오기", command=lambda: self._apply_and_preview(self.apply_preset))
         self.load_preset_button.pack(side=tk.LEFT, padx=2)
         self.delete_preset_button = ttk.Button(preset_button_frame, text="프리셋 삭제", command=self.delete_preset)
         self.delete_preset_button.pack(side=tk.LEFT, padx=2)
@@ -497,13 +551,13 @@ class InvoiceGenerator:
 
         self.single_preset_combobox = ttk.Combobox(self.single_item_preset_frame, state="readonly", width=25)
         self.single_preset_combobox.grid(row=4, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=5)
-        self.single_preset_combobox.bind("<<ComboboxSelected>>", lambda e: (self.on_single_item_preset_selected(e), self._schedule_preview_update()))
+        self.single_preset_combobox.bind("<<ComboboxSelected>>", lambda e: self._apply_and_preview(self.on_single_item_preset_selected, e))
 
         single_preset_button_frame = ttk.Frame(self.single_item_preset_frame)
         single_preset_button_frame.grid(row=5, column=0, columnspan=2, pady=5)
         self.save_single_item_preset_button = ttk.Button(single_preset_button_frame, text="단일 품목 프리셋 저장", command=self.add_single_item_preset)
         self.save_single_item_preset_button.pack(side=tk.LEFT, padx=2)
-        self.add_single_item_button = ttk.Button(single_preset_button_frame, text="단일 품목 추가", command=lambda: (self.apply_single_item_preset(), self._schedule_preview_update()))
+        self.add_single_item_button = ttk.Button(single_preset_button_frame, text="단일 품목 추가", command=lambda: self._apply_and_preview(self.apply_single_item_preset))
         self.add_single_item_button.pack(side=tk.LEFT, padx=2)
         self.delete_single_item_preset_button = ttk.Button(single_preset_button_frame, text="단일 품목 프리셋 삭제", command=self.delete_single_item_preset)
         self.delete_single_item_preset_button.pack(side=tk.LEFT, padx=2)
@@ -544,12 +598,12 @@ class InvoiceGenerator:
         self.color_preset_name_entry.pack(side=tk.LEFT, padx=2)
         self.color_preset_combobox = ttk.Combobox(color_preset_frame, state="readonly", width=15)
         self.color_preset_combobox.pack(side=tk.LEFT, padx=2)
-        self.color_preset_combobox.bind("<<ComboboxSelected>>", lambda e: (self.on_color_preset_selected(e), self._schedule_preview_update()))
+        self.color_preset_combobox.bind("<<ComboboxSelected>>", lambda e: self._apply_and_preview(self.on_color_preset_selected, e))
 
         color_preset_button_frame = ttk.Frame(self.color_settings_frame)
         color_preset_button_frame.grid(row=6, column=0, columnspan=3, pady=5)
         ttk.Button(color_preset_button_frame, text="프리셋 저장", command=self.add_color_preset).pack(side=tk.LEFT, padx=2)
-        ttk.Button(color_preset_button_frame, text="프리셋 불러오기", command=lambda: (self.apply_color_preset(), self._schedule_preview_update())).pack(side=tk.LEFT, padx=2)
+        ttk.Button(color_preset_button_frame, text="프리셋 불러오기", command=lambda: self._apply_and_preview(self.apply_color_preset)).pack(side=tk.LEFT, padx=2)
         ttk.Button(color_preset_button_frame, text="프리셋 삭제", command=self.delete_color_preset).pack(side=tk.LEFT, padx=2)
         
         # 저장 경로 및 파일 이름 설정 컨테이너
@@ -599,6 +653,8 @@ class InvoiceGenerator:
         self.preview_canvas = tk.Canvas(preview_frame, bg="white", bd=2, relief="groove")
         self.preview_canvas.pack(fill=tk.BOTH, expand=True)
         self.preview_canvas.bind("<Configure>", lambda e: self.update_preview_display())
+        self.root.bind("<F12>", self.toggle_timing_overlay)
+        self.root.bind("<Control-F12>", self.dump_timings)
 
         # 페이지 탐색 버튼
         page_nav_frame = ttk.Frame(preview_frame)
@@ -626,25 +682,16 @@ class InvoiceGenerator:
             self.save_default_save_path_setting()
 
     def save_default_save_path_setting(self):
-        settings_file = "settings.json"
-        settings = {}
-        if os.path.exists(settings_file):
-            try:
-                with open(settings_file, "r", encoding="utf-8") as f:
-                    settings = json.load(f)
-            except json.JSONDecodeError:
-                pass
-        settings["use_default_save_path"] = self.use_default_save_path.get()
-        settings["last_save_path"] = self.save_path.get() # 마지막 저장 경로 추가
-        with open(settings_file, "w", encoding="utf-8") as f:
-            json.dump(settings, f, indent=4, ensure_ascii=False)
+        self.settings["use_default_save_path"] = self.use_default_save_path.get()
+        self.settings["last_save_path"] = self.save_path.get() # 마지막 저장 경로 추가
+        self.persistence.write_json("settings.json", self.settings, indent=4, ensure_ascii=False)
 
     def load_default_save_path_setting(self):
         settings_file = "settings.json"
         if os.path.exists(settings_file):
             try:
                 with open(settings_file, "r", encoding="utf-8") as f:
-                    settings = json.load(f)
+                    self.settings = settings = json.load(f)
                     if "use_default_save_path" in settings:
                         self.use_default_save_path.set(settings["use_default_save_path"])
                     if "last_save_path" in settings and settings["use_default_save_path"]:
@@ -659,28 +706,16 @@ class InvoiceGenerator:
             self.save_path.set(path)
 
     def load_presets(self):
-        preset_file = "item_presets.json"
-        if os.path.exists(preset_file):
-            try:
-                with open(preset_file, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                    self.item_presets = data.get("multi_item_presets", {})
-                    self.single_item_presets = data.get("single_item_presets", {})
-            except json.JSONDecodeError:
-                self.item_presets = {}
-                self.single_item_presets = {}
+        self.item_presets = self.preset_store.collection("item")
+        self.single_item_presets = self.preset_store.collection("single_item")
         self.update_preset_combobox()
         self.update_single_item_preset_combobox()
 
-    def save_presets(self):
-        preset_file = "item_presets.json"
-        with open(preset_file, "w", encoding="utf-8") as f:
-            json.dump({"multi_item_presets": self.item_presets, "single_item_presets": self.single_item_presets}, f, indent=4, ensure_ascii=False)
-
     def update_preset_combobox(self):
-        self.preset_combobox["values"] = list(self.item_presets.keys())
-        if self.item_presets:
-            self.preset_combobox.set(list(self.item_presets.keys())[0])
+        names = self.item_presets.keys()
+        self.preset_combobox["values"] = names
+        if names:
+            self.preset_combobox.set(names[0])
         else:
             self.preset_combobox.set("")
 
@@ -691,10 +726,10 @@ class InvoiceGenerator:
             return
 
         current_items = []
-        for item_widget in self.items:
-            name = item_widget['name'].get()
-            quantity = item_widget['quantity'].get()
-            unit_price = item_widget['unit_price'].get()
+        for row in self.item_grid.rows:
+            name = row['name']
+            quantity = row['quantity']
+            unit_price = row['unit_price']
             if name or quantity or unit_price: # 비어있지 않은 품목만 저장
                 current_items.append({
                     "name": name,
@@ -707,7 +742,6 @@ class InvoiceGenerator:
             return
 
         self.item_presets[preset_name] = current_items
-        self.save_presets()
         self.update_preset_combobox()
         messagebox.showinfo("Success", self.i18n[self.language.get()]["preset_saved"])
 
@@ -717,22 +751,8 @@ class InvoiceGenerator:
             messagebox.showerror("Error", self.i18n[self.language.get()]["preset_not_found"])
             return
 
-        # 기존 품목 필드 초기화
-        for item_widget in self.items:
-            item_widget['name'].destroy()
-            item_widget['quantity'].destroy()
-            item_widget['unit_price'].destroy()
-            item_widget['amount'].destroy()
-        self.items = []
-
-        # 프리셋 데이터로 품목 필드 채우기
-        for i, item_data in enumerate(self.item_presets[preset_name]):
-            self.add_item_row(i)
-            self.items[i]['name'].insert(0, item_data['name'])
-            self.items[i]['quantity'].insert(0, item_data['quantity'])
-            self.items[i]['unit_price'].insert(0, item_data['unit_price'])
-            # 금액 자동 업데이트 트리거
-            self.items[i]['quantity'].event_generate("<KeyRelease>")
+        # 프리셋 데이터로 품목 목록 교체 (행 위젯은 재사용, 금액은 표에서 계산)
+        self.item_grid.set_rows(self.item_presets[preset_name])
 
         # messagebox.showinfo("Success", self.i18n[self.language.get()]["preset_loaded"])
 
@@ -744,7 +764,6 @@ class InvoiceGenerator:
 
         if messagebox.askyesno("Confirm Delete", self.i18n[self.language.get()]["confirm_delete_preset"]):
             del self.item_presets[preset_name]
-            self.save_presets()
             self.update_preset_combobox()
             messagebox.showinfo("Success", self.i18n[self.language.get()]["preset_deleted"])
 
@@ -756,9 +775,10 @@ class InvoiceGenerator:
 
     # --- 단일 품목 프리셋 관련 함수 ---
     def update_single_item_preset_combobox(self):
-        self.single_preset_combobox["values"] = list(self.single_item_presets.keys())
-        if self.single_item_presets:
-            self.single_preset_combobox.set(list(self.single_item_presets.keys())[0])
+        names = self.single_item_presets.keys()
+        self.single_preset_combobox["values"] = names
+        if names:
+            self.single_preset_combobox.set(names[0])
         else:
             self.single_preset_combobox.set("")
 
@@ -781,7 +801,6 @@ class InvoiceGenerator:
             "quantity": item_quantity,
             "unit_price": item_unit_price
         }
-        self.save_presets()
         self.update_single_item_preset_combobox()
         messagebox.showinfo("Success", self.i18n[self.language.get()]["preset_saved"])
 
@@ -793,17 +812,8 @@ class InvoiceGenerator:
 
         item_data = self.single_item_presets[preset_name]
         
-        # 새 품목 행 추가
-        new_item_index = len(self.items)
-        self.add_item_row(new_item_index)
-
-        # 새로 추가된 품목 행에 프리셋 데이터 채우기
-        self.items[new_item_index]['name'].insert(0, item_data['name'])
-        self.items[new_item_index]['quantity'].insert(0, item_data['quantity'])
-        self.items[new_item_index]['unit_price'].insert(0, item_data['unit_price'])
-        
-        # 금액 자동 업데이트 트리거
-        self.items[new_item_index]['quantity'].event_generate("<KeyRelease>")
+        # 프리셋 데이터로 새 품목 행 추가 (금액은 표에서 계산)
+        self.add_item_row(item_data)
 
     def delete_single_item_preset(self):
         preset_name = self.single_preset_combobox.get()
@@ -813,7 +823,6 @@ class InvoiceGenerator:
 
         if messagebox.askyesno("Confirm Delete", self.i18n[self.language.get()]["confirm_delete_preset"]):
             del self.single_item_presets[preset_name]
-            self.save_presets()
             self.update_single_item_preset_combobox()
             messagebox.showinfo("Success", self.i18n[self.language.get()]["preset_deleted"])
 
@@ -832,24 +841,14 @@ class InvoiceGenerator:
             self.single_preset_item_unit_price_entry.insert(0, item_data.get('unit_price', ''))
 
     def load_issuer_presets(self):
-        preset_file = "issuer_presets.json"
-        if os.path.exists(preset_file):
-            try:
-                with open(preset_file, "r", encoding="utf-8") as f:
-                    self.issuer_presets = json.load(f)
-            except json.JSONDecodeError:
-                self.issuer_presets = {}
+        self.issuer_presets = self.preset_store.collection("issuer")
         self.update_issuer_preset_combobox()
 
-    def save_issuer_presets(self):
-        preset_file = "issuer_presets.json"
-        with open(preset_file, "w", encoding="utf-8") as f:
-            json.dump(self.issuer_presets, f, indent=4, ensure_ascii=False)
-
     def update_issuer_preset_combobox(self):
-        self.issuer_preset_combobox["values"] = list(self.issuer_presets.keys())
-        if self.issuer_presets:
-            self.issuer_preset_combobox.set(list(self.issuer_presets.keys())[0])
+        names = self.issuer_presets.keys()
+        self.issuer_preset_combobox["values"] = names
+        if names:
+            self.issuer_preset_combobox.set(names[0])
         else:
             self.issuer_preset_combobox.set("")
 
@@ -871,7 +870,6 @@ class InvoiceGenerator:
             return
 
         self.issuer_presets[preset_name] = current_issuer_info
-        self.save_issuer_presets()
         self.update_issuer_preset_combobox()
         messagebox.showinfo("Success", self.i18n[self.language.get()]["preset_saved"])
 
@@ -897,7 +895,6 @@ class InvoiceGenerator:
 
         if messagebox.askyesno("Confirm Delete", self.i18n[self.language.get()]["confirm_delete_preset"]):
             del self.issuer_presets[preset_name]
-            self.save_issuer_presets()
             self.update_issuer_preset_combobox()
             messagebox.showinfo("Success", self.i18n[self.language.get()]["preset_deleted"])
 
@@ -908,24 +905,42 @@ class InvoiceGenerator:
 
     # --- 고객 프리셋 관련 함수 ---
     def load_customer_presets(self):
-        preset_file = "customer_presets.json"
-        if os.path.exists(preset_file):
-            try:
-                with open(preset_file, "r", encoding="utf-8") as f:
-                    self.customer_presets = json.load(f)
-            except json.JSONDecodeError:
-                self.customer_presets = {}
+        self.customer_presets = self.preset_store.collection("customer")
+        self.customer_index = None # 검색 색인은 처음 검색할 때 만듭니다
         self.update_customer_preset_combobox()
 
-    def save_customer_presets(self):
-        preset_file = "customer_presets.json"
-        with open(preset_file, "w", encoding="utf-8") as f:
-            json.dump(self.customer_presets, f, indent=4, ensure_ascii=False)
+    def _customer_search_index(self):
+        if self.customer_index is None:
+            self.customer_index = PrefixIndex()
+            self.customer_index.build((name, self._customer_search_texts(name, data)) for name, data in self.customer_presets.items())
+        return self.customer_index
+
+    def _customer_search_texts(self, preset_name, customer_data):
+        return [preset_name] + [customer_data.get(key, "") for key in ("name", "reg_num", "email")]
+
+    def on_customer_search(self, event):
+        if event.keysym in ("Up", "Down", "Left", "Right", "Return", "Escape", "Tab"):
+            return
+        query = self.customer_preset_combobox.get()
+        if query.strip():
+            self.customer_preset_combobox["values"] = self._customer_search_index().search(query)
+        else:
+            self.customer_preset_combobox["values"] = self.customer_presets.keys()[:MAX_RESULTS]
+
+    def on_customer_search_enter(self, event):
+        # 입력한 이름이 프리셋이 아니면 첫 번째 검색 결과를 선택합니다.
+        if self.customer_preset_combobox.get() not in self.customer_presets:
+            results = self.customer_preset_combobox["values"]
+            if not results:
+                return
+            self.customer_preset_combobox.set(results[0])
+        self._apply_and_preview(self.on_customer_preset_selected, event)
 
     def update_customer_preset_combobox(self):
-        self.customer_preset_combobox["values"] = list(self.customer_presets.keys())
-        if self.customer_presets:
-            self.customer_preset_combobox.set(list(self.customer_presets.keys())[0])
+        names = self.customer_presets.keys()
+        self.customer_preset_combobox["values"] = names[:MAX_RESULTS] # 나머지는 검색으로 찾습니다
+        if names:
+            self.customer_preset_combobox.set(names[0])
         else:
             self.customer_preset_combobox.set("")
 
@@ -948,7 +963,8 @@ class InvoiceGenerator:
             return
 
         self.customer_presets[preset_name] = current_customer_info
-        self.save_customer_presets()
+        if self.customer_index is not None:
+            self.customer_index.add(preset_name, self._customer_search_texts(preset_name, current_customer_info))
         self.update_customer_preset_combobox()
         messagebox.showinfo("Success", self.i18n[self.language.get()]["preset_saved"])
 
@@ -975,7 +991,8 @@ class InvoiceGenerator:
 
         if messagebox.askyesno("Confirm Delete", self.i18n[self.language.get()]["confirm_delete_preset"]):
             del self.customer_presets[preset_name]
-            self.save_customer_presets()
+            if self.customer_index is not None:
+                self.customer_index.remove(preset_name)
             self.update_customer_preset_combobox()
             messagebox.showinfo("Success", self.i18n[self.language.get()]["preset_deleted"])
 
@@ -1000,84 +1017,26 @@ class InvoiceGenerator:
     
 
     def load_color_presets(self):
-        preset_file = "color_presets.json"
-        if os.path.exists(preset_file):
-            try:
-                with open(preset_file, "r", encoding="utf-8") as f:
-                    self.color_presets = json.load(f)
-            except json.JSONDecodeError:
-                self.color_presets = {}
+        self.color_presets = self.preset_store.collection("color")
         self.update_color_preset_combobox()
 
-    def save_color_presets(self):
-        preset_file = "color_presets.json"
-        with open(preset_file, "w", encoding="utf-8") as f:
-            json.dump(self.color_presets, f, indent=4, ensure_ascii=False)
-
     def update_color_preset_combobox(self):
-        self.color_preset_combobox["values"] = list(self.color_presets.keys())
-        if self.color_presets:
-            self.color_preset_combobox.set(list(self.color_presets.keys())[0])
+        names = self.color_presets.keys()
+        self.color_preset_combobox["values"] = names
+        if names:
+            self.color_preset_combobox.set(names[0])
         else:
             self.color_preset_combobox.set("")
 
     def remove_last_item_row(self):
-        if self.items:
-            last_item = self.items.pop()
-            # 각 위젯을 개별적으로 제거합니다.
-            last_item['name'].destroy()
-            last_item['quantity'].destroy()
-            last_item['unit_price'].destroy()
-            last_item['amount'].destroy()
+        if self.item_grid.pop_row() is not None:
             self._schedule_preview_update()
 
-    def add_item_row(self, index):
-        # 각 Entry 위젯들을 self.items_frame에 직접 배치합니다.
-        item_name = ttk.Entry(self.items_frame)
-        item_name.grid(row=index + 1, column=0, padx=2, pady=2, sticky="we")
-        item_name.bind("<KeyRelease>", lambda e: self._schedule_preview_update())
-
-        item_quantity = ttk.Entry(self.items_frame)
-        item_quantity.grid(row=index + 1, column=1, padx=2, pady=2, sticky="we")
-        item_quantity.bind("<KeyRelease>", lambda e: self.calculate_amount(index))
-
-        item_unit_price = ttk.Entry(self.items_frame)
-        item_unit_price.grid(row=index + 1, column=2, padx=2, pady=2, sticky="we")
-        item_unit_price.bind("<KeyRelease>", lambda e: self.calculate_amount(index))
-
-        item_amount = ttk.Entry(self.items_frame, state="readonly")
-        item_amount.grid(row=index + 1, column=3, padx=2, pady=2, sticky="we")
-
-        self.items.append({
-            # 'frame' 키는 더 이상 필요 없으므로 제거합니다.
-            'name': item_name,
-            'quantity': item_quantity,
-            'unit_price': item_unit_price,
-            'amount': item_amount
-        })
+    def add_item_row(self, item_data=None):
+        self.item_grid.append_row(item_data)
         self.update_item_labels() # 품목 레이블 업데이트
         self._schedule_preview_update() # 미리보기 업데이트
 
-    def calculate_amount(self, index):
-        try:
-            quantity = int(self.items[index]['quantity'].get() or 0)
-            unit_price = int(self.items[index]['unit_price'].get() or 0)
-            amount = quantity * unit_price
-            self.items[index]['amount'].config(state=tk.NORMAL)
-            self.items[index]['amount'].delete(0, tk.END)
-            self.items[index]['amount'].insert(0, f"{amount:,}")
-            self.items[index]['amount'].config(state="readonly")
-            self._schedule_preview_update()
-        except ValueError:
-            self.items[index]['amount'].config(state=tk.NORMAL)
-            self.items[index]['amount'].delete(0, tk.END)
-            self.items[index]['amount'].insert(0, "")
-            self.items[index]['amount'].config(state="readonly")
-            # messagebox.showerror("Error", self.i18n[self.language.get()]["error_numeric"]) # 너무 자주 뜰 수 있으므로 주석 처리
-            self._schedule_preview_update()
-
-    
-
     def update_item_labels(self):
         lang = self.language.get()
         t = self.i18n[lang]
@@ -1098,11 +1057,11 @@ class InvoiceGenerator:
             "secondary_color": self.secondary_color.get(),
             "text_color": self.text_color.get(),
             "light_text_color": self.light_text_color.get(),
-            "border_color": self.border_color.get()
+            "border_color": self.border_color.get(),
+            "invoice_title_color": self.invoice_title_color.get()
         }
         
         self.color_presets[preset_name] = current_colors
-        self.save_color_presets()
         self.update_color_preset_combobox()
         messagebox.showinfo("Success", self.i18n[self.language.get()]["preset_saved"])
 
@@ -1118,9 +1077,17 @@ class InvoiceGenerator:
         self.text_color.set(colors_data["text_color"])
         self.light_text_color.set(colors_data["light_text_color"])
         self.border_color.set(colors_data["border_color"])
+        if "invoice_title_color" in colors_data:
+            self.invoice_title_color.set(colors_data["invoice_title_color"])
 
         # messagebox.showinfo("Success", self.i18n[self.language.get()]["preset_loaded"])
 
+    def on_color_preset_selected(self, event):
+        # 콤보박스에서 프리셋 선택 시, 프리셋 이름 엔트리에 자동 입력
+        selected_preset = self.color_preset_combobox.get()
+        self.color_preset_name_entry.delete(0, tk.END)
+        self.color_preset_name_entry.insert(0, selected_preset)
+
     def delete_color_preset(self):
         preset_name = self.color_preset_combobox.get()
         if not preset_name or preset_name not in self.color_presets:
@@ -1129,410 +1096,296 @@ class InvoiceGenerator:
 
         if messagebox.askyesno("Confirm Delete", self.i18n[self.language.get()]["confirm_delete_preset"]):
             del self.color_presets[preset_name]
-            self.save_color_presets()
             self.update_color_preset_combobox()
             messagebox.showinfo("Success", self.i18n[self.language.get()]["preset_deleted"])
 
     def _create_pdf_data(self):
-        lang = self.language.get()
-        t = self.i18n[lang]
-        data = {"lang": lang, "doc_type": t[self.doc_type.get()]}
-        data["doc_number"] = self.doc_number.get()
-        data["doc_date"] = self.doc_date.get()
-        
-        # 납부기한/유효기간 계산
-        doc_date_obj = datetime.strptime(self.doc_date.get(), '%Y-%m-%d')
-        due_date_obj = doc_date_obj + timedelta(days=30)
-        data["due_date"] = due_date_obj.strftime('%Y-%m-%d')
-
-        data["supplier"] = SUPPLIER_INFO[lang]
-        
-        data["customer"] = {
-            "name": self.customer_name.get(),
-            "reg_num": self.customer_reg_num.get(),
-            "address": self.customer_address.get(),
-            "phone": self.customer_phone.get(),
-            "email": self.customer_email.get()
-        }
-
-        data["issuer"] = {
-            "name": self.issuer_name.get(),
-            "title": self.issuer_title.get(),
-            "email": self.issuer_email.get(),
-            "phone": self.issuer_phone.get()
-        }
-        
-        items_data = []
-        supply_amount = 0
-        for item_widget in self.items:
-            name = item_widget['name'].get()
-            quantity_str = item_widget['quantity'].get()
-            unit_price_str = item_widget['unit_price'].get()
-            if name and quantity_str and unit_price_str:
-                try:
-                    quantity = int(quantity_str)
-                    unit_price = int(unit_price_str)
-                    amount = quantity * unit_price
-                    supply_amount += amount
-                    items_data.append({ 'name': name, 'quantity': quantity, 'unit_price': unit_price, 'amount': amount })
-                except ValueError:
-                    messagebox.showerror("Error", t["error_numeric"])
-                    return None
-        
-        # if not data["customer"]["name"] or not items_data:
-        #     messagebox.showerror("Error", t["error_fill_all"])
-        #     return None
-
-        data["items"] = items_data
-        data["supply_amount"] = supply_amount
-        if lang == 'ko':
-            data["vat"] = int(supply_amount * 0.1)
-            data["total_amount"] = data["supply_amount"] + data["vat"]
-        else:
-            data["vat"] = 0
-            data["total_amount"] = supply_amount
-        return data
+        # 문서 모델에서 렌더링용 데이터를 만듭니다 (위젯을 읽거나 품목을 다시 파싱하지 않음).
+        try:
+            return self.document.snapshot()
+        except ValueError:
+            messagebox.showerror("Error", self.i18n[self.language.get()]["error_numeric"])
+            return None
 
-    def _draw_pdf(self, buffer, doc_type_text, total_pages=1):
+    def _draw_pdf(self, buffer, doc_type_text):
         data = self._create_pdf_data()
         if not data: return None
-
-        lang, symbol = data["lang"], self.i18n[data["lang"]]["currency_symbol"]
-        t = self.i18n[lang]
-        
-        c = canvas.Canvas(buffer, pagesize=A4)
-        width, height = A4 # A4 사이즈로 변경
-
-        # 일관된 내용 영역 정의
-        content_x_start = 50
-        content_width = width - (content_x_start * 2) # 양쪽 50pt 여백
-
-        # --- 새로운 디자인 색상 및 글꼴 설정 ---
-        primary_color = colors.HexColor(self.primary_color.get())
-        secondary_color = colors.HexColor(self.secondary_color.get())
-        text_color = colors.HexColor(self.text_color.get())
-        light_text_color = colors.HexColor(self.light_text_color.get())
-        border_color = colors.HexColor(self.border_color.get())
-
-        # --- 1. 상단 헤더 --- 
-        c.setFillColor(primary_color)
-        c.rect(content_x_start, height - 60, content_width, 60, fill=1, stroke=0) # 높이 60으로 조정
-        c.setFont(self.default_font_bold, 32)
-        c.setFillColor(colors.HexColor(self.invoice_title_color.get())) # 텍스트 색상을 청구서 제목 색상으로 변경
-        c.drawString(content_x_start + 20, height - 45, doc_type_text)
-
-        # --- 2. 문서 번호, 작성일, 납부기한/유효기간, 발행자 정보 ---
-        y_pos_doc_info_box_top = height - 80 # 조정된 헤더 높이에 맞춰 시작 위치 조정
-        box_height = 70 # Adjusted height for 3 lines of text + padding
-        c.setFillColor(secondary_color)
-        c.rect(content_x_start, y_pos_doc_info_box_top - box_height, content_width, box_height, fill=1, stroke=0) # x, y (bottom-left), width, height
-        
-        y_pos_text_start = y_pos_doc_info_box_top - 15 # Start text slightly below box top
-
-        c.setFont(self.default_font_bold, 9)
-        c.setFillColor(text_color)
-        c.drawString(content_x_start + 20, y_pos_text_start, t['doc_num'])
-        c.drawString(content_x_start + 20, y_pos_text_start - 18, t['date'])
-        
-        if self.doc_type.get() == 'invoice':
-            c.drawString(content_x_start + 20, y_pos_text_start - 36, t['due_date'])
-        else:
-            c.drawString(content_x_start + 20, y_pos_text_start - 36, t['validity_period'])
-
-        c.drawString(content_x_start + content_width / 2 + 20, y_pos_text_start, t['issuer_info'])
-
-        c.setFont(self.default_font, 9)
-        c.drawString(content_x_start + 70, y_pos_text_start, data['doc_number']) # Adjusted X
-        c.drawString(content_x_start + 70, y_pos_text_start - 18, data['doc_date']) # Adjusted X
-        c.drawString(content_x_start + 70, y_pos_text_start - 36, data['due_date']) # This is the calculated due_date/validity_period
-
-        c.drawString(content_x_start + content_width / 2 + 20, y_pos_text_start - 15, f"{data['issuer']['name']} ({data['issuer']['title']})")
-        c.drawString(content_x_start + content_width / 2 + 20, y_pos_text_start - 30, data['issuer']['email'])
-        c.drawString(content_x_start + content_width / 2 + 20, y_pos_text_start - 45, data['issuer']['phone'])
-
-        # --- 3. 공급자 및 고객 정보 ---
-        y_pos_supplier_customer_start = y_pos_doc_info_box_top - box_height - 20 # Gap of 20 points below doc info box
-        c.setFont(self.default_font_bold, 12)
-        c.setFillColor(text_color)
-        c.drawString(content_x_start, y_pos_supplier_customer_start, t["from"])
-        c.drawString(content_x_start + content_width / 2, y_pos_supplier_customer_start, t["to"])
-
-        c.setStrokeColor(border_color)
-        c.line(content_x_start, y_pos_supplier_customer_start - 10, content_x_start + content_width / 2 - 20, y_pos_supplier_customer_start - 10)
-        c.line(content_x_start + content_width / 2, y_pos_supplier_customer_start - 10, content_x_start + content_width, y_pos_supplier_customer_start - 10)
-
-        y_pos_supplier_customer_content_start = y_pos_supplier_customer_start - 30
-        c.setFont(self.default_font, 10)
-        # 공급자 정보
-        c.drawString(content_x_start, y_pos_supplier_customer_content_start, data["supplier"]['name'])
-        c.setFont(self.default_font, 9)
-        c.setFillColor(colors.gray)
-        c.drawString(content_x_start, y_pos_supplier_customer_content_start - 15, f"{t['reg_num']} {data['supplier']['reg_num']}")
-        if lang == 'en':
-            c.drawString(content_x_start, y_pos_supplier_customer_content_start - 30, data["supplier"]['address'][0])
-            c.drawString(content_x_start, y_pos_supplier_customer_content_start - 45, data["supplier"]['address'][1])
-            c.drawString(content_x_start, y_pos_supplier_customer_content_start - 60, f"{t['phone']} {data['supplier']['phone']}")
-            c.drawString(content_x_start, y_pos_supplier_customer_content_start - 75, f"{t['email']} {data['supplier']['email']}")
-        else:
-            c.drawString(content_x_start, y_pos_supplier_customer_content_start - 30, data["supplier"]['address'])
-            c.drawString(content_x_start, y_pos_supplier_customer_content_start - 45, f"{t['phone']} {data['supplier']['phone']}")
-            c.drawString(content_x_start, y_pos_supplier_customer_content_start - 60, f"{t['email']} {data['supplier']['email']}")
-
-        # 고객 정보
-        y_pos_customer_content_start = y_pos_supplier_customer_start - 30 # Same starting Y as supplier content
-        c.setFont(self.default_font, 10)
-        c.setFillColor(text_color)
-        c.drawString(content_x_start + content_width / 2, y_pos_customer_content_start, f"{data['customer']['name']} {t['dear']}")
-        c.setFont(self.default_font, 9)
-        c.setFillColor(colors.gray)
-        if lang == 'ko':
-            c.drawString(content_x_start + content_width / 2, y_pos_customer_content_start - 15, f"{t['reg_num']} {data['customer']['reg_num']}")
-            c.drawString(content_x_start + content_width / 2, y_pos_customer_content_start - 30, data['customer']['address'])
-            c.drawString(content_x_start + content_width / 2, y_pos_customer_content_start - 45, f"{t['phone']} {data['customer']['phone']}")
-            c.drawString(content_x_start + content_width / 2, y_pos_customer_content_start - 60, f"{t['email']} {data['customer']['email']}")
-        else:
-            # 영문 주소 줄바꿈 처리
-            c.drawString(content_x_start, y_pos_supplier_customer_content_start - 15, f"{t['reg_num']} {data['supplier']['reg_num']}")
-        if lang == 'en':
-            c.drawString(content_x_start, y_pos_supplier_customer_content_start - 30, data["supplier"]['address'][0])
-            c.drawString(content_x_start, y_pos_supplier_customer_content_start - 45, data["supplier"]['address'][1])
-            c.drawString(content_x_start, y_pos_supplier_customer_content_start - 60, f"{t['phone']} {data['supplier']['phone']}")
-            c.drawString(content_x_start, y_pos_supplier_customer_content_start - 75, f"{t['email']} {data['supplier']['email']}")
-        else:
-            c.drawString(content_x_start, y_pos_supplier_customer_content_start - 30, data["supplier"]['address'])
-            c.drawString(content_x_start, y_pos_supplier_customer_content_start - 45, f"{t['phone']} {data['supplier']['phone']}")
-            c.drawString(content_x_start, y_pos_supplier_customer_content_start - 60, f"{t['email']} {data['supplier']['email']}")
-
-            c.drawString(content_x_start + content_width / 2, y_pos_customer_content_start - 15, data['customer']['address'])
-            c.drawString(content_x_start + content_width / 2, y_pos_customer_content_start - 30, f"{t['phone']} {data['customer']['phone']}")
-            c.drawString(content_x_start + content_width / 2, y_pos_customer_content_start - 45, f"{t['email']} {data['customer']['email']}")
-
-        # --- 4. 품목 테이블 ---
-        lowest_point_supplier_customer = y_pos_supplier_customer_content_start - 60 # Lowest text point
-        y_pos_item_table = lowest_point_supplier_customer - 50 # 50 points gap below supplier/customer info (increased by 20)
-        table_headers = [t["item"], t["quantity"], t["unit_price"], t["amount"]]
-        col_widths = [285, 70, 70, 70] # Adjusted to sum to 512 (content_width)
-        x_start = content_x_start
-
-        c.setFillColor(primary_color)
-        c.rect(x_start, y_pos_item_table - 5, content_width, 20, fill=1, stroke=0) # 높이 20으로 조정
-        c.setFont(self.default_font_bold, 10)
-        c.setFillColor(light_text_color)
-        
-        # 헤더 중앙 정렬
-        current_x = x_start
-        for i, header in enumerate(table_headers):
-            c.drawCentredString(current_x + col_widths[i] / 2, y_pos_item_table, header)
-            current_x += col_widths[i]
-
-        y_pos_item_table_content_start = y_pos_item_table - 30
-        c.setFont(self.default_font, 9)
-        c.setFillColor(text_color)
-        right_align_x = content_x_start + content_width - 10 # Define the right alignment x-coordinate
-        for item in data["items"]:
-            c.setStrokeColor(border_color)
-            c.line(x_start, y_pos_item_table_content_start + 12, x_start + content_width, y_pos_item_table_content_start + 12)
-            
-            # 내용 정렬
-            c.drawCentredString(x_start + col_widths[0] / 2, y_pos_item_table_content_start, item['name']) # Center align item name
-            c.drawCentredString(x_start + col_widths[0] + col_widths[1] / 2, y_pos_item_table_content_start, f"{item['quantity']:,}") # Quantity remains centered
-            if lang == 'ko':
-                c.drawRightString(right_align_x - col_widths[3], y_pos_item_table_content_start, f"{item['unit_price']:,} {symbol}")
-                c.drawRightString(right_align_x, y_pos_item_table_content_start, f"{item['amount']:,} {symbol}")
-            else:
-                c.drawRightString(right_align_x - col_widths[3], y_pos_item_table_content_start, f"{symbol}{item['unit_price']:,}")
-                c.drawRightString(right_align_x, y_pos_item_table_content_start, f"{symbol}{item['amount']:,}")
-            y_pos_item_table_content_start -= 25
-        c.line(x_start, y_pos_item_table_content_start + 12, x_start + content_width, y_pos_item_table_content_start + 12)
-
-        # --- 5. 합계 ---
-        y_pos_summary_start = y_pos_item_table_content_start - 10 # Gap below item table
-        total_x_start = content_x_start + content_width / 2 # Align with right half of content area
-        if lang == 'ko':
-            c.setFont(self.default_font, 10)
-            c.drawString(total_x_start, y_pos_summary_start, t["supply_amount"])
-            c.drawRightString(content_x_start + content_width - 10, y_pos_summary_start, f"{data['supply_amount']:,} {symbol}")
-            y_pos_summary_start -= 20 # 간격 조정
-            c.drawString(total_x_start, y_pos_summary_start, t["vat"])
-            c.drawRightString(content_x_start + content_width - 10, y_pos_summary_start, f"{data['vat']:,} {symbol}")
-            y_pos_summary_start -= 20 # 간격 조정
-            c.setStrokeColor(border_color)
-            c.line(total_x_start, y_pos_summary_start, content_x_start + content_width, y_pos_summary_start)
-            y_pos_summary_start -= 5
-
-        c.setFillColor(primary_color)
-        c.rect(total_x_start - 20, y_pos_summary_start - 20, content_width / 2 + 20, 30, fill=1, stroke=0) # 높이 30으로 조정
-        c.setFont(self.default_font_bold, 12)
-        c.setFillColor(light_text_color)
-        c.drawString(total_x_start, y_pos_summary_start - 10, t["total_amount"])
-        if lang == 'ko':
-            c.drawRightString(content_x_start + content_width - 10, y_pos_summary_start - 10, f"{data['total_amount']:,} {symbol}")
-        else:
-            c.drawRightString(content_x_start + content_width - 10, y_pos_summary_start - 10, f"{symbol}{data['total_amount']:,}")
-
-        # --- Bank Fee Note (English only) ---
-        if lang == 'en':
-            fee_note_y_pos = y_pos_summary_start - 40 # Adjust Y position as needed
-            c.setFont(self.default_font_bold, 9) # Smaller font for note, but bold
-            c.setFillColor(text_color)
-            c.drawString(content_x_start + content_width / 2, fee_note_y_pos, "All bank fees should be covered by the sender.")
-
-        # --- 8. 하단 중앙 문구 ---
-        c.setFont(self.default_font, 9)
-        c.setFillColor(text_color)
-        if lang == 'ko':
-            footer_text = "궁금한 점 있으시면 편하게 연락해주세요."
-            footer_y_pos = 110 # Above bank info for Korean
-        else:
-            footer_text = "Please feel free to contact us if you have any questions."
-            footer_y_pos = 170 # Above bank info for English
-        c.drawRightString(content_x_start + content_width - 10, footer_y_pos, footer_text) # Adjusted Y position and right-aligned
-
-        # --- 6. 하단 정보 (계좌) ---
-        # Move bank info to the bottom of the page
-        if lang == 'ko':
-            y_pos_bank_info_start = 150 # Adjusted for Korean
-        else: # lang == 'en'
-            y_pos_bank_info_start = 160 # Adjusted for English (more lines)
-
-        c.setFont(self.default_font_bold, 12) # 글꼴 크기 키우고 볼드 처리
-        c.setFillColor(text_color)
-        c.drawString(content_x_start, y_pos_bank_info_start, t["bank_info"])
-        c.setStrokeColor(border_color)
-        c.line(content_x_start, y_pos_bank_info_start - 10, content_x_start + content_width / 2 - 20, y_pos_bank_info_start - 10)
-        y_pos_bank_info_start -= 25
-        c.setFont(self.default_font, 9)
-        if lang == 'ko':
-            c.drawString(content_x_start, y_pos_bank_info_start, "은행명: 국민은행")
-            c.drawString(content_x_start, y_pos_bank_info_start - 15, "계좌번호: 823701-04-343660")
-            c.drawString(content_x_start, y_pos_bank_info_start - 30, "예금주: 주식회사 애드캐리")
+        data["doc_type_text"] = doc_type_text
+        render_engine = self._load_render_engine()
+        self._show_font_warning()
+        fonts = (self.default_font, self.default_font_bold)
+        render_cache = self._open_render_cache()
+        if render_cache:
+            buffer.write(render_cache.render(data, fonts)) # 같은 문서를 다시 저장하면 캐시에서 가져옴
         else:
-            c.drawString(content_x_start, y_pos_bank_info_start, "Name of Bank Holder: ADCARRY Corp.")
-            c.drawString(content_x_start, y_pos_bank_info_start - 15, "Bank name: Citibank")
-            c.drawString(content_x_start, y_pos_bank_info_start - 30, "Account Number: 73380000000193674")
-            c.drawString(content_x_start, y_pos_bank_info_start - 45, "Routing Number: 031100209")
-            c.drawString(content_x_start, y_pos_bank_info_start - 60, "Bank Address: 111 Wall Street, New york, New York 10043, United States")
-
-        
-
-        # --- 7. 페이지 번호 및 하단 줄 ---
-        c.setStrokeColor(primary_color)
-        c.setLineWidth(2) # 두꺼운 줄
-        c.line(content_x_start, 30, content_x_start + content_width, 30) # 페이지 하단에 줄 추가
-
-        c.setFont(self.default_font, 8)
-        c.setFillColor(colors.gray)
-        c.drawCentredString(content_x_start + content_width / 2, 15, f"Page {c.getPageNumber()}/{total_pages}")
-
-        c.save()
+            render_engine.draw_pdf(buffer, data, fonts=fonts)
         return data
 
     def generate_preview(self):
         if not PREVIEW_ENABLED: return
-        self.pdf_buffer = io.BytesIO()
-        doc_type_key = self.doc_type.get()
-        lang = self.language.get()
-        doc_type_text = self.i18n[lang][doc_type_key]
-        
-        pdf_data = self._draw_pdf(self.pdf_buffer, doc_type_text)
-        if not pdf_data: self.pdf_buffer = None; return
-
-        self.pdf_buffer.seek(0)
-        pdf_document = fitz.open(stream=self.pdf_buffer.read(), filetype="pdf")
-        total_pages = len(pdf_document) # 총 페이지 수 가져오기
-        pdf_document.close()
-
-        # 다시 PDF를 생성하여 total_pages를 전달
-        self.pdf_buffer = io.BytesIO()
-        pdf_data = self._draw_pdf(self.pdf_buffer, doc_type_text, total_pages=total_pages)
-        if not pdf_data: self.pdf_buffer = None; return
-
-        self.pdf_buffer.seek(0)
-        pdf_document = fitz.open(stream=self.pdf_buffer.read(), filetype="pdf")
-        self.preview_images = []
-        for page_num in range(len(pdf_document)):
+        if self.after_id:
+            self.root.after_cancel(self.after_id)
+        self.after_id = None
+        self.preview_current = False
+        with self.timings.span("create_pdf_data"):
+            pdf_data = self._create_pdf_data() # 모델 스냅숏은 메인 스레드에서 만들어 작업자에 넘깁니다
+        if not pdf_data:
+            self.preview_worker.cancel()
+            self.preview_document_pending = False
+            self.pdf_buffer = None
+            return
+        canvas_size = self._preview_canvas_size()
+        self.preview_submitted_at = time.perf_counter()
+        self.preview_document_pending = True
+        self.preview_worker.submit(lambda is_cancelled: self._render_preview(pdf_data, canvas_size, is_cancelled))
+        if not self.preview_poll_id:
+            self.preview_poll_id = self.root.after(20, self._poll_preview)
+
+    def _preview_canvas_size(self):
+        return self.preview_canvas.winfo_width(), self.preview_canvas.winfo_height()
+
+    def _render_preview(self, pdf_data, canvas_size, is_cancelled):
+        # 작업자 스레드에서 실행됩니다. Tk 위젯에 접근하지 마세요.
+        render_engine = self._load_render_engine()
+        load_preview_libraries()
+        pdf_buffer = io.BytesIO()
+        with self.timings.span("draw_pdf"):
+            render_engine.draw_pdf(pdf_buffer, pdf_data, fonts=(self.default_font, self.default_font_bold))
+        if is_cancelled(): raise PreviewCancelled()
+        return self._rasterize_pages(pdf_buffer, canvas_size, [0], is_cancelled) # 첫 페이지만 먼저 표시
+
+    def _open_preview_document(self, pdf_buffer):
+        # 작업자 스레드에서만 호출합니다. 같은 PDF 의 다른 페이지를 요청할 때 다시 열지 않습니다.
+        if self.preview_document and self.preview_document[0] is pdf_buffer:
+            return self.preview_document[1]
+        if self.preview_document:
+            self.preview_document[1].close()
+            self.preview_document = None
+        with self.timings.span("fitz_open"):
+            pdf_document = fitz.open(stream=pdf_buffer.getvalue(), filetype="pdf")
+        self.preview_document = (pdf_buffer, pdf_document)
+        return pdf_document
+
+    def _rasterize_pages(self, pdf_buffer, canvas_size, page_nums, is_cancelled):
+        # 작업자 스레드에서 실행됩니다. 요청한 페이지만, 축소/확대 없이 바로 표시할 수 있도록 캔버스 크기에 맞는 배율로 래스터화합니다.
+        pdf_document = self._open_preview_document(pdf_buffer)
+        page_count = len(pdf_document)
+        preview_images = {}
+        for page_num in page_nums:
+            if page_num >= page_count:
+                continue
+            if is_cancelled(): raise PreviewCancelled()
             page = pdf_document.load_page(page_num)
-            pix = page.get_pixmap()
-            img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-            self.preview_images.append(img)
-        pdf_document.close()
-        self.current_page = 0
-        self.update_preview_display()
+            zoom = fit_zoom(page.rect, canvas_size)
+            page_key = (page_content_key(pdf_document, page), round(zoom, 4))
+            img = self.page_cache.get(page_key)
+            if img is None:
+                with self.timings.span("get_pixmap"): # 페이지마다
+                    pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False)
+                with self.timings.span("frombytes"):
+                    img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
+                self.page_cache.put(page_key, img)
+            preview_images[page_num] = img
+        return pdf_buffer, page_count, canvas_size, preview_images
+
+    def _request_pages(self):
+        # 보고 있는 페이지와 다음 한 페이지를 래스터화합니다. 문서 렌더링 중이면 그 결과가 온 뒤에 다시 호출됩니다.
+        if not self.pdf_buffer or self.preview_document_pending:
+            return
+        wanted = [page_num for page_num in (self.current_page, self.current_page + 1)
+                  if page_num < self.preview_page_count and page_num not in self.preview_images]
+        if not wanted:
+            return
+        pdf_buffer, canvas_size = self.pdf_buffer, self.preview_raster_size
+        self.preview_worker.submit(lambda is_cancelled: self._rasterize_pages(pdf_buffer, canvas_size, wanted, is_cancelled))
+        if not self.preview_poll_id:
+            self.preview_poll_id = self.root.after(20, self._poll_preview)
+
+    def _trim_preview_images(self):
+        # 보고 있는 페이지와 앞뒤 한 페이지만 들고 있고, 나머지는 크기 제한이 있는 page_cache 에 맡깁니다.
+        for page_num in [page_num for page_num in self.preview_images if abs(page_num - self.current_page) > 1]:
+            del self.preview_images[page_num]
+
+    def _schedule_canvas_rasterize(self):
+        # 창 크기 조절이 끝난 뒤(150ms) 새 캔버스 크기로 다시 래스터화합니다.
+        if self.resize_after_id:
+            self.root.after_cancel(self.resize_after_id)
+        self.resize_after_id = self.root.after(150, self._rasterize_for_canvas)
+
+    def _rasterize_for_canvas(self):
+        self.resize_after_id = None
+        if not self.pdf_buffer or self.after_id or self.preview_worker.busy:
+            return # 곧 게시될 렌더링 결과가 다시 크기를 확인합니다
+        pdf_buffer = self.pdf_buffer
+        canvas_size = self._preview_canvas_size()
+        if canvas_size == self.preview_raster_size:
+            return
+        page_nums = [self.current_page]
+        self.preview_submitted_at = time.perf_counter()
+        self.preview_document_pending = True
+        self.preview_worker.submit(lambda is_cancelled: self._rasterize_pages(pdf_buffer, canvas_size, page_nums, is_cancelled))
+        if not self.preview_poll_id:
+            self.preview_poll_id = self.root.after(20, self._poll_preview)
+
+    def _poll_preview(self):
+        self.preview_poll_id = None
+        result = self.preview_worker.poll()
+        if result:
+            preview, error = result
+            document_result, self.preview_document_pending = self.preview_document_pending, False
+            if error:
+                self.preview_current = False
+                self._show_preview_error(error)
+            else:
+                pdf_buffer, page_count, canvas_size, preview_images = preview
+                self.preview_current = True # 최신 작업의 결과만 게시되므로 입력 내용과 같은 문서
+                if pdf_buffer is not self.pdf_buffer or canvas_size != self.preview_raster_size:
+                    if pdf_buffer is not self.pdf_buffer or self.current_page >= page_count:
+                        self.current_page = 0 # 새 문서면 첫 페이지부터, 크기만 바뀌었으면 보던 페이지 유지
+                    self.pdf_buffer, self.preview_raster_size, self.preview_images = pdf_buffer, canvas_size, {}
+                self.preview_page_count = page_count
+                self.preview_images.update(preview_images)
+                self._trim_preview_images()
+                if document_result:
+                    self.timings.record("worker_total", time.perf_counter() - self.preview_submitted_at) # 요청부터 결과 수신까지
+                self.update_preview_display()
+                self._request_pages() # 다음 페이지를 미리 래스터화
+                if not self.first_preview_shown:
+                    self.first_preview_shown = True
+                    mark_startup("first preview")
+                    print_startup_report()
+            self._show_font_warning()
+        if self.preview_worker.busy:
+            self.preview_poll_id = self.root.after(20, self._poll_preview)
+
+    def _render_pdf_now(self):
+        # 저장 직전에 미리보기가 최신이 아니면 메인 스레드에서 바로 렌더링합니다.
+        if self.preview_current and not self.after_id and not self.preview_worker.busy:
+            return self.pdf_buffer
+        if self.after_id:
+            self.root.after_cancel(self.after_id)
+            self.after_id = None
+        self.preview_worker.cancel()
+        self.preview_document_pending = False
+        pdf_buffer = io.BytesIO()
+        doc_type_text = self.i18n[self.language.get()][self.doc_type.get()]
+        if not self._draw_pdf(pdf_buffer, doc_type_text):
+            return None
+        if PREVIEW_ENABLED:
+            # 방금 그린 PDF 를 래스터화만 해서 미리보기에 표시합니다 (문서를 다시 렌더링하지 않음).
+            canvas_size = self._preview_canvas_size()
+            self.preview_submitted_at = time.perf_counter()
+            self.preview_document_pending = True
+            self.preview_worker.submit(lambda is_cancelled: self._rasterize_pages(pdf_buffer, canvas_size, [0], is_cancelled))
+            if not self.preview_poll_id:
+                self.preview_poll_id = self.root.after(20, self._poll_preview)
+        else:
+            self.pdf_buffer = pdf_buffer
+        return pdf_buffer
 
     def update_preview_display(self):
-        if not self.preview_images: return
+        if not self.preview_page_count: return
+        self._update_page_controls()
+        if self.current_page not in self.preview_images:
+            return # 아직 래스터화하지 않은 페이지: 준비되면 다시 호출됩니다
+        with self.timings.span("display"):
+            self._update_preview_image()
+        self._draw_timing_overlay()
+
+    def _update_page_controls(self):
+        lang = self.language.get()
+        t = self.i18n[lang]
+        self.page_label.config(text=f"{t['page']} {self.current_page + 1} {t['of']} {self.preview_page_count}")
+        self.prev_button.config(state=tk.NORMAL if self.current_page > 0 else tk.DISABLED)
+        self.next_button.config(state=tk.NORMAL if self.current_page < self.preview_page_count - 1 else tk.DISABLED)
+
+    def _update_preview_image(self):
         canvas_width = self.preview_canvas.winfo_width()
         canvas_height = self.preview_canvas.winfo_height()
         img = self.preview_images[self.current_page]
-        img_ratio = img.width / img.height
-        canvas_ratio = canvas_width / canvas_height
-        if img_ratio > canvas_ratio:
-            new_width = canvas_width
-            new_height = int(new_width / img_ratio)
-        else:
-            new_height = canvas_height
-            new_width = int(new_height * img_ratio)
-        resized_img = img.resize((new_width, new_height), Image.LANCZOS)
-        self.photo_image = ImageTk.PhotoImage(resized_img)
+        if self.preview_raster_size != (canvas_width, canvas_height):
+            # 창 크기 조절 중에는 빠른 임시 배율로만 표시하고, 정확한 래스터화는 작업자에게 맡깁니다.
+            with self.timings.span("resize"):
+                img = img.resize(fit_size(img.width, img.height, canvas_width, canvas_height), Image.NEAREST)
+            self._schedule_canvas_rasterize()
+        with self.timings.span("photoimage"):
+            self.photo_image = ImageTk.PhotoImage(img)
         self.preview_canvas.delete("all")
         self.preview_canvas.create_image(canvas_width/2, canvas_height/2, anchor=tk.CENTER, image=self.photo_image)
-        lang = self.language.get()
-        t = self.i18n[lang]
-        self.page_label.config(text=f"{t['page']} {self.current_page + 1} {t['of']} {len(self.preview_images)}")
-        self.prev_button.config(state=tk.NORMAL if self.current_page > 0 else tk.DISABLED)
-        self.next_button.config(state=tk.NORMAL if self.current_page < len(self.preview_images) - 1 else tk.DISABLED)
+
+    def _show_preview_error(self, error):
+        # 미리보기를 만들지 못하면 미리보기 영역에 이유를 표시합니다. 다음 미리보기가 성공하면 지워집니다.
+        t = self.i18n[self.language.get()]
+        canvas_width = self.preview_canvas.winfo_width()
+        canvas_height = self.preview_canvas.winfo_height()
+        self.preview_canvas.delete("all")
+        self.preview_canvas.create_text(canvas_width/2, canvas_height/2, anchor=tk.CENTER, justify=tk.CENTER, width=max(canvas_width - 40, 100),
+                                        text=f"{t['preview_failed']}\n{error}", fill="#B00020")
+        self._draw_timing_overlay()
+
+    def _draw_timing_overlay(self):
+        self.preview_canvas.delete("timing_overlay")
+        if not self.show_timing_overlay:
+            return
+        text = "\n".join(self.timings.format_lines())
+        item = self.preview_canvas.create_text(8, 8, anchor=tk.NW, text=text, font=("Consolas", 9), fill="#202020", tags="timing_overlay")
+        x1, y1, x2, y2 = self.preview_canvas.bbox(item)
+        background = self.preview_canvas.create_rectangle(x1 - 4, y1 - 4, x2 + 4, y2 + 4, fill="#FFFFE0", outline="#808080", tags="timing_overlay")
+        self.preview_canvas.tag_lower(background, item)
+
+    def toggle_timing_overlay(self, event=None):
+        self.show_timing_overlay = not self.show_timing_overlay
+        self._draw_timing_overlay()
+
+    def dump_timings(self, event=None):
+        try:
+            if self.timings.dump(PREVIEW_TIMING_LOG):
+                print(f"DEBUG: Preview timings written to {os.path.abspath(PREVIEW_TIMING_LOG)}")
+        except OSError as e:
+            print(f"DEBUG: Error writing preview timings: {e}")
 
     def show_previous_page(self):
         if self.current_page > 0:
             self.current_page -= 1
-            self.update_preview_display()
+            self._show_current_page()
 
     def show_next_page(self):
-        if self.current_page < len(self.preview_images) - 1:
+        if self.current_page < self.preview_page_count - 1:
             self.current_page += 1
-            self.update_preview_display()
+            self._show_current_page()
+
+    def _show_current_page(self):
+        self._trim_preview_images()
+        self.update_preview_display()
+        self._request_pages() # 보고 있는 페이지가 없으면 래스터화하고, 다음 페이지를 미리 준비
 
     def save_pdf_from_preview(self):
         lang = self.language.get()
         t = self.i18n[lang]
-        if not self.pdf_buffer:
-            messagebox.showerror("Error", t["error_preview"] + " (PDF buffer is empty)")
-            print("DEBUG: PDF buffer is empty.")
-            return
         save_dir = self.save_path.get()
         if not save_dir:
             messagebox.showerror("Error", t["error_path"])
             print("DEBUG: Save directory is empty.")
             return
+        self._issue_doc_number()
+        pdf_buffer = self._render_pdf_now()
+        if not pdf_buffer:
+            messagebox.showerror("Error", t["error_preview"] + " (PDF buffer is empty)")
+            print("DEBUG: PDF buffer is empty.")
+            return
         customer_name = self.customer_name.get()
         doc_type_key = self.doc_type.get()
         doc_type_text = self.i18n[lang][doc_type_key]
 
-        # 파일 이름 정리 (특수 문자 제거)
-        safe_customer_name = "".join(c for c in customer_name if c.isalnum() or c.isspace()).strip()
-        if not safe_customer_name:
-            safe_customer_name = "Untitled" # 고객 이름이 비어있을 경우 기본값
-
-        safe_doc_type_text = "".join(c for c in doc_type_text if c.isalnum() or c.isspace()).strip()
-        if not safe_doc_type_text:
-            safe_doc_type_text = "Document" # 문서 종류가 비어있을 경우 기본값
-
-        base_file_name = self.filename_var.get().strip()
-        if not base_file_name:
-            base_file_name = f"{safe_customer_name}_{safe_doc_type_text}"
-
-        if self.add_date_prefix.get():
-            date_prefix = datetime.now().strftime('%Y%m%d_')
-            file_name = f"{date_prefix}{base_file_name}.pdf"
-        else:
-            file_name = f"{base_file_name}.pdf"
+        file_name = make_file_name(customer_name, doc_type_text, self.filename_var.get(), self.add_date_prefix.get())
         file_path = os.path.join(save_dir, file_name)
         print(f"DEBUG: Attempting to save PDF to: {file_path}")
         try:
-            with open(file_path, "wb") as f:
-                f.write(self.pdf_buffer.getvalue())
+            with open(file_path, "wb") as f, pdf_buffer.getbuffer() as view:
+                f.write(view) # 버퍼를 복사하지 않고 그대로 씀
             messagebox.showinfo("Success", f"{doc_type_text} {t['success_save']}\n{file_path}")
             print(f"DEBUG: PDF successfully saved to {file_path}")
+            self._show_next_doc_number() # 다음 문서는 새 번호로
         except Exception as e:
             messagebox.showerror("Error", f"{t['error_save']}\n{e}")
             print(f"DEBUG: Error saving PDF: {e}")
@@ -1542,5 +1395,7 @@ if __name__ == '__main__':
     if not PREVIEW_ENABLED:
         messagebox.showwarning("Dependency Missing", "PyMuPDF or Pillow is not installed.\nPreview functionality will be disabled.")
     app = InvoiceGenerator(root)
-    root.after(100, app.generate_preview) # 100ms 지연 후 미리보기 생성
-    root.mainloop()
\ No newline at end of file
+    root.after_idle(mark_startup, "interactive") # 첫 화면이 그려지고 입력을 받을 수 있는 시점
+    if not PREVIEW_ENABLED:
+        root.after_idle(print_startup_report)
+    root.mainloop()
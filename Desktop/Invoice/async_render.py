@@ -0,0 +1,104 @@
+# asyncio 렌더링 API
+#
+# 사용 예:
+#   async with AsyncRenderer(max_concurrency=4, timeout=20) as renderer:
+#       file_name, pdf_bytes = await renderer.render(spec)           # spec: batch.py JSONL 한 줄과 같은 구조
+#       images = await renderer.rasterize(pdf_bytes, (600, 850))     # 페이지별 PIL 이미지 (미리보기 배율)
+#
+# doc_number 가 없는 문서에는 문서 번호 데이터베이스(doc_numbers.db)에서 번호를 받아 붙이므로, 동시에 렌더링해도
+# 번호가 겹치지 않습니다 (allocator 로 다른 DocNumberAllocator 를 줄 수 있음).
+# 레이아웃(reportlab)과 래스터화(PyMuPDF)는 실행기(기본값: 작업자 프로세스)에서 하므로 이벤트 루프를 막지 않습니다.
+# 작업자는 batch.init_worker 로 시작하여 GUI/일괄 생성과 같은 글꼴 등록, 렌더 캐시, 페이지 템플릿을 사용합니다.
+# 동시에 실행기에 넘기는 작업은 max_concurrency 개로 제한하며, 나머지는 자리가 날 때까지 기다립니다.
+# timeout(초)은 기다리는 시간을 포함하고, 넘으면 asyncio.TimeoutError 가 발생합니다. 호출한 작업이 취소되거나
+# 시간이 넘으면 아직 시작하지 않은 작업은 취소되며, 이미 실행 중인 작업은 끝날 때까지 자리를 차지합니다.
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from batch import init_worker, render_job_bytes, load_number_format
+from doc_numbers import DocNumberAllocator, DOC_NUMBER_DB, parse_doc_date
+from preview_cache import fit_zoom
+from render_cache import RENDER_CACHE_DIR, DEFAULT_MAX_BYTES
+
+DEFAULT_TIMEOUT = 30 # 작업 하나를 기다리는 최대 시간(초), None 이면 제한 없음
+
+
+def rasterize_pages(pdf_bytes, canvas_size):
+    # 실행기에서 실행됩니다. 미리보기와 같은 배율(캔버스에 맞춤)로 페이지별 RGB 이미지를 만듭니다.
+    import fitz
+    from PIL import Image
+    with fitz.open(stream=pdf_bytes, filetype="pdf") as pdf_document:
+        images = []
+        for page in pdf_document:
+            zoom = fit_zoom(page.rect, canvas_size)
+            pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False)
+            images.append(Image.frombytes("RGB", [pix.width, pix.height], pix.samples))
+        return images
+
+
+class AsyncRenderer:
+    def __init__(self, max_concurrency=None, timeout=DEFAULT_TIMEOUT, executor=None, cache_dir=RENDER_CACHE_DIR, cache_bytes=DEFAULT_MAX_BYTES, allocator=None):
+        # executor 를 주면 그 실행기를 사용하고 닫지 않습니다 (스레드 실행기라면 호출하는 쪽에서 글꼴을 등록해 두세요).
+        # allocator 를 주지 않으면 settings.json 의 번호 형식으로 doc_numbers.db 를 열고, close() 에서 닫습니다.
+        self.max_concurrency = max_concurrency or os.cpu_count() or 1
+        self.timeout = timeout
+        self._owns_allocator = allocator is None
+        self.allocator = allocator or DocNumberAllocator(DOC_NUMBER_DB, load_number_format())
+        self._owns_executor = executor is None
+        if executor is None:
+            executor = ProcessPoolExecutor(max_workers=self.max_concurrency, initializer=init_worker, initargs=(cache_dir, cache_bytes))
+        self._executor = executor
+        self._slots = asyncio.Semaphore(self.max_concurrency)
+
+    async def render(self, spec, timeout=None):
+        # (파일 이름, PDF 바이트). 문서 데이터가 잘못되었으면 작업자에서 발생한 ValueError 등이 그대로 전달됩니다.
+        if not spec.get("doc_number"):
+            # 번호 발급(SQLite)도 이벤트 루프를 막지 않도록 기본 스레드 실행기에서 합니다.
+            loop = asyncio.get_running_loop()
+            doc_number = await loop.run_in_executor(None, self.allocator.allocate, parse_doc_date(spec.get("doc_date")))
+            spec = dict(spec, doc_number=doc_number)
+        return await self._run(timeout, render_job_bytes, spec, False)
+
+    async def rasterize(self, pdf_bytes, canvas_size, timeout=None):
+        return await self._run(timeout, rasterize_pages, pdf_bytes, canvas_size)
+
+    async def close(self):
+        if self._owns_executor:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, lambda: self._executor.shutdown(wait=True, cancel_futures=True))
+        if self._owns_allocator:
+            self.allocator.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def _run(self, timeout, func, *args):
+        timeout = self.timeout if timeout is None else timeout
+        return await asyncio.wait_for(self._submit(func, *args), timeout)
+
+    async def _submit(self, func, *args):
+        await self._slots.acquire()
+        loop = asyncio.get_running_loop()
+        try:
+            future = self._executor.submit(func, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        # 자리는 실행기 작업이 실제로 끝날 때(또는 시작 전에 취소될 때) 돌려줍니다.
+        future.add_done_callback(lambda _: self._release_from(loop))
+        try:
+            return await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+
+    def _release_from(self, loop):
+        # 실행기 스레드에서 호출될 수 있으므로 이벤트 루프에서 자리를 돌려줍니다.
+        try:
+            loop.call_soon_threadsafe(self._slots.release)
+        except RuntimeError:
+            pass # 이벤트 루프가 이미 닫힘
@@ -0,0 +1,270 @@
+# 청구서/견적서 일괄 생성 (CSV / JSONL -> PDF)
+#
+# 사용 예:
+#   python batch.py invoices.csv -o out
+#   python batch.py invoices.jsonl -o out --jobs 8
+#   python batch.py invoices.jsonl --zip month_end.zip       # PDF 를 ZIP 파일 하나로
+#   python batch.py invoices.jsonl --merge month_end.pdf     # 인쇄용으로 PDF 하나에 모두 이어 붙임
+#
+# JSONL 은 한 줄에 문서 하나이며, GUI 가 만드는 것과 같은 구조를 사용합니다:
+#   {"lang": "ko", "doc_type": "invoice", "customer": {"name": ...}, "issuer": {...},
+#    "items": [{"name": ..., "quantity": ..., "unit_price": ...}], "file_name": "..."}
+# CSV 는 customer_name, issuer_email, colors_primary 처럼 "<구역>_<필드>" 열을 사용하고,
+# items 열에는 품목 목록을 JSON 문자열로 넣습니다. 색상 열은 색상 이름에서 "_color" 를 뺀
+# colors_primary, colors_secondary, colors_text, colors_light_text, colors_border 입니다.
+# doc_number 가 비어 있는 문서는 문서 번호 데이터베이스(doc_numbers.db)에서 블록 단위로 받은 번호를
+# 주 프로세스에서 붙여 작업자에 넘기므로, 작업자 수와 관계없이 번호가 겹치지 않습니다.
+# 이때 입력 행마다 발급한 번호와 발급일을 기록해 두어, 같은 입력을 다시 실행하면 같은 번호/날짜를 사용합니다.
+# 렌더링 결과는 렌더 캐시(cache/renders)에 보관하므로, 다시 실행하면 바뀐 문서만 새로 렌더링합니다.
+import argparse
+import csv
+import hashlib
+import io
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+import render_engine
+from invoice_data import DEFAULT_COLORS, CUSTOMER_FIELDS, ISSUER_FIELDS, build_document, make_file_name
+from batch_output import open_sink
+from render_cache import RenderCache, RENDER_CACHE_DIR, DEFAULT_MAX_BYTES
+from doc_numbers import DocNumberAllocator, DocNumberPool, DOC_NUMBER_DB, DEFAULT_FORMAT, DEFAULT_BLOCK_SIZE
+
+SECTION_FIELDS = {
+    "customer": CUSTOMER_FIELDS,
+    "issuer": ISSUER_FIELDS,
+    "colors": tuple(DEFAULT_COLORS)
+}
+
+
+def csv_color_column(key):
+    # "primary_color" -> "colors_primary"
+    return f"colors_{key[:-len('_color')] if key.endswith('_color') else key}"
+
+
+def _spec_from_csv_row(row):
+    spec = {key: row.get(key) or "" for key in ("lang", "doc_type", "doc_number", "doc_date", "file_name")}
+    for section, fields in SECTION_FIELDS.items():
+        if section == "colors":
+            # 값이 있는 열만 (나머지는 기본 색상). 예전 열 이름(primary_color 등)도 읽습니다.
+            colors = {key: row.get(csv_color_column(key)) or row.get(key) for key in fields}
+            spec[section] = {key: value for key, value in colors.items() if value}
+        else:
+            spec[section] = {key: row.get(f"{section}_{key}") or "" for key in fields}
+    spec["items"] = json.loads(row["items"]) if row.get("items") else []
+    return spec
+
+
+def iter_jobs(path, input_format=None):
+    # 입력 파일을 한 줄씩 읽어 (줄 번호, 문서 데이터 또는 오류) 를 돌려줍니다.
+    if input_format is None:
+        input_format = "jsonl" if path.lower().endswith((".jsonl", ".json")) else "csv"
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        if input_format == "csv":
+            for line_no, row in enumerate(csv.DictReader(f), start=2):
+                try:
+                    yield line_no, _spec_from_csv_row(row)
+                except ValueError as e:
+                    yield line_no, e
+        else:
+            for line_no, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    spec = json.loads(line)
+                except ValueError as e:
+                    yield line_no, e
+                    continue
+                if isinstance(spec, dict):
+                    yield line_no, spec
+                else: # 배열, 숫자 등은 문서가 아니므로 이 줄만 실패로 처리
+                    yield line_no, ValueError(f"expected a JSON object, got {type(spec).__name__}")
+
+
+def row_digest(input_path, spec):
+    # 입력 행 내용의 해시 (입력 파일 이름 포함). 내용이 바뀐 행은 새 문서로 보고 새 번호를 받습니다.
+    text = json.dumps(spec, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(f"{os.path.basename(input_path)}\0{text}".encode("utf-8")).hexdigest()
+
+
+_render_cache = None # 작업자 프로세스의 렌더 캐시 (init_worker 에서 엶)
+
+
+def init_worker(cache_dir=None, cache_bytes=DEFAULT_MAX_BYTES):
+    # 작업자 프로세스마다 글꼴을 한 번만 등록하고, 렌더 캐시를 엽니다 (cache_dir 이 None 이면 사용 안 함).
+    global _render_cache
+    render_engine.register_fonts()
+    if cache_dir:
+        try:
+            _render_cache = RenderCache(cache_dir, cache_bytes)
+        except Exception as e:
+            print(f"DEBUG: Render cache disabled: {e}", file=sys.stderr)
+
+
+def _render(spec, add_date_prefix):
+    # (파일 이름, PDF) - PDF 는 캐시에서 읽은 bytes 이거나 렌더링한 버퍼의 memoryview (복사하지 않음)
+    data = build_document(spec)
+    base_file_name = spec.get("file_name") or f"{data['doc_number']}_{data['customer']['name']}"
+    file_name = make_file_name(data["customer"]["name"], data["doc_type_text"], base_file_name, add_date_prefix)
+    if _render_cache is not None:
+        return file_name, _render_cache.render(data)
+    buffer = io.BytesIO()
+    render_engine.draw_pdf(buffer, data)
+    return file_name, buffer.getbuffer()
+
+
+def render_job(spec, output_dir, add_date_prefix):
+    # 작업자 프로세스에서 실행됩니다. PDF 는 작업자가 직접 파일로 씁니다.
+    file_name, pdf = _render(spec, add_date_prefix)
+    file_path = os.path.join(output_dir, file_name)
+    with open(file_path, "wb") as f:
+        f.write(pdf)
+    return file_path
+
+
+def render_job_bytes(spec, add_date_prefix):
+    # 작업자 프로세스에서 실행됩니다. 파일 이름과 PDF 를 주 프로세스에 돌려주어 sink(ZIP/병합 PDF)에 기록합니다.
+    file_name, pdf = _render(spec, add_date_prefix)
+    return file_name, bytes(pdf)
+
+
+def load_number_format(settings_path="settings.json"):
+    # GUI 와 같은 settings.json 의 "doc_number_format" 을 사용합니다.
+    try:
+        with open(settings_path, "r", encoding="utf-8") as f:
+            return json.load(f).get("doc_number_format") or DEFAULT_FORMAT
+    except (OSError, ValueError, AttributeError):
+        return DEFAULT_FORMAT
+
+
+def run_batch(input_path, output_dir, jobs=None, input_format=None, add_date_prefix=False, max_pending=None, log=sys.stderr, numbers=None, sink=None, cache_dir=RENDER_CACHE_DIR, cache_bytes=DEFAULT_MAX_BYTES):
+    # 처리 결과를 (성공 수, 실패 목록) 으로 반환합니다. 실패 목록은 (줄 번호, 오류 메시지) 입니다.
+    # numbers(DocNumberPool) 를 주면 doc_number 가 없는 문서에 번호를 붙입니다.
+    # sink(batch_output.ZipSink/MergedPdfSink) 를 주면 output_dir 대신 sink 에 입력 순서대로 기록합니다.
+    # cache_dir 이 None 이면 렌더 캐시를 사용하지 않습니다.
+    jobs = jobs or os.cpu_count() or 1
+    max_pending = max_pending or jobs * 4 # 입력을 한꺼번에 읽지 않도록 대기 작업 수를 제한
+    if sink is None:
+        os.makedirs(output_dir, exist_ok=True)
+
+    succeeded = 0
+    failures = []
+    pending = {} # future -> (제출 순서, 줄 번호)
+    ready = {} # 제출 순서 -> (줄 번호, (파일 이름, PDF) 또는 None): 앞선 문서를 기다리는 결과
+    next_seq = 0 # sink 에 다음으로 기록할 제출 순서
+    occurrences = {} # 행 내용 해시 -> 지금까지 나온 횟수 (같은 내용의 행을 구분)
+
+    def fail(line_no, e):
+        failures.append((line_no, f"{type(e).__name__}: {e}"))
+        print(f"[{line_no}] FAILED: {type(e).__name__}: {e}", file=log)
+
+    def collect(done):
+        nonlocal succeeded
+        for future in done:
+            seq, line_no = pending.pop(future)
+            try:
+                result = future.result()
+            except Exception as e:
+                fail(line_no, e)
+                result = None
+            if sink is None:
+                succeeded += result is not None
+            else:
+                ready[seq] = (line_no, result)
+        write_ready()
+
+    def write_ready():
+        nonlocal succeeded, next_seq
+        while next_seq in ready: # 결과는 끝나는 대로 받되, 기록은 입력 순서대로
+            line_no, result = ready.pop(next_seq)
+            next_seq += 1
+            if result is None:
+                continue
+            try:
+                sink.add(*result)
+                succeeded += 1
+            except Exception as e:
+                fail(line_no, e)
+
+    with ProcessPoolExecutor(max_workers=jobs, initializer=init_worker, initargs=(cache_dir, cache_bytes)) as executor:
+        for seq, (line_no, spec) in enumerate(iter_jobs(input_path, input_format)):
+            if isinstance(spec, Exception):
+                fail(line_no, spec)
+                if sink is not None:
+                    ready[seq] = (line_no, None) # 순서를 건너뛰도록 빈 결과로 표시
+                    write_ready()
+                continue
+            while len(pending) + len(ready) >= max_pending: # 기록을 기다리는 결과도 메모리에 있으므로 함께 셈
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                collect(done)
+            if numbers is not None and not (spec.get("doc_number") and spec.get("doc_date")):
+                digest = row_digest(input_path, spec)
+                occurrence = occurrences.get(digest, 0)
+                occurrences[digest] = occurrence + 1
+                spec["doc_number"], doc_date = numbers.issue(f"{digest}:{occurrence}", spec.get("doc_number"), spec.get("doc_date"))
+                spec["doc_date"] = spec.get("doc_date") or doc_date
+            if sink is None:
+                future = executor.submit(render_job, spec, output_dir, add_date_prefix)
+            else:
+                future = executor.submit(render_job_bytes, spec, add_date_prefix)
+            pending[future] = (seq, line_no)
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            collect(done)
+
+    failures.sort()
+    return succeeded, failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="CSV/JSONL 파일로 청구서/견적서 PDF를 일괄 생성합니다.")
+    parser.add_argument("input", help="입력 파일 (.csv 또는 .jsonl)")
+    parser.add_argument("-o", "--output-dir", default="output", help="PDF 저장 폴더 (기본값: output)")
+    output_group = parser.add_mutually_exclusive_group()
+    output_group.add_argument("--zip", dest="zip_path", default=None, help="PDF 를 폴더 대신 이 ZIP 파일 하나에 저장")
+    output_group.add_argument("--merge", dest="merge_path", default=None, help="모든 문서를 이 PDF 파일 하나에 이어 붙여 저장")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="작업자 프로세스 수 (기본값: CPU 코어 수)")
+    parser.add_argument("--format", dest="input_format", choices=("csv", "jsonl"), default=None, help="입력 형식 (기본값: 확장자로 판단)")
+    parser.add_argument("--date-prefix", action="store_true", help="파일 이름에 날짜 접두사 추가 (YYYYMMDD_)")
+    parser.add_argument("--cache-dir", default=RENDER_CACHE_DIR, help=f"렌더 캐시 폴더 (기본값: {RENDER_CACHE_DIR})")
+    parser.add_argument("--cache-size", type=int, default=DEFAULT_MAX_BYTES // (1024 * 1024), help="렌더 캐시 최대 크기 MB (기본값: %(default)s)")
+    parser.add_argument("--no-cache", action="store_true", help="렌더 캐시를 사용하지 않음")
+    parser.add_argument("--number-db", default=DOC_NUMBER_DB, help=f"문서 번호 데이터베이스 (기본값: {DOC_NUMBER_DB})")
+    parser.add_argument("--number-format", default=None, help="문서 번호 형식 (기본값: settings.json 의 doc_number_format 또는 " + DEFAULT_FORMAT.replace("%", "%%") + ")")
+    parser.add_argument("--number-block", type=int, default=DEFAULT_BLOCK_SIZE, help=f"한 번에 받아 두는 문서 번호 수 (기본값: {DEFAULT_BLOCK_SIZE})")
+    args = parser.parse_args(argv)
+
+    if not render_engine.fonts_available():
+        print("Font Warning: Malgun Gothic font not found. PDF text may not display correctly.", file=sys.stderr)
+
+    try:
+        allocator = DocNumberAllocator(args.number_db, args.number_format or load_number_format())
+    except ValueError as e:
+        parser.error(str(e))
+    started = time.perf_counter()
+    try:
+        numbers = DocNumberPool(allocator, max(args.number_block, 1))
+        sink = open_sink(args.zip_path, args.merge_path)
+        try:
+            succeeded, failures = run_batch(
+                args.input, args.output_dir, args.jobs, args.input_format, args.date_prefix, numbers=numbers, sink=sink,
+                cache_dir=None if args.no_cache else args.cache_dir, cache_bytes=args.cache_size * 1024 * 1024
+            )
+        finally:
+            if sink is not None:
+                sink.close()
+            numbers.flush()
+    finally:
+        allocator.close()
+    elapsed = time.perf_counter() - started
+    destination = args.zip_path or args.merge_path or args.output_dir
+    print(f"{succeeded} succeeded, {len(failures)} failed in {elapsed:.2f}s -> {os.path.abspath(destination)}")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -0,0 +1,96 @@
+# 일괄 생성 결과를 하나의 파일로 모으기
+# ZipSink 는 PDF 를 ZIP 파일 하나에, MergedPdfSink 는 모든 페이지를 PDF 하나에 이어 붙입니다.
+# 문서는 작업자가 끝내는 대로 바로 기록하므로, 메모리에는 기록 대기 중인 문서만 남습니다.
+import os
+import zipfile
+
+MERGE_SAVE_EVERY = 50 # 병합 PDF 를 이만큼의 문서마다 디스크에 저장하고 다시 열어 메모리를 비움
+
+
+class ZipSink:
+    def __init__(self, path):
+        self.path = path
+        self._names = set()
+        # PDF 내용은 이미 압축되어 있으므로 다시 압축하지 않습니다.
+        self._zip = zipfile.ZipFile(path, "w", compression=zipfile.ZIP_STORED, allowZip64=True)
+
+    def add(self, file_name, data):
+        name = self._unique_name(file_name)
+        with self._zip.open(name, "w", force_zip64=True) as entry:
+            entry.write(data)
+        return name
+
+    def close(self):
+        self._zip.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _unique_name(self, file_name):
+        # 같은 이름이 있으면 "이름 (2).pdf" 처럼 번호를 붙입니다.
+        base, ext = os.path.splitext(file_name)
+        name, n = file_name, 1
+        while name in self._names:
+            n += 1
+            name = f"{base} ({n}){ext}"
+        self._names.add(name)
+        return name
+
+
+class MergedPdfSink:
+    def __init__(self, path, save_every=MERGE_SAVE_EVERY):
+        import fitz # PyMuPDF 는 병합할 때만 필요
+        self._fitz = fitz
+        self.path = path
+        self.save_every = save_every
+        self._doc = None
+        self._unsaved = 0 # 마지막 저장 이후 추가한 문서 수
+        self.documents = 0
+
+    def add(self, file_name, data):
+        fitz = self._fitz
+        with fitz.open(stream=data, filetype="pdf") as source:
+            if self._doc is None:
+                self._doc = fitz.open()
+            self._doc.insert_pdf(source)
+        self.documents += 1
+        self._unsaved += 1
+        if self._unsaved >= self.save_every:
+            self._save()
+        return file_name
+
+    def close(self):
+        if self._doc is None:
+            return
+        if self._unsaved:
+            self._save()
+        self._doc.close()
+        self._doc = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _save(self):
+        # 처음에는 새 파일로 저장하고, 이후에는 덧붙여 저장(incremental)합니다. 저장한 뒤 파일에서 다시 열어
+        # 이미 기록한 페이지 객체를 메모리에서 내려놓습니다.
+        if self._doc.name:
+            self._doc.saveIncr()
+        else:
+            self._doc.save(self.path, garbage=0, deflate=True)
+        self._doc.close()
+        self._doc = self._fitz.open(self.path)
+        self._unsaved = 0
+
+
+def open_sink(zip_path=None, merge_path=None):
+    if zip_path:
+        return ZipSink(zip_path)
+    if merge_path:
+        return MergedPdfSink(merge_path)
+    return None
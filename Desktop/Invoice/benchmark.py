@@ -0,0 +1,229 @@
+# 렌더링/래스터화/저장 성능 측정
+#
+# 사용 예:
+#   python benchmark.py                              # 기본 측정 후 benchmark_results.json 저장
+#   python benchmark.py --save-baseline              # 결과를 기준값(benchmark_baseline.json)으로 저장
+#   python benchmark.py --baseline benchmark_baseline.json --threshold 0.25
+#   python benchmark.py --items 1,100 --langs ko --repeat 5
+#
+# 품목 수 x 언어 x 문서 종류마다 미리보기/저장과 같은 경로를 측정합니다:
+#   render     - render_engine.draw_pdf (GUI 의 _draw_pdf / 미리보기 작업자와 같은 호출)
+#   rasterize  - fitz.open + 페이지별 get_pixmap + Image.frombytes (미리보기 캔버스 배율)
+#   save       - PDF 바이트를 파일로 쓰기 (save_pdf_from_preview 와 같은 방식)
+# 시간은 반복 중 가장 짧은 값을 사용합니다. 기준값보다 threshold 비율 이상 나빠진 항목이 있으면
+# 종료 코드 1 을 돌려줍니다.
+import argparse
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import render_engine
+from invoice_data import build_document
+from preview_cache import fit_zoom
+
+try:
+    import fitz
+    from PIL import Image
+    RASTERIZE_ENABLED = True
+except ImportError:
+    RASTERIZE_ENABLED = False
+
+DEFAULT_ITEM_COUNTS = (1, 10, 100, 1000, 10000)
+DEFAULT_LANGS = ("ko", "en")
+DEFAULT_DOC_TYPES = ("invoice", "quote")
+DEFAULT_CANVAS_SIZE = (600, 850) # 미리보기 캔버스 기본 크기
+DEFAULT_RESULTS = "benchmark_results.json"
+DEFAULT_BASELINE = "benchmark_baseline.json"
+DEFAULT_THRESHOLD = 0.25 # 기준값보다 25% 이상 나빠지면 회귀
+MIN_TIME_DELTA = 0.005 # 이보다 작은 시간 차이(초)는 측정 오차로 보고 무시
+
+TIME_METRICS = ("render_seconds", "rasterize_seconds", "save_seconds")
+SIZE_METRICS = ("pdf_bytes", "peak_memory_bytes")
+
+
+def make_spec(item_count, lang, doc_type):
+    # 측정용 문서. 품목 이름 길이와 금액 자릿수가 실제 문서와 비슷하도록 만듭니다.
+    unit_price = "19.99" if lang == "en" else "15000"
+    return {
+        "lang": lang,
+        "doc_type": doc_type,
+        "doc_number": "BENCH-0001",
+        "doc_date": "2024-01-01",
+        "customer": {"name": "Benchmark Customer", "reg_num": "123-45-67890", "address": "Seoul", "phone": "02-000-0000", "email": "bench@example.com"},
+        "issuer": {"name": "Kim", "title": "Manager", "email": "kim@example.com", "phone": "010-0000-0000"},
+        "items": [{"name": f"Item {i + 1} - service", "quantity": str(i % 9 + 1), "unit_price": unit_price} for i in range(item_count)]
+    }
+
+
+def render(data, fonts):
+    buffer = io.BytesIO()
+    render_engine.draw_pdf(buffer, data, fonts=fonts)
+    return buffer
+
+
+def rasterize(pdf_bytes, canvas_size):
+    # 래스터화된 이미지의 총 바이트 수를 돌려줍니다.
+    pdf_document = fitz.open(stream=pdf_bytes, filetype="pdf")
+    try:
+        raster_bytes = 0
+        for page_num in range(len(pdf_document)):
+            page = pdf_document.load_page(page_num)
+            zoom = fit_zoom(page.rect, canvas_size)
+            pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False)
+            img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
+            raster_bytes += img.width * img.height * len(img.getbands())
+        return raster_bytes
+    finally:
+        pdf_document.close()
+
+
+def save(buffer, file_path):
+    with open(file_path, "wb") as f, buffer.getbuffer() as view:
+        f.write(view) # save_pdf_from_preview 와 같이 복사하지 않고 씀
+
+
+def best_time(func, repeat):
+    best = None
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def run_case(item_count, lang, doc_type, fonts, repeat, canvas_size, work_dir):
+    spec = make_spec(item_count, lang, doc_type)
+    data = build_document(spec)
+    result = {"items": item_count, "lang": lang, "doc_type": doc_type}
+
+    result["render_seconds"], buffer = best_time(lambda: render(data, fonts), repeat)
+    pdf_bytes = buffer.getvalue()
+    result["pdf_bytes"] = len(pdf_bytes)
+
+    if RASTERIZE_ENABLED:
+        result["rasterize_seconds"], result["raster_bytes"] = best_time(lambda: rasterize(pdf_bytes, canvas_size), repeat)
+        with fitz.open(stream=pdf_bytes, filetype="pdf") as pdf_document:
+            result["pages"] = len(pdf_document)
+
+    file_path = os.path.join(work_dir, f"bench_{lang}_{doc_type}_{item_count}.pdf")
+    result["save_seconds"], _ = best_time(lambda: save(buffer, file_path), repeat)
+    os.remove(file_path)
+
+    # 최대 메모리는 시간 측정과 따로 한 번 더 실행하여 잽니다 (tracemalloc 이 실행을 느리게 하므로).
+    # fitz/PIL 내부(C)에서 할당한 메모리는 tracemalloc 에 잡히지 않으므로 raster_bytes 를 함께 봅니다.
+    tracemalloc.start()
+    try:
+        buffer = render(data, fonts)
+        if RASTERIZE_ENABLED:
+            rasterize(buffer.getvalue(), canvas_size)
+        result["peak_memory_bytes"] = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return result
+
+
+def case_key(result):
+    return f"{result['lang']}-{result['doc_type']}-{result['items']}"
+
+
+def run_benchmark(item_counts, langs, doc_types, repeat=3, canvas_size=DEFAULT_CANVAS_SIZE, log=sys.stderr):
+    fonts = render_engine.register_fonts()
+    if not render_engine.fonts_available():
+        print("Font Warning: Malgun Gothic font not found. Results use the fallback fonts.", file=log)
+    results = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        for doc_type in doc_types:
+            for lang in langs:
+                for item_count in item_counts:
+                    result = run_case(item_count, lang, doc_type, fonts, repeat, canvas_size, work_dir)
+                    results.append(result)
+                    print(format_result(result), file=log)
+    return {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "fonts_available": render_engine.fonts_available(),
+        "rasterize_enabled": RASTERIZE_ENABLED,
+        "repeat": repeat,
+        "canvas_size": list(canvas_size),
+        "results": results
+    }
+
+
+def format_result(result):
+    rasterize_ms = f"{result['rasterize_seconds'] * 1000:9.1f}" if "rasterize_seconds" in result else f"{'-':>9}"
+    return (f"{case_key(result):<22} render {result['render_seconds'] * 1000:9.1f}ms  rasterize {rasterize_ms}ms  "
+            f"save {result['save_seconds'] * 1000:7.2f}ms  pdf {result['pdf_bytes'] / 1024:9.1f}KB  "
+            f"peak {result['peak_memory_bytes'] / (1024 * 1024):7.1f}MB")
+
+
+def compare(report, baseline, threshold=DEFAULT_THRESHOLD):
+    # 기준값보다 나빠진 항목 목록: (사례, 항목, 기준값, 현재값)
+    baseline_results = {case_key(result): result for result in baseline.get("results", [])}
+    regressions = []
+    for result in report["results"]:
+        base = baseline_results.get(case_key(result))
+        if base is None:
+            continue
+        for metric in TIME_METRICS + SIZE_METRICS:
+            if metric not in result or metric not in base:
+                continue
+            current, previous = result[metric], base[metric]
+            if current <= previous * (1 + threshold):
+                continue
+            if metric in TIME_METRICS and current - previous < MIN_TIME_DELTA:
+                continue
+            regressions.append((case_key(result), metric, previous, current))
+    return regressions
+
+
+def _parse_list(value, cast=str):
+    return tuple(cast(part) for part in value.split(",") if part.strip())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="PDF 렌더링/미리보기 래스터화/저장 성능을 측정합니다.")
+    parser.add_argument("--items", type=lambda v: _parse_list(v, int), default=DEFAULT_ITEM_COUNTS, help="품목 수 목록 (기본값: 1,10,100,1000,10000)")
+    parser.add_argument("--langs", type=_parse_list, default=DEFAULT_LANGS, help="언어 목록 (기본값: ko,en)")
+    parser.add_argument("--doc-types", type=_parse_list, default=DEFAULT_DOC_TYPES, help="문서 종류 목록 (기본값: invoice,quote)")
+    parser.add_argument("--repeat", type=int, default=3, help="사례마다 반복 횟수, 가장 짧은 시간을 사용 (기본값: 3)")
+    parser.add_argument("-o", "--output", default=DEFAULT_RESULTS, help=f"결과 JSON 파일 (기본값: {DEFAULT_RESULTS})")
+    parser.add_argument("--baseline", default=None, help="비교할 기준값 JSON 파일")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="회귀로 볼 비율 (기본값: 0.25 = 25%%)")
+    parser.add_argument("--save-baseline", nargs="?", const=DEFAULT_BASELINE, default=None, help=f"결과를 기준값으로 저장 (기본값: {DEFAULT_BASELINE})")
+    args = parser.parse_args(argv)
+
+    report = run_benchmark(args.items, args.langs, args.doc_types, max(args.repeat, 1))
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {os.path.abspath(args.output)}")
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline written to {os.path.abspath(args.save_baseline)}")
+
+    if not args.baseline:
+        return 0
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    regressions = compare(report, baseline, args.threshold)
+    for key, metric, previous, current in regressions:
+        change = f"{(current / previous - 1) * 100:+.1f}%" if previous else "new" # 기준값이 0 이면 비율을 계산할 수 없음
+        print(f"REGRESSION {key} {metric}: {previous:.6g} -> {current:.6g} ({change})")
+    if regressions:
+        print(f"{len(regressions)} regression(s) beyond {args.threshold * 100:.0f}% against {args.baseline}")
+        return 1
+    print(f"No regressions beyond {args.threshold * 100:.0f}% against {args.baseline}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,152 @@
+# 문서 번호 발급 (SQLite)
+# 문서 번호를 형식 문자열과 순번으로 만듭니다. 순번은 데이터베이스에 보관하며, 발급은
+# BEGIN IMMEDIATE 트랜잭션 안에서 하므로 여러 프로세스(GUI, 일괄 생성 작업자)가 동시에 발급해도
+# 같은 번호가 나오지 않습니다. 발급한 번호는 다시 쓰지 않습니다 (사용하지 않은 번호는 건너뜀).
+#
+# 형식 문자열에는 {seq} 가 꼭 있어야 하고 {date} 에 날짜 형식을 줄 수 있습니다 (settings.json 의 "doc_number_format"):
+#   "{date:%Y%m%d}-{seq:04d}"    -> 20240105-0001 (날짜마다 1부터)
+#   "INV-{date:%Y}-{seq:05d}"    -> INV-2024-00001 (연도마다 1부터)
+#   "{seq:06d}"                  -> 000001 (계속 증가)
+# 순번은 {seq} 를 뺀 나머지 부분이 같은 번호끼리 이어집니다. 따라서 날짜 형식이 순번의 주기가 됩니다.
+# {date} 에는 문서의 작성일(doc_date)을 넣습니다. 작성일이 없을 때만 오늘 날짜를 사용합니다.
+#
+# 일괄 생성은 입력 행마다 발급한 번호와 발급일을 issued 표에 기록해 두고, 같은 입력 행을 다시 처리하면
+# 같은 번호/날짜를 사용합니다. 그래서 다시 실행해도 같은 문서가 만들어지고 렌더 캐시를 그대로 씁니다.
+import sqlite3
+import threading
+from datetime import datetime
+
+DOC_NUMBER_DB = "doc_numbers.db"
+DEFAULT_FORMAT = "{date:%Y%m%d}-{seq:04d}"
+DEFAULT_BLOCK_SIZE = 100 # 일괄 생성에서 한 번에 받아 두는 번호 수
+BUSY_TIMEOUT = 30 # 다른 프로세스가 발급 중일 때 기다리는 시간(초)
+
+
+def parse_doc_date(value):
+    # 문서의 작성일("YYYY-MM-DD") -> datetime. 비어 있거나 형식이 다르면 None (오늘 날짜 사용).
+    try:
+        return datetime.strptime(str(value).strip(), '%Y-%m-%d') if value else None
+    except ValueError:
+        return None
+
+
+def validate_format(number_format):
+    # 형식이 잘못되었으면 ValueError
+    try:
+        first = number_format.format(date=datetime(2000, 1, 1), seq=1)
+        second = number_format.format(date=datetime(2000, 1, 1), seq=2)
+    except (KeyError, IndexError, ValueError) as e:
+        raise ValueError(f"invalid document number format {number_format!r}: {e}") from None
+    if first == second:
+        raise ValueError(f"document number format must contain {{seq}}: {number_format!r}")
+    return number_format
+
+
+class DocNumberAllocator:
+    def __init__(self, path=DOC_NUMBER_DB, number_format=DEFAULT_FORMAT):
+        self.path = path
+        self.number_format = validate_format(number_format)
+        self._lock = threading.Lock()
+        # 트랜잭션은 직접 시작/종료합니다 (isolation_level=None)
+        self._conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS sequences (scope TEXT PRIMARY KEY, last INTEGER NOT NULL)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS issued (row_key TEXT PRIMARY KEY, doc_number TEXT NOT NULL, doc_date TEXT NOT NULL)")
+
+    def scope(self, date=None):
+        # 순번을 공유하는 범위: 형식 문자열과, 순번을 뺀 나머지를 채운 결과
+        date = date or datetime.now()
+        return f"{self.number_format}\0{self.number_format.format(date=date, seq=0)}"
+
+    def peek(self, date=None):
+        # 다음에 발급될 번호 (순번을 쓰지 않음). 다른 프로세스가 먼저 발급하면 실제 번호는 달라질 수 있습니다.
+        date = date or datetime.now()
+        with self._lock:
+            row = self._conn.execute("SELECT last FROM sequences WHERE scope = ?", (self.scope(date),)).fetchone()
+        return self.number_format.format(date=date, seq=(row[0] if row else 0) + 1)
+
+    def allocate(self, date=None):
+        return self.allocate_block(1, date)[0]
+
+    def allocate_block(self, count, date=None):
+        # 연속된 번호 count 개를 한 번에 발급합니다.
+        if count < 1:
+            raise ValueError("count must be positive")
+        date = date or datetime.now()
+        scope = self.scope(date)
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE") # 쓰기 잠금을 먼저 잡아 동시에 같은 값을 읽지 않도록
+            try:
+                row = self._conn.execute("SELECT last FROM sequences WHERE scope = ?", (scope,)).fetchone()
+                first = (row[0] if row else 0) + 1
+                last = first + count - 1
+                self._conn.execute(
+                    "INSERT INTO sequences (scope, last) VALUES (?, ?) "
+                    "ON CONFLICT (scope) DO UPDATE SET last = excluded.last",
+                    (scope, last)
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return [self.number_format.format(date=date, seq=seq) for seq in range(first, last + 1)]
+
+    def find_issued(self, row_key):
+        # 입력 행에 이미 발급한 (문서 번호, 발급일) 또는 None
+        with self._lock:
+            return self._conn.execute("SELECT doc_number, doc_date FROM issued WHERE row_key = ?", (row_key,)).fetchone()
+
+    def record_issued(self, entries):
+        # (입력 행 키, 문서 번호, 발급일) 목록을 한 트랜잭션으로 기록합니다.
+        if not entries:
+            return
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany("INSERT OR IGNORE INTO issued (row_key, doc_number, doc_date) VALUES (?, ?, ?)", entries)
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class DocNumberPool:
+    # 번호를 블록 단위로 받아 두고 하나씩 나눠 줍니다. 블록은 순번 범위(문서 날짜에 따라 달라짐)마다 따로 받으므로
+    # 작성일이 섞인 입력에서도 받아 둔 번호를 버리지 않습니다.
+    # 한 프로세스(일괄 생성의 주 프로세스) 안에서만 사용합니다.
+    def __init__(self, allocator, block_size=DEFAULT_BLOCK_SIZE):
+        self.allocator = allocator
+        self.block_size = block_size
+        self._blocks = {} # 순번 범위 -> 남은 번호 (뒤에서부터 꺼냄)
+        self._unrecorded = [] # 아직 issued 표에 기록하지 않은 발급 내역
+
+    def next(self, date=None):
+        date = date or datetime.now()
+        scope = self.allocator.scope(date)
+        numbers = self._blocks.get(scope)
+        if not numbers:
+            numbers = self._blocks[scope] = self.allocator.allocate_block(self.block_size, date)
+            numbers.reverse()
+        return numbers.pop()
+
+    def issue(self, row_key, doc_number=None, doc_date=None):
+        # 입력 행에 (문서 번호, 작성일) 을 붙입니다. 전에 처리한 행이면 그때의 번호와 날짜를 그대로 돌려줍니다.
+        # doc_number 를 주면 번호는 새로 받지 않고 날짜만 기록합니다. 번호는 doc_date(없으면 오늘)의 순번 범위에서 받습니다.
+        issued = self.allocator.find_issued(row_key)
+        if issued:
+            return tuple(issued)
+        date = parse_doc_date(doc_date) or datetime.now()
+        issued = (doc_number or self.next(date), date.strftime('%Y-%m-%d'))
+        self._unrecorded.append((row_key,) + issued)
+        if len(self._unrecorded) >= self.block_size:
+            self.flush()
+        return issued
+
+    def flush(self):
+        # 발급 내역을 기록합니다. 일괄 생성이 끝나거나 중단될 때 호출합니다.
+        self.allocator.record_issued(self._unrecorded)
+        self._unrecorded = []
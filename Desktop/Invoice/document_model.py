@@ -0,0 +1,137 @@
+# 문서 모델
+# 화면에서 편집 중인 청구서/견적서의 상태를 보관합니다. 위젯은 이 모델에 값을 쓰고,
+# 미리보기/저장은 snapshot() 으로 모델에서 바로 문서 데이터를 만듭니다 (위젯을 읽지 않음).
+# 품목 금액과 공급가액은 바뀐 줄만 다시 계산하여 유지합니다.
+from invoice_data import DEFAULT_COLORS, CUSTOMER_FIELDS, ISSUER_FIELDS, ITEM_FIELDS, new_item_row, evaluate_item, parse_item, compute_totals, build_document
+from line_items import LineItems, money_scale, format_money
+
+DOCUMENT_FIELDS = ("lang", "doc_type", "doc_number", "doc_date")
+
+
+class InvoiceDocument:
+    def __init__(self, lang="ko", doc_type="invoice"):
+        self.fields = dict.fromkeys(DOCUMENT_FIELDS, "")
+        self.fields.update(lang=lang, doc_type=doc_type)
+        self.sections = {
+            "customer": dict.fromkeys(CUSTOMER_FIELDS, ""),
+            "issuer": dict.fromkeys(ISSUER_FIELDS, ""),
+            "colors": dict(DEFAULT_COLORS)
+        }
+        self.rows = [] # 품목 입력값 (문자열 dict)
+        self._amounts = [] # 줄별 (금액 또는 None, 인쇄 여부, (품목명, 수량, 단가, 금액) 또는 None)
+        self.supply_amount = 0
+        self.invalid_rows = 0 # 인쇄할 줄 중 수량/단가가 숫자가 아닌 줄 수
+        self._observers = []
+
+    # --- 변경 알림 ---
+    def subscribe(self, callback):
+        # callback(구역, 키): ("fields", "lang"), ("customer", "name"), ("item", 번호), ("items", None) 등
+        self._observers.append(callback)
+
+    def _notify(self, section, key):
+        for callback in self._observers:
+            callback(section, key)
+
+    # --- 문서/고객/발행자/색상 값 ---
+    def get(self, section, key):
+        return self.fields[key] if section == "fields" else self.sections[section][key]
+
+    def set(self, section, key, value):
+        values = self.fields if section == "fields" else self.sections[section]
+        if values.get(key) == value:
+            return
+        rescale = section == "fields" and key == "lang" and money_scale(value) != self.money_scale
+        values[key] = value
+        if rescale: # 통화 단위가 바뀌면 모든 품목 금액을 다시 계산
+            self._reevaluate_all()
+            self._notify("items", None)
+        self._notify(section, key)
+
+    @property
+    def money_scale(self):
+        return money_scale(self.fields["lang"])
+
+    # --- 품목 ---
+    def set_items(self, rows):
+        self.rows = [new_item_row(row.get("name", ""), row.get("quantity", ""), row.get("unit_price", "")) for row in rows]
+        self._reevaluate_all()
+        self._notify("items", None)
+
+    def append_item(self, row=None):
+        row = row or {}
+        row = new_item_row(row.get("name", ""), row.get("quantity", ""), row.get("unit_price", ""))
+        self.rows.append(row)
+        self._amounts.append((None, False, None))
+        self._update_amount(len(self.rows) - 1)
+        self._notify("items", None)
+        return len(self.rows) - 1
+
+    def pop_item(self):
+        if not self.rows:
+            return None
+        state = self._amounts.pop()
+        self.supply_amount -= self._contribution(state)
+        self.invalid_rows -= self._is_invalid(state)
+        row = self.rows.pop()
+        self._notify("items", None)
+        return row
+
+    def set_item_field(self, index, field, value):
+        if field not in ITEM_FIELDS:
+            raise KeyError(field)
+        row = self.rows[index]
+        if row[field] == value:
+            return
+        row[field] = value
+        self._update_amount(index)
+        self._notify("item", index)
+
+    def item_amount(self, index):
+        # 화면에 표시할 금액 (최소 단위 정수, 숫자가 아니면 None)
+        return self._amounts[index][0]
+
+    def format_money(self, minor):
+        return format_money(minor, self.money_scale)
+
+    @property
+    def vat(self):
+        return compute_totals(self.fields["lang"], self.supply_amount)[0]
+
+    @property
+    def total_amount(self):
+        return compute_totals(self.fields["lang"], self.supply_amount)[1]
+
+    def snapshot(self):
+        # 렌더링용 문서 데이터. 인쇄할 줄의 수량/단가가 숫자가 아니면 ValueError.
+        if self.invalid_rows:
+            raise ValueError("quantity and unit price must be numbers")
+        items = LineItems.from_parsed((item for _, _, item in self._amounts if item), self.money_scale)
+        spec = dict(self.fields, items=None, **{section: dict(values) for section, values in self.sections.items()})
+        return build_document(spec, items=items, supply_amount=self.supply_amount)
+
+    def _reevaluate_all(self):
+        self._amounts = [self._evaluate(row) for row in self.rows]
+        self.supply_amount = sum(self._contribution(state) for state in self._amounts)
+        self.invalid_rows = sum(self._is_invalid(state) for state in self._amounts)
+
+    def _update_amount(self, index):
+        old = self._amounts[index]
+        new = self._amounts[index] = self._evaluate(self.rows[index])
+        self.supply_amount += self._contribution(new) - self._contribution(old)
+        self.invalid_rows += self._is_invalid(new) - self._is_invalid(old)
+
+    def _evaluate(self, row):
+        # 줄이 바뀔 때 한 번만 파싱하고, 렌더링용 품목 값도 만들어 둡니다.
+        scale = self.money_scale
+        amount, included = evaluate_item(row, scale)
+        item = parse_item(row, scale) if included and amount is not None else None
+        return amount, included, item
+
+    @staticmethod
+    def _contribution(state):
+        return state[2][3] if state[2] else 0
+
+    @staticmethod
+    def _is_invalid(state):
+        amount, included, _ = state
+        return included and amount is None
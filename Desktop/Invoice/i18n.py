@@ -0,0 +1,85 @@
+# 다국어 텍스트 및 고정 정보 (GUI, 렌더링 엔진, 배치 작업에서 공통으로 사용)
+
+# --- 고정 정보 ---
+SUPPLIER_INFO = {
+    "ko": {
+        "name": "주식회사 애드캐리", "reg_num": "582-88-01950",
+        "address": "서울특별시 금천구 가산디지털1로 204, 904호", "phone": "02-6925-0147", "email": "adc@adcarry.co.kr"
+    },
+    "en": {
+        "name": "ADCARRY Corp.", "reg_num": "582-88-01950",
+        "address": ["904, 204, Gasan digital 1-ro,", "Geumcheon-gu, Seoul, Republic of Korea"], "phone": "+82-2-6925-0147", "email": "adc@adcarry.co.kr"
+    }
+}
+
+# --- 다국어 텍스트 ---
+I18N = {
+    "ko": {
+        "doc_type_label": "문서 종류", "invoice": "청구서", "quote": "견적서",
+        "supplier_info": "공급자 정보", "customer_info": "고객 정보", "item_info": "품목 정보",
+        "company_name": "상호:", "reg_num": "사업자등록번호:", "address": "주소:", "phone": "연락처:", "email": "이메일:",
+        "add_item": "품목 추가", "item": "품목", "quantity": "수량", "unit_price": "단가", "amount": "금액",
+        "save_path": "저장 경로", "browse": "찾아보기...", "preview": "미리보기 생성",
+        "save_pdf": "PDF로 저장", "page": "페이지", "of": "의", "preview_area": "미리보기",
+        "from": "From.", "to": "To.", "doc_num": "문서번호:", "date": "작성일자:",
+        "supply_amount": "공급가액", "vat": "세액 (10%)", "total_amount": "합계 금액",
+        "currency_symbol": "원", "dear": "귀하",
+        "issuer_info": "발행자 정보", "issuer_name": "이름:", "issuer_title": "직책:", "issuer_email": "이메일:", "issuer_phone": "연락처:",
+        "item_preset": "품목 프리셋", "preset_name": "프리셋 이름:", "save_preset": "프리셋 저장", "load_preset": "프리셋 불러오기", "delete_preset": "프리셋 삭제",
+        "issuer_preset": "발행자 프리셋", "save_issuer_preset": "발행자 프리셋 저장", "load_issuer_preset": "발행자 프리셋 불러오기", "delete_issuer_preset": "발행자 프리셋 삭제",
+        "bank_info": "입금안내", "bank_name": "은행명:", "account_num": "계좌번호:", "account_holder": "예금주:",
+        "error_fill_all": "모든 필수 필드를 채워주세요.", "error_numeric": "수량과 단가는 숫자로 입력해야 합니다.",
+        "error_path": "저장 경로를 지정해주세요.", "error_preview": "먼저 미리보기를 생성해주세요.",
+        "preview_failed": "미리보기를 만들지 못했습니다.",
+        "success_save": "가 다음 경로에 저장되었습니다:", "error_save": "PDF 파일을 저장하는 중 오류가 발생했습니다:\n",
+        "preset_saved": "프리셋이 저장되었습니다.", "preset_loaded": "프리셋이 불러와졌습니다.", "preset_deleted": "프리셋이 삭제되었습니다.",
+        "preset_name_empty": "프리셋 이름을 입력해주세요.", "preset_not_found": "선택된 프리셋을 찾을 수 없습니다.",
+        "confirm_delete_preset": "선택된 프리셋을 삭제하시겠습니까?",
+        "due_date": "납부기한:",
+        "validity_period": "유효기한:",
+        "color_settings_label": "색상 설정",
+        "invoice_title_color_label": "제목 글자 색상",
+        "single_item_preset": "단일 품목 프리셋",
+        "save_single_item_preset": "단일 품목 프리셋 저장",
+        "add_single_item": "단일 품목 추가",
+        "delete_single_item_preset": "단일 품목 프리셋 삭제",
+        "customer_preset": "고객 프리셋",
+        "save_customer_preset": "고객 프리셋 저장",
+        "load_customer_preset": "고객 프리셋 불러오기",
+        "delete_customer_preset": "고객 프리셋 삭제"
+    },
+    "en": {
+        "doc_type_label": "Document Type", "invoice": "INVOICE", "quote": "QUOTATION",
+        "supplier_info": "Supplier Information", "customer_info": "Customer Information", "item_info": "Item Information",
+        "company_name": "Company Name:", "reg_num": "Business Reg. No.:", "address": "Address:", "phone": "Phone:", "email": "Email:",
+        "add_item": "Add Item", "item": "Item", "quantity": "Quantity", "unit_price": "Unit Price", "amount": "Amount",
+        "save_path": "Save Path", "browse": "Browse...", "preview": "Generate Preview",
+        "save_pdf": "Save as PDF", "page": "Page", "of": "of", "preview_area": "Preview",
+        "from": "From.", "to": "To.", "doc_num": "Doc No.:", "date": "Date:",
+        "supply_amount": "Subtotal", "vat": "VAT (10%)", "total_amount": "Total Amount",
+        "currency_symbol": "$", "dear": "",
+        "issuer_info": "Issuer Information", "issuer_name": "Name:", "issuer_title": "Title:", "issuer_email": "Email:", "issuer_phone": "Phone:",
+        "item_preset": "Item Presets", "preset_name": "Preset Name:", "save_preset": "Save Preset", "load_preset": "Load Preset", "delete_preset": "Delete Preset",
+        "issuer_preset": "Issuer Presets", "save_issuer_preset": "Save Issuer Preset", "load_issuer_preset": "Load Issuer Preset", "delete_issuer_preset": "Delete Issuer Preset",
+        "bank_info": "Payment Information", "bank_name": "Bank Name:", "account_num": "Account No.:", "account_holder": "Account Holder:",
+        "error_fill_all": "Please fill in all required fields.", "error_numeric": "Quantity and Unit Price must be numbers.",
+        "error_path": "Please specify a save path.", "error_preview": "Please generate a preview first.",
+        "preview_failed": "Could not generate the preview.",
+        "success_save": "has been saved to:", "error_save": "An error occurred while saving the PDF:\n",
+        "preset_saved": "Preset saved.", "preset_loaded": "Preset loaded.", "preset_deleted": "Preset deleted.",
+        "preset_name_empty": "Please enter a preset name.", "preset_not_found": "Selected preset not found.",
+        "confirm_delete_preset": "Are you sure you want to delete the selected preset?",
+        "due_date": "Due Date:",
+        "validity_period": "Valid Until:",
+        "color_settings_label": "Color Settings",
+        "invoice_title_color_label": "Title Color",
+        "single_item_preset": "Single Item Preset",
+        "save_single_item_preset": "Save Single Item Preset",
+        "add_single_item": "Add Single Item",
+        "delete_single_item_preset": "Delete Single Item Preset",
+        "customer_preset": "Customer Preset",
+        "save_customer_preset": "Save Customer Preset",
+        "load_customer_preset": "Load Customer Preset",
+        "delete_customer_preset": "Delete Customer Preset"
+    }
+}
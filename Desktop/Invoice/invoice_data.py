@@ -0,0 +1,125 @@
+# 문서 데이터 정리
+# GUI 폼, CSV/JSONL 행, 서비스 요청 등의 입력을 렌더링 엔진이 쓰는 문서 데이터로 바꿉니다.
+# reportlab 없이 가져올 수 있으므로 GUI 시작 시간에 영향을 주지 않습니다.
+from datetime import datetime, timedelta
+
+from i18n import I18N, SUPPLIER_INFO
+from line_items import LineItems, money_scale, parse_money, parse_quantity, compute_vat
+
+# --- 기본 색상 ---
+DEFAULT_COLORS = {
+    "primary_color": "#4A90E2", # 기본 파란색
+    "secondary_color": "#F0F0F0", # 밝은 회색
+    "text_color": "#333333", # 어두운 회색
+    "light_text_color": "#FFFFFF", # 흰색
+    "border_color": "#CCCCCC", # 중간 회색
+    "invoice_title_color": "#FFFFFF" # 청구서 제목 글자 색상 (기본 흰색)
+}
+
+CUSTOMER_FIELDS = ("name", "reg_num", "address", "phone", "email")
+ISSUER_FIELDS = ("name", "title", "email", "phone")
+ITEM_FIELDS = ("name", "quantity", "unit_price")
+
+
+def new_item_row(name="", quantity="", unit_price=""):
+    # 화면에서 편집하는 품목 한 줄 (입력한 문자열 그대로)
+    return {"name": str(name), "quantity": str(quantity), "unit_price": str(unit_price)}
+
+
+def evaluate_item(item, scale=0):
+    # 품목 한 줄을 (금액, 인쇄 여부) 로 계산합니다. 금액은 최소 단위 정수이며 수량/단가가 숫자가
+    # 아니면 None, 품목명/수량/단가 중 빈 칸이 있는 줄은 인쇄하지 않습니다 (빈 수량/단가는 금액 계산 시 0).
+    quantity = item.get("quantity")
+    unit_price = item.get("unit_price")
+    try:
+        amount = parse_quantity(quantity or 0) * parse_money(unit_price or 0, scale)
+    except ValueError:
+        amount = None
+    included = bool(item.get("name")) and quantity not in (None, "") and unit_price not in (None, "")
+    return amount, included
+
+
+def parse_item(item, scale=0):
+    # 인쇄할 품목이면 (품목명, 수량, 단가, 금액), 아니면 None. 수량/단가가 숫자가 아니면 ValueError.
+    name = item.get("name")
+    quantity = item.get("quantity")
+    unit_price = item.get("unit_price")
+    if name and quantity not in (None, "") and unit_price not in (None, ""):
+        quantity = parse_quantity(quantity)
+        unit_price = parse_money(unit_price, scale)
+        return str(name), quantity, unit_price, quantity * unit_price
+    return None
+
+
+def compute_totals(lang, supply_amount):
+    # (부가세, 합계) - 한국어 문서만 부가세 10% (원 미만 절사)
+    vat = compute_vat(lang, supply_amount)
+    return vat, supply_amount + vat
+
+
+def build_document(spec, items=None, supply_amount=None):
+    # 입력 데이터(GUI 폼, CSV/JSON 행 등)를 렌더링용 문서 데이터로 정리합니다.
+    # 수량/단가가 숫자가 아니면 ValueError 를 발생시킵니다.
+    # 금액(단가, 공급가액, 부가세, 합계)은 money_scale 자릿수의 최소 단위 정수입니다.
+    # items/supply_amount 에 이미 만든 LineItems 와 공급가액을 주면 다시 계산하지 않습니다.
+    lang = spec.get("lang") or "ko"
+    doc_type = spec.get("doc_type") or "invoice"
+    t = I18N[lang]
+    scale = money_scale(lang)
+    data = {"lang": lang, "doc_type": doc_type, "doc_type_text": t[doc_type], "money_scale": scale}
+    data["doc_number"] = spec.get("doc_number") or datetime.now().strftime('%Y%m%d-%H%M%S')
+    data["doc_date"] = spec.get("doc_date") or datetime.now().strftime('%Y-%m-%d')
+
+    # 납부기한/유효기간 계산
+    doc_date_obj = datetime.strptime(data["doc_date"], '%Y-%m-%d')
+    due_date_obj = doc_date_obj + timedelta(days=30)
+    data["due_date"] = due_date_obj.strftime('%Y-%m-%d')
+
+    data["supplier"] = SUPPLIER_INFO[lang]
+
+    customer = spec.get("customer") or {}
+    data["customer"] = {key: str(customer.get(key) or "") for key in CUSTOMER_FIELDS}
+    issuer = spec.get("issuer") or {}
+    data["issuer"] = {key: str(issuer.get(key) or "") for key in ISSUER_FIELDS}
+
+    if items is None:
+        items = LineItems.from_rows(spec.get("items") or [], scale)
+    if supply_amount is None:
+        supply_amount = items.total()
+
+    data["items"] = items
+    data["supply_amount"] = supply_amount
+    data["vat"], data["total_amount"] = compute_totals(lang, supply_amount)
+
+    data["colors"] = dict(DEFAULT_COLORS, **(spec.get("colors") or {}))
+    return data
+
+
+FILE_NAME_PUNCTUATION = "-_.()" # 파일 이름(base_file_name)에 남겨 두는 문장 부호
+
+
+def safe_file_name_part(text):
+    # 사용자가 입력한 파일 이름에서 경로 구분자("/", "\\")와 특수 문자를 빼고, 앞의 "." 을 지웁니다.
+    # "../../x" 는 "x" 가 되므로 저장 폴더 밖이나 ZIP 밖으로 나가지 않습니다.
+    cleaned = "".join(c for c in text if c.isalnum() or c.isspace() or c in FILE_NAME_PUNCTUATION)
+    return cleaned.strip().lstrip(".").strip()
+
+
+def make_file_name(customer_name, doc_type_text, base_file_name="", add_date_prefix=True):
+    # 파일 이름 정리 (특수 문자 제거)
+    safe_customer_name = "".join(c for c in customer_name if c.isalnum() or c.isspace()).strip()
+    if not safe_customer_name:
+        safe_customer_name = "Untitled" # 고객 이름이 비어있을 경우 기본값
+
+    safe_doc_type_text = "".join(c for c in doc_type_text if c.isalnum() or c.isspace()).strip()
+    if not safe_doc_type_text:
+        safe_doc_type_text = "Document" # 문서 종류가 비어있을 경우 기본값
+
+    base_file_name = safe_file_name_part(base_file_name)
+    if not base_file_name:
+        base_file_name = f"{safe_customer_name}_{safe_doc_type_text}"
+
+    if add_date_prefix:
+        date_prefix = datetime.now().strftime('%Y%m%d_')
+        return f"{date_prefix}{base_file_name}.pdf"
+    return f"{base_file_name}.pdf"
@@ -0,0 +1,153 @@
+# 품목 입력 표 (가상화)
+# 품목 수와 관계없이 화면에 보이는 만큼의 행 위젯만 만들어 두고, 스크롤하면 같은 위젯에
+# 다른 품목의 값을 채워 넣습니다. 품목 데이터는 문서 모델(document_model.InvoiceDocument)에 있습니다.
+import tkinter as tk
+from tkinter import ttk
+
+from invoice_data import ITEM_FIELDS
+
+VISIBLE_ROWS = 10 # 한 번에 보이는 품목 행 수
+
+
+class VirtualItemGrid:
+    def __init__(self, parent, document, visible_rows=VISIBLE_ROWS):
+        self.document = document
+        self.visible_rows = visible_rows
+        self.first = 0 # 첫 번째 행 위젯에 표시 중인 품목 번호
+        self._filling = False # 위젯에 값을 채우는 중에는 변경 알림을 보내지 않음
+
+        self.frame = ttk.Frame(parent)
+        for column in range(4):
+            self.frame.grid_columnconfigure(column, weight=1)
+
+        # 품목 헤더 레이블 생성 (한 번만 생성)
+        self.header_labels = {
+            "item": ttk.Label(self.frame, text="품목"),
+            "quantity": ttk.Label(self.frame, text="수량", anchor=tk.CENTER),
+            "unit_price": ttk.Label(self.frame, text="단가", anchor=tk.CENTER),
+            "amount": ttk.Label(self.frame, text="금액", anchor=tk.CENTER)
+        }
+        for column, key in enumerate(("item", "quantity", "unit_price", "amount")):
+            self.header_labels[key].grid(row=0, column=column, padx=2, sticky=tk.W + tk.E)
+
+        self.scrollbar = ttk.Scrollbar(self.frame, orient="vertical", command=self.yview)
+
+        # 행 위젯 풀: 각 칸은 StringVar 에 연결하고, 값이 바뀌면 보이는 품목에 기록합니다.
+        self.slots = []
+        for slot in range(visible_rows):
+            cells = {}
+            for column, field in enumerate(ITEM_FIELDS + ("amount",)):
+                var = tk.StringVar()
+                if field == "amount":
+                    entry = ttk.Entry(self.frame, textvariable=var, state="readonly")
+                else:
+                    entry = ttk.Entry(self.frame, textvariable=var)
+                    var.trace_add("write", lambda *args, slot=slot, field=field: self._on_cell_changed(slot, field))
+                    entry.bind("<Up>", lambda e, slot=slot, field=field: self._move_focus(slot, field, -1))
+                    entry.bind("<Down>", lambda e, slot=slot, field=field: self._move_focus(slot, field, 1))
+                entry.bind("<MouseWheel>", self._on_mousewheel)
+                entry.bind("<Button-4>", self._on_mousewheel)
+                entry.bind("<Button-5>", self._on_mousewheel)
+                cells[field] = (entry, var)
+            self.slots.append(cells)
+        document.subscribe(self._on_document_changed)
+
+    def grid(self, **kwargs):
+        self.frame.grid(**kwargs)
+
+    @property
+    def rows(self):
+        return self.document.rows
+
+    def __len__(self):
+        return len(self.rows)
+
+    def set_rows(self, rows):
+        # 품목 전체를 바꿉니다 (프리셋 불러오기). 위젯은 새로 만들지 않습니다.
+        self.first = 0
+        self.document.set_items(rows)
+
+    def append_row(self, row=None):
+        index = self.document.append_item(row)
+        self.scroll_to(index) # 새 품목이 보이도록 맨 아래로 스크롤
+        return index
+
+    def pop_row(self):
+        return self.document.pop_item()
+
+    def amount_text(self, index):
+        amount = self.document.item_amount(index)
+        return "" if amount is None else self.document.format_money(amount) # 숫자가 아니면 금액을 비워 둠
+
+    def refresh(self):
+        # 보이는 행 위젯에 품목 값을 채우고, 남는 행 위젯은 숨깁니다.
+        shown = min(self.visible_rows, len(self.rows))
+        self._filling = True
+        try:
+            for slot, cells in enumerate(self.slots):
+                if slot < shown:
+                    index = self.first + slot
+                    row = self.rows[index]
+                    for column, field in enumerate(ITEM_FIELDS + ("amount",)):
+                        entry, var = cells[field]
+                        value = self.amount_text(index) if field == "amount" else row[field]
+                        if var.get() != value:
+                            var.set(value)
+                        if not entry.winfo_manager():
+                            entry.grid(row=slot + 1, column=column, padx=2, pady=2, sticky="we")
+                else:
+                    for entry, var in cells.values():
+                        entry.grid_remove()
+        finally:
+            self._filling = False
+        if len(self.rows) > self.visible_rows:
+            self.scrollbar.grid(row=1, column=4, rowspan=self.visible_rows, sticky="ns")
+            self.scrollbar.set(self.first / len(self.rows), (self.first + shown) / len(self.rows))
+        else:
+            self.scrollbar.grid_remove()
+
+    def scroll_to(self, first):
+        first = max(0, min(int(first), len(self.rows) - self.visible_rows))
+        if first != self.first:
+            self.first = first
+            self.refresh()
+
+    def yview(self, *args):
+        # 스크롤바 명령: ("moveto", 비율) 또는 ("scroll", 수, "units"/"pages")
+        if not self.rows:
+            return
+        if args[0] == "moveto":
+            self.scroll_to(round(float(args[1]) * len(self.rows)))
+        elif args[0] == "scroll":
+            step = int(args[1]) * (self.visible_rows if args[2] == "pages" else 1)
+            self.scroll_to(self.first + step)
+
+    def _on_mousewheel(self, event):
+        if event.num == 4 or getattr(event, "delta", 0) > 0:
+            self.scroll_to(self.first - 3)
+        else:
+            self.scroll_to(self.first + 3)
+        return "break"
+
+    def _move_focus(self, slot, field, step):
+        # 위/아래 방향키로 품목 사이를 이동하고, 끝에 닿으면 한 줄씩 스크롤합니다.
+        target = slot + step
+        if 0 <= target < min(self.visible_rows, len(self.rows)):
+            self.slots[target][field][0].focus_set()
+        else:
+            self.scroll_to(self.first + step)
+        return "break"
+
+    def _on_cell_changed(self, slot, field):
+        if self._filling:
+            return
+        index = self.first + slot
+        if index < len(self.rows):
+            self.document.set_item_field(index, field, self.slots[slot][field][1].get())
+
+    def _on_document_changed(self, section, key):
+        if section == "items": # 품목이 추가/삭제/교체됨
+            self.first = max(0, min(self.first, len(self.rows) - self.visible_rows))
+            self.refresh()
+        elif section == "item" and self.first <= key < self.first + self.visible_rows:
+            self.refresh() # 보이는 줄의 값/금액 갱신 (같은 값은 다시 쓰지 않음)
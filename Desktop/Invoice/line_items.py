@@ -0,0 +1,103 @@
+# 품목 목록과 금액 계산
+# 금액은 통화의 최소 단위 정수(원, 센트)로 다룹니다. 입력 문자열은 Decimal 로 읽으므로
+# "19.99" 같은 달러 금액도 오차 없이 1999 센트가 됩니다.
+# 품목은 열 단위 array('q') 에 보관하여 품목이 수만 줄이어도 메모리를 적게 쓰고,
+# 금액/합계는 map/sum 으로 한 번에 계산합니다.
+from array import array
+from decimal import Decimal, InvalidOperation, ROUND_DOWN
+from operator import mul
+
+MONEY_SCALE = {"ko": 0, "en": 2} # 소수 자릿수: 원은 0, USD 는 센트 단위(2)
+VAT_RATE = {"ko": Decimal("0.1"), "en": Decimal("0")}
+VAT_ROUNDING = ROUND_DOWN # 부가세의 최소 단위 미만은 절사
+
+
+def money_scale(lang):
+    return MONEY_SCALE.get(lang, 0)
+
+
+def parse_money(value, scale=0):
+    # "1000", "19.99", 19.99 -> 최소 단위 정수. 자릿수가 넘거나 숫자가 아니면 ValueError.
+    try:
+        amount = Decimal(str(value).strip())
+    except InvalidOperation:
+        raise ValueError(f"invalid amount: {value!r}") from None
+    if not amount.is_finite():
+        raise ValueError(f"invalid amount: {value!r}")
+    minor = amount.scaleb(scale)
+    if minor != minor.to_integral_value():
+        raise ValueError(f"too many decimal places: {value!r}")
+    return int(minor)
+
+
+def parse_quantity(value):
+    return int(value)
+
+
+def format_money(minor, scale=0):
+    # 최소 단위 정수 -> "1,000" / "1,234.50"
+    if not scale:
+        return f"{minor:,}"
+    return f"{Decimal(minor).scaleb(-scale):,.{scale}f}"
+
+
+def compute_vat(lang, supply_minor):
+    rate = VAT_RATE.get(lang, Decimal("0"))
+    return int((Decimal(supply_minor) * rate).to_integral_value(rounding=VAT_ROUNDING))
+
+
+def _int64_column(values, label):
+    # array('q') 범위(64비트)를 넘는 값은 다른 입력 오류와 같이 ValueError 로 알립니다.
+    try:
+        return array('q', values)
+    except OverflowError:
+        raise ValueError(f"{label} out of range") from None
+
+
+class LineItems:
+    # 품목명 리스트와 수량/단가/금액 array('q') 를 같은 순서로 보관합니다.
+    __slots__ = ("scale", "names", "quantities", "unit_prices", "amounts")
+
+    def __init__(self, scale=0, names=(), quantities=(), unit_prices=(), amounts=None):
+        self.scale = scale
+        self.names = list(names)
+        self.quantities = _int64_column(quantities, "quantity")
+        self.unit_prices = _int64_column(unit_prices, "unit price")
+        if amounts is None:
+            amounts = map(mul, self.quantities, self.unit_prices)
+        self.amounts = _int64_column(amounts, "amount")
+        if not len(self.names) == len(self.quantities) == len(self.unit_prices) == len(self.amounts):
+            raise ValueError("line item columns differ in length")
+
+    @classmethod
+    def from_rows(cls, rows, scale=0):
+        # 입력 행(dict) 목록에서 만듭니다. 품목명/수량/단가 중 빈 칸이 있는 행은 건너뜁니다.
+        names, quantities, unit_prices = [], [], []
+        for row in rows:
+            name = row.get("name")
+            quantity = row.get("quantity")
+            unit_price = row.get("unit_price")
+            if name and quantity not in (None, "") and unit_price not in (None, ""):
+                names.append(str(name))
+                quantities.append(quantity)
+                unit_prices.append(unit_price)
+        return cls(scale, names, map(parse_quantity, quantities), (parse_money(price, scale) for price in unit_prices))
+
+    @classmethod
+    def from_parsed(cls, rows, scale=0):
+        # 이미 파싱된 (품목명, 수량, 단가, 금액) 목록에서 만듭니다.
+        columns = tuple(zip(*rows)) or ((), (), (), ())
+        return cls(scale, *columns)
+
+    def __len__(self):
+        return len(self.names)
+
+    def __iter__(self):
+        # (품목명, 수량, 단가, 금액) - 단가/금액은 최소 단위 정수
+        return zip(self.names, self.quantities, self.unit_prices, self.amounts)
+
+    def total(self):
+        return sum(self.amounts)
+
+    def format(self, minor):
+        return format_money(minor, self.scale)
@@ -0,0 +1,114 @@
+# 백그라운드 저장 (write-behind)
+# 설정/창 크기/프리셋 저장을 Tk 메인 스레드 밖에서 실행합니다.
+# 같은 키로 짧은 시간 안에 여러 번 저장하면 마지막 내용만 한 번 씁니다.
+# 파일은 임시 파일에 다 쓴 뒤 os.replace 로 바꾸므로, 쓰는 도중 프로그램이 종료되어도
+# 기존 파일이나 새 파일 중 하나가 온전히 남습니다.
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+COALESCE_SECONDS = 0.3 # 첫 저장 요청 후 이 시간 동안 들어온 요청을 모아서 씁니다
+
+
+def atomic_write_text(path, text, encoding="utf-8"):
+    directory = os.path.dirname(os.path.abspath(path))
+    tmp_path = os.path.join(directory, f".{os.path.basename(path)}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(tmp_path, "w", encoding=encoding) as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    if hasattr(os, "O_DIRECTORY"): # 파일 이름 변경도 디스크에 기록 (POSIX)
+        try:
+            fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+        except OSError:
+            pass
+
+
+def atomic_write_json(path, data, **dump_kwargs):
+    atomic_write_text(path, json.dumps(data, **dump_kwargs))
+
+
+class WriteBehindQueue:
+    def __init__(self, coalesce_seconds=COALESCE_SECONDS):
+        self.coalesce_seconds = coalesce_seconds
+        self._cond = threading.Condition()
+        self._pending = OrderedDict() # 키 -> 저장 함수 (같은 키는 마지막 요청만 남음)
+        self._running = False
+        self._flushing = 0 # flush() 를 기다리는 스레드 수
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="WriteBehind", daemon=True)
+        self._thread.start()
+
+    def submit(self, key, write):
+        # write() 는 저장 스레드에서 실행됩니다. 호출 시점의 내용을 미리 복사해 두어야 합니다.
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("WriteBehindQueue is closed")
+            self._pending.pop(key, None)
+            self._pending[key] = write
+            self._cond.notify_all()
+
+    def write_json(self, path, data, **dump_kwargs):
+        text = json.dumps(data, **dump_kwargs) # 메인 스레드에서 직렬화하여 현재 내용을 고정
+        self.submit(("file", os.path.abspath(path)), lambda: atomic_write_text(path, text))
+
+    def flush(self, timeout=None):
+        # 대기 중인 저장이 모두 끝날 때까지 기다립니다. 시간 안에 끝나면 True.
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            self._flushing += 1
+            self._cond.notify_all() # 모으는 중이면 바로 쓰도록
+            try:
+                while self._pending or self._running:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        return False
+                    self._cond.wait(remaining)
+            finally:
+                self._flushing -= 1
+        return True
+
+    def close(self, timeout=None):
+        done = self.flush(timeout)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        return done
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if not self._pending:
+                    return
+                deadline = time.monotonic() + self.coalesce_seconds # 연속된 저장 요청을 모음
+                while not self._flushing and not self._closed:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                writes, self._pending = list(self._pending.values()), OrderedDict()
+                self._running = True
+            for write in writes:
+                try:
+                    write()
+                except Exception as e:
+                    print(f"DEBUG: Error writing in background: {e}")
+            with self._cond:
+                self._running = False
+                self._cond.notify_all()
@@ -0,0 +1,191 @@
+# 프리셋 저장소 (SQLite)
+# 품목/단일 품목/발행자/고객/색상 프리셋을 하나의 데이터베이스에 보관합니다.
+# 프리셋 하나를 저장/삭제할 때 해당 행만 쓰므로, 프리셋이 많아져도 저장 시간이 늘지 않습니다.
+# 처음 실행할 때 기존 JSON 프리셋 파일을 한 번 가져옵니다. (JSON 파일은 지우지 않습니다.)
+# writer(persistence.WriteBehindQueue) 를 주면 저장/삭제는 메모리에 먼저 반영하고
+# 데이터베이스 쓰기는 저장 스레드에서 한 트랜잭션으로 모아서 합니다.
+import json
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+
+PRESET_DB = "presets.db"
+PRESET_KINDS = ("item", "single_item", "issuer", "customer", "color")
+
+# 기존 JSON 파일: 파일 이름 -> ((JSON 안의 키 또는 None, 프리셋 종류), ...)
+LEGACY_PRESET_FILES = {
+    "item_presets.json": (("multi_item_presets", "item"), ("single_item_presets", "single_item")),
+    "issuer_presets.json": ((None, "issuer"),),
+    "customer_presets.json": ((None, "customer"),),
+    "color_presets.json": ((None, "color"),)
+}
+
+_DELETED = object() # 아직 데이터베이스에 반영되지 않은 삭제 표시
+
+
+class PresetCollection:
+    # 프리셋 종류 하나를 dict 처럼 다룹니다. 이름 목록은 처음 저장한 순서대로 돌려줍니다.
+    def __init__(self, store, kind):
+        self.store = store
+        self.kind = kind
+
+    def keys(self):
+        return self.store.names(self.kind)
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return self.store.count(self.kind)
+
+    def __bool__(self):
+        return len(self) > 0
+
+    def __contains__(self, name):
+        return self.store.get(self.kind, name) is not None
+
+    def get(self, name, default=None):
+        value = self.store.get(self.kind, name)
+        return default if value is None else value
+
+    def __getitem__(self, name):
+        value = self.store.get(self.kind, name)
+        if value is None:
+            raise KeyError(name)
+        return value
+
+    def __setitem__(self, name, value):
+        self.store.put(self.kind, name, value)
+
+    def __delitem__(self, name):
+        if not self.store.delete(self.kind, name):
+            raise KeyError(name)
+
+    def items(self):
+        return self.store.items(self.kind)
+
+
+class PresetStore:
+    def __init__(self, path=PRESET_DB, legacy_dir=".", writer=None):
+        self.path = path
+        self.writer = writer
+        self._pending = OrderedDict() # (종류, 이름) -> JSON 문자열 또는 _DELETED
+        self._lock = threading.Lock() # 메인 스레드와 저장 스레드가 함께 사용할 수 있도록
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            self._conn.execute("CREATE TABLE IF NOT EXISTS presets (kind TEXT NOT NULL, name TEXT NOT NULL, data TEXT NOT NULL, PRIMARY KEY (kind, name))")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        self._import_legacy_json(legacy_dir)
+
+    def collection(self, kind):
+        if kind not in PRESET_KINDS:
+            raise ValueError(f"unknown preset kind: {kind}")
+        return PresetCollection(self, kind)
+
+    def names(self, kind):
+        with self._lock:
+            rows = self._conn.execute("SELECT name FROM presets WHERE kind = ? ORDER BY rowid", (kind,)).fetchall()
+            pending = self._pending_for(kind)
+        if not pending:
+            return [name for (name,) in rows]
+        names = dict.fromkeys(name for (name,) in rows)
+        for name, data in pending:
+            if data is _DELETED:
+                names.pop(name, None)
+            else:
+                names.setdefault(name)
+        return list(names)
+
+    def count(self, kind):
+        return len(self.names(kind))
+
+    def get(self, kind, name):
+        with self._lock:
+            data = self._pending.get((kind, name))
+            if data is None:
+                row = self._conn.execute("SELECT data FROM presets WHERE kind = ? AND name = ?", (kind, name)).fetchone()
+                data = row[0] if row else _DELETED
+        return None if data is _DELETED else json.loads(data)
+
+    def items(self, kind):
+        with self._lock:
+            rows = self._conn.execute("SELECT name, data FROM presets WHERE kind = ? ORDER BY rowid", (kind,)).fetchall()
+            pending = self._pending_for(kind)
+        presets = dict(rows)
+        for name, data in pending:
+            if data is _DELETED:
+                presets.pop(name, None)
+            else:
+                presets[name] = data
+        return [(name, json.loads(data)) for name, data in presets.items()]
+
+    def put(self, kind, name, value):
+        # 같은 이름이 있으면 내용만 바꾸고 목록에서의 순서는 유지합니다.
+        self._submit(kind, name, json.dumps(value, ensure_ascii=False))
+
+    def delete(self, kind, name):
+        if self.get(kind, name) is None:
+            return False
+        self._submit(kind, name, _DELETED)
+        return True
+
+    def write_pending(self):
+        # 메모리에만 반영된 저장/삭제를 한 트랜잭션으로 데이터베이스에 씁니다.
+        with self._lock:
+            if not self._pending:
+                return
+            with self._conn:
+                for (kind, name), data in self._pending.items():
+                    if data is _DELETED:
+                        self._conn.execute("DELETE FROM presets WHERE kind = ? AND name = ?", (kind, name))
+                    else:
+                        self._conn.execute(
+                            "INSERT INTO presets (kind, name, data) VALUES (?, ?, ?) "
+                            "ON CONFLICT (kind, name) DO UPDATE SET data = excluded.data",
+                            (kind, name, data)
+                        )
+            self._pending.clear()
+
+    def close(self):
+        self.write_pending()
+        with self._lock:
+            self._conn.close()
+
+    def _pending_for(self, kind):
+        return [(name, data) for (pending_kind, name), data in self._pending.items() if pending_kind == kind]
+
+    def _submit(self, kind, name, data):
+        with self._lock:
+            self._pending[(kind, name)] = data
+        if self.writer is None:
+            self.write_pending()
+        else:
+            self.writer.submit(("presets", os.path.abspath(self.path)), self.write_pending)
+
+    def _import_legacy_json(self, legacy_dir):
+        with self._lock, self._conn:
+            if self._conn.execute("SELECT 1 FROM meta WHERE key = 'legacy_json_imported'").fetchone():
+                return
+            for file_name, sections in LEGACY_PRESET_FILES.items():
+                file_path = os.path.join(legacy_dir, file_name)
+                if not os.path.exists(file_path):
+                    continue
+                try:
+                    with open(file_path, "r", encoding="utf-8") as f:
+                        data = json.load(f)
+                except (OSError, json.JSONDecodeError):
+                    continue # 읽을 수 없는 파일은 기존과 같이 빈 프리셋으로 취급
+                if not isinstance(data, dict):
+                    continue # JSON 이지만 객체가 아닌 파일([], null 등)도 마찬가지
+                for key, kind in sections:
+                    presets = data.get(key, {}) if key else data
+                    if not isinstance(presets, dict):
+                        continue # 형식이 맞지 않는 구역은 건너뜀
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO presets (kind, name, data) VALUES (?, ?, ?)",
+                        [(kind, name, json.dumps(value, ensure_ascii=False)) for name, value in presets.items()]
+                    )
+            self._conn.execute("INSERT INTO meta (key, value) VALUES ('legacy_json_imported', '1')")
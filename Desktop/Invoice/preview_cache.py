@@ -0,0 +1,95 @@
+# 미리보기 페이지 래스터 캐시
+# 페이지 내용의 해시를 키로 래스터화된 이미지를 보관합니다. 한 페이지만 바뀌었으면
+# 나머지 페이지는 다시 래스터화하지 않고 캐시된 이미지를 그대로 사용합니다.
+import hashlib
+import threading
+from collections import OrderedDict
+
+DEFAULT_CACHE_BYTES = 128 * 1024 * 1024 # 128MB
+
+
+def fit_zoom(page_rect, canvas_size):
+    # 페이지를 캔버스에 꼭 맞게 표시하기 위한 배율
+    canvas_width, canvas_height = canvas_size
+    if canvas_width < 2 or canvas_height < 2: # 아직 화면에 배치되지 않은 캔버스
+        return 1.0
+    return min(canvas_width / page_rect.width, canvas_height / page_rect.height)
+
+
+def fit_size(img_width, img_height, canvas_width, canvas_height):
+    img_ratio = img_width / img_height
+    canvas_ratio = canvas_width / canvas_height
+    if img_ratio > canvas_ratio:
+        new_width = canvas_width
+        new_height = int(new_width / img_ratio)
+    else:
+        new_height = canvas_height
+        new_width = int(new_height * img_ratio)
+    return max(new_width, 1), max(new_height, 1)
+
+
+def page_content_key(document, page):
+    # 페이지 콘텐츠 스트림과 페이지가 참조하는 폼(XObject), 글꼴 매핑(ToUnicode)을 모두 해시합니다.
+    # reportlab 은 TTF 글꼴을 문서마다 서브셋으로 인코딩하므로, 콘텐츠 스트림의 바이트가 같아도
+    # 글꼴 매핑이 다르면 다른 글자가 그려질 수 있습니다.
+    digest = hashlib.sha1()
+    digest.update(repr(tuple(page.rect)).encode())
+    digest.update(page.read_contents())
+    seen = set()
+    for xref, name, *_ in page.get_xobjects():
+        if xref in seen:
+            continue
+        seen.add(xref)
+        digest.update(name.encode())
+        digest.update(document.xref_stream(xref) or b"")
+    for xref, _ext, _type, basefont, name, *_ in page.get_fonts(full=True):
+        if xref in seen:
+            continue
+        seen.add(xref)
+        digest.update(f"{name}:{basefont}".encode())
+        kind, value = document.xref_get_key(xref, "ToUnicode")
+        if kind == "xref":
+            digest.update(document.xref_stream(int(value.split()[0])) or b"")
+    return digest.hexdigest()
+
+
+class PageRasterCache:
+    # 메모리 사용량(바이트) 기준 LRU 캐시. 미리보기 작업자 스레드와 메인 스레드에서 함께 사용합니다.
+    def __init__(self, max_bytes=DEFAULT_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._images = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def image_size(img):
+        return img.width * img.height * len(img.getbands())
+
+    def get(self, key):
+        with self._lock:
+            img = self._images.get(key)
+            if img is not None:
+                self._images.move_to_end(key)
+            return img
+
+    def put(self, key, img):
+        size = self.image_size(img)
+        with self._lock:
+            old = self._images.pop(key, None)
+            if old is not None:
+                self.total_bytes -= self.image_size(old)
+            if size > self.max_bytes:
+                return
+            self._images[key] = img
+            self.total_bytes += size
+            while self.total_bytes > self.max_bytes:
+                _, evicted = self._images.popitem(last=False)
+                self.total_bytes -= self.image_size(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._images.clear()
+            self.total_bytes = 0
+
+    def __len__(self):
+        return len(self._images)
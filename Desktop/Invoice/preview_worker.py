@@ -0,0 +1,83 @@
+# 미리보기 백그라운드 렌더링
+# reportlab 그리기, fitz 래스터화 등 오래 걸리는 작업을 Tk 메인 루프 밖에서 실행합니다.
+# 항상 가장 최근 요청만 의미가 있으므로, 새 요청이 들어오면 대기 중인 요청은 버리고
+# 실행 중인 요청은 취소 표시를 하여 결과가 게시되지 않도록 합니다.
+import threading
+
+
+class PreviewCancelled(Exception):
+    pass
+
+
+class PreviewWorker:
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._generation = 0 # 가장 최근에 요청된 작업 번호
+        self._pending = None # (번호, 작업) - 아직 시작하지 않은 최신 작업
+        self._running = False
+        self._result = None # (번호, 결과, 예외) - 메인 스레드가 가져갈 결과
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="PreviewWorker", daemon=True)
+        self._thread.start()
+
+    def submit(self, job):
+        # job(is_cancelled) 은 작업자 스레드에서 실행됩니다. Tk 위젯에 접근하면 안 됩니다.
+        with self._cond:
+            self._generation += 1
+            self._pending = (self._generation, job)
+            self._result = None
+            self._cond.notify()
+            return self._generation
+
+    def cancel(self):
+        # 대기 중/실행 중인 작업의 결과를 모두 버립니다.
+        with self._cond:
+            self._generation += 1
+            self._pending = None
+            self._result = None
+
+    @property
+    def busy(self):
+        with self._cond:
+            return self._running or self._pending is not None or self._result is not None
+
+    def poll(self):
+        # 메인 스레드에서 호출합니다. 최신 작업의 결과가 준비되었으면 (결과, 예외) 를 반환합니다.
+        with self._cond:
+            result, self._result = self._result, None
+        if result is None or result[0] != self._generation:
+            return None
+        return result[1], result[2]
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._pending = None
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._pending is None and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                generation, job = self._pending
+                self._pending = None
+                self._running = True
+
+            def is_cancelled():
+                return generation != self._generation or self._closed
+
+            result, error = None, None
+            try:
+                result = job(is_cancelled)
+            except PreviewCancelled:
+                pass
+            except Exception as e:
+                error = e
+
+            with self._cond:
+                self._running = False
+                if not is_cancelled():
+                    self._result = (generation, result, error)
@@ -0,0 +1,167 @@
+# 렌더링 결과 캐시 (디스크)
+# 문서 데이터, 색상, 글꼴, 템플릿 버전을 정규화한 JSON 의 해시를 키로 PDF 를 보관합니다.
+# 같은 문서를 다시 만들거나 일괄 생성을 다시 실행하면 바뀐 문서만 새로 렌더링합니다.
+# PDF 파일은 cache/renders/<키 앞 두 글자>/<키>.pdf 에, 크기/해시/마지막 사용 시각은 SQLite 색인에 둡니다.
+# 읽을 때 크기와 sha256 을 확인하여 손상된 항목은 버리고, 전체 크기가 max_bytes 를 넘으면
+# 가장 오래 쓰지 않은 항목부터 지웁니다. 전체 크기는 트리거가 totals 표에 누적하므로 저장할 때마다
+# 색인 전체를 합산하지 않습니다. 여러 프로세스(일괄 생성 작업자)가 함께 사용할 수 있습니다.
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import render_engine
+from line_items import LineItems
+
+RENDER_CACHE_DIR = os.path.join(render_engine.CACHE_DIR, "renders")
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024 # 256MB
+
+
+def _canonical(value):
+    # json.dumps 가 직접 다루지 못하는 값(품목 열)을 정규화합니다.
+    if isinstance(value, LineItems):
+        return {
+            "scale": value.scale,
+            "names": value.names,
+            "quantities": value.quantities.tolist(),
+            "unit_prices": value.unit_prices.tolist(),
+            "amounts": value.amounts.tolist()
+        }
+    raise TypeError(f"cannot hash {type(value).__name__} in document data")
+
+
+def document_key(data, fonts=None):
+    payload = {
+        "template": render_engine.TEMPLATE_VERSION,
+        "fonts": render_engine.font_fingerprint(fonts),
+        "data": data
+    }
+    text = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=_canonical)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class RenderCache:
+    def __init__(self, directory=RENDER_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock() # GUI 에서는 메인 스레드와 미리보기 작업자가 함께 사용
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(os.path.join(directory, "index.db"), timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("BEGIN IMMEDIATE") # 여러 작업자가 동시에 처음 열어도 표/트리거를 한 번만 만들도록
+        try:
+            self._conn.execute("CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, size INTEGER NOT NULL, sha256 TEXT NOT NULL, last_used REAL NOT NULL)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used)")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS totals (id INTEGER PRIMARY KEY CHECK (id = 0), bytes INTEGER NOT NULL)")
+            self._conn.execute("INSERT OR IGNORE INTO totals (id, bytes) SELECT 0, COALESCE(SUM(size), 0) FROM entries")
+            self._conn.execute("CREATE TRIGGER IF NOT EXISTS entries_added AFTER INSERT ON entries BEGIN UPDATE totals SET bytes = bytes + NEW.size WHERE id = 0; END")
+            self._conn.execute("CREATE TRIGGER IF NOT EXISTS entries_removed AFTER DELETE ON entries BEGIN UPDATE totals SET bytes = bytes - OLD.size WHERE id = 0; END")
+            self._conn.execute("CREATE TRIGGER IF NOT EXISTS entries_resized AFTER UPDATE OF size ON entries BEGIN UPDATE totals SET bytes = bytes + NEW.size - OLD.size WHERE id = 0; END")
+            self._conn.commit()
+        except BaseException:
+            self._conn.rollback()
+            raise
+
+    def get(self, key):
+        # 캐시된 PDF 바이트. 없거나 손상되었으면 None.
+        with self._lock:
+            row = self._conn.execute("SELECT size, sha256 FROM entries WHERE key = ?", (key,)).fetchone()
+        data = None
+        if row:
+            try:
+                with open(self._path(key), "rb") as f:
+                    data = f.read()
+            except OSError:
+                pass
+            if data is not None and (len(data) != row[0] or hashlib.sha256(data).hexdigest() != row[1]):
+                print(f"DEBUG: Discarding corrupt render cache entry {key}")
+                data = None
+            if data is None:
+                self._discard(key)
+        with self._lock:
+            if data is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            with self._conn:
+                self._conn.execute("UPDATE entries SET last_used = ? WHERE key = ?", (time.time(), key))
+        return data
+
+    def put(self, key, data):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(temp_path, "wb") as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        except BaseException:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO entries (key, size, sha256, last_used) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET size = excluded.size, sha256 = excluded.sha256, last_used = excluded.last_used",
+                (key, len(data), hashlib.sha256(data).hexdigest(), time.time())
+            )
+            self._evict()
+
+    def render(self, data, fonts=None):
+        # 캐시에 있으면 그대로, 없으면 렌더링하여 저장한 뒤 PDF 바이트를 돌려줍니다.
+        key = document_key(data, fonts)
+        pdf_bytes = self.get(key)
+        if pdf_bytes is None:
+            pdf_bytes = render_engine.render_pdf(data, fonts)
+            try:
+                self.put(key, pdf_bytes)
+            except (OSError, sqlite3.Error) as e:
+                print(f"DEBUG: Error writing render cache: {e}") # 캐시에 쓰지 못해도 결과는 그대로 사용
+        return pdf_bytes
+
+    def total_bytes(self):
+        with self._lock:
+            return self._total_bytes()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], f"{key}.pdf")
+
+    def _discard(self, key):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def _total_bytes(self):
+        return self._conn.execute("SELECT bytes FROM totals WHERE id = 0").fetchone()[0]
+
+    def _evict(self):
+        # self._lock 과 트랜잭션 안에서 호출합니다.
+        total = self._total_bytes()
+        if total <= self.max_bytes:
+            return
+        evicted = []
+        for key, size in self._conn.execute("SELECT key, size FROM entries ORDER BY last_used"):
+            if total <= self.max_bytes:
+                break
+            evicted.append(key)
+            total -= size
+        self._conn.executemany("DELETE FROM entries WHERE key = ?", [(key,) for key in evicted])
+        for key in evicted:
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
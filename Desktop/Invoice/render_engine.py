@@ -0,0 +1,516 @@
+# PDF 렌더링 엔진
+# Tk 상태와 무관하게 순수 데이터(dict)만 받아서 청구서/견적서 PDF를 만듭니다.
+# GUI, 배치 작업, 서비스가 모두 이 모듈을 통해 PDF를 생성합니다.
+import io
+import os
+import pickle
+import sys
+import threading
+from weakref import WeakKeyDictionary
+
+import reportlab
+from reportlab import rl_config
+from reportlab.pdfgen import canvas
+from reportlab.pdfbase.ttfonts import TTFont, TTFontFace, TTEncoding
+from reportlab.pdfbase import pdfmetrics
+from reportlab.lib.pagesizes import A4
+from reportlab.lib import colors
+
+from i18n import I18N
+from line_items import format_money
+
+FONT_FILE = os.path.join("fonts", "malgun.ttf")
+FALLBACK_FONTS = ("Helvetica", "Helvetica-Bold")
+CACHE_DIR = "cache" # 프로그램이 만드는 캐시 파일 위치
+TEMPLATE_VERSION = 1 # 페이지 배치나 그리는 방식을 바꾸면 올립니다 (렌더 캐시 키에 포함)
+
+_registered_fonts = None # 프로세스 단위로 한 번만 등록
+_font_lock = threading.Lock() # GUI 에서는 메인 스레드와 미리보기 작업자가 동시에 호출할 수 있음
+
+
+def resource_path(relative_path):
+    try:
+        base_path = sys._MEIPASS
+    except Exception:
+        base_path = os.path.abspath(".")
+    return os.path.join(base_path, relative_path)
+
+
+class SharedFaceTTFont(TTFont):
+    # 이미 파싱된 글꼴(face)을 그대로 사용하는 TTFont.
+    # TTFont() 는 만들 때마다 글꼴 파일 전체를 파싱하므로, 같은 파일을 기본/굵은 글꼴 이름으로
+    # 두 번 등록하면 파싱도 두 번 일어납니다. 문서별 서브셋 상태(state)는 이름마다 따로 둡니다.
+    def __init__(self, name, face):
+        self.fontName = name
+        self.face = face
+        self.encoding = TTEncoding()
+        self.state = WeakKeyDictionary()
+        self._asciiReadable = rl_config.ttfAsciiReadable
+        self.shapable = True
+
+
+def _font_cache_path(font_path):
+    stat = os.stat(font_path)
+    cache_name = f"{os.path.basename(font_path)}-{stat.st_size}-{int(stat.st_mtime)}-rl{reportlab.Version}.face"
+    return os.path.join(CACHE_DIR, cache_name)
+
+
+def _load_font_face(font_path):
+    # 파싱된 글꼴 정보를 디스크에 캐시해 두고, 다음 실행이나 작업자 프로세스에서는 파싱을 건너뜁니다.
+    cache_path = _font_cache_path(font_path)
+    try:
+        with open(cache_path, "rb") as f:
+            state = pickle.load(f)
+        face = TTFontFace.__new__(TTFontFace)
+        face.__dict__.update(state)
+        units_per_em = face.unitsPerEm
+        face._pdfScale = (lambda x: x) if units_per_em == 1000 else (lambda x: x * (1000 / units_per_em))
+        return face
+    except Exception:
+        pass # 캐시가 없거나 손상된 경우 글꼴 파일을 직접 파싱
+
+    face = TTFontFace(font_path)
+    state = dict(face.__dict__)
+    state.pop("_pdfScale", None) # 람다는 저장할 수 없으므로 불러올 때 다시 만듭니다
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        temp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(temp_path, "wb") as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, cache_path)
+    except Exception:
+        pass # 캐시를 쓰지 못해도 렌더링에는 지장 없음
+    return face
+
+
+def register_fonts():
+    # (기본 글꼴, 굵은 글꼴) 이름을 반환합니다. 맑은 고딕이 없으면 Helvetica로 대체합니다.
+    # 글꼴은 프로세스마다 한 번만 파싱하여 기본/굵은 글꼴 이름이 함께 사용합니다.
+    global _registered_fonts
+    with _font_lock:
+        if _registered_fonts is None:
+            font_path = resource_path(FONT_FILE)
+            if os.path.exists(font_path):
+                face = _load_font_face(font_path)
+                pdfmetrics.registerFont(SharedFaceTTFont('MalgunGothic', face))
+                pdfmetrics.registerFont(SharedFaceTTFont('MalgunGothic-Bold', face))
+                pdfmetrics.registerFontFamily('MalgunGothic', normal='MalgunGothic', bold='MalgunGothic-Bold')
+                _registered_fonts = ('MalgunGothic', 'MalgunGothic-Bold')
+            else:
+                _registered_fonts = FALLBACK_FONTS
+        return _registered_fonts
+
+
+def fonts_available():
+    return register_fonts() != FALLBACK_FONTS
+
+
+def font_fingerprint(fonts=None):
+    # 렌더 캐시 키에 넣는 글꼴 식별값: 글꼴 이름, 글꼴 파일 크기/수정 시각, reportlab 버전
+    fonts = fonts or register_fonts()
+    fingerprint = f"{','.join(fonts)}:rl{reportlab.Version}"
+    font_path = resource_path(FONT_FILE)
+    if fonts != FALLBACK_FONTS and os.path.exists(font_path):
+        stat = os.stat(font_path)
+        fingerprint += f":{stat.st_size}:{int(stat.st_mtime)}"
+    return fingerprint
+
+
+# --- 페이지 배치 ---
+CONTINUATION_TABLE_TOP = A4[1] - 100 # 두 번째 페이지부터 품목 테이블 머리글 위치
+TABLE_BOTTOM = 45 # 품목 행이 내려갈 수 있는 가장 낮은 위치 (하단 줄 위)
+SUMMARY_HEIGHT = {"ko": 80, "en": 60} # 합계 영역 높이 (영문은 수수료 안내 포함)
+FOOTER_BLOCK_TOP = {"ko": 170, "en": 185} # 계좌 정보와 하단 문구가 시작되는 높이
+CONTENT_X_START = 50 # 일관된 내용 영역 정의
+CONTENT_WIDTH = A4[0] - (CONTENT_X_START * 2) # 양쪽 50pt 여백
+COL_WIDTHS = (285, 70, 70, 70) # Adjusted to sum to 512 (content_width)
+SUPPLIER_BLOCK_TOP = A4[1] - 80 - 70 - 20 # 문서 정보 상자 아래 (공급자/고객 제목 위치)
+
+
+# --- 고정 영역 (폼 XObject) ---
+# 머리글 띠, 품목 표 머리글, 공급자 정보, 계좌 정보/하단 문구, 하단 줄은 (언어, 문서 종류, 색상,
+# 공급자) 가 같으면 모양이 같습니다. 문서마다 폼 XObject 로 한 번 정의하고 페이지에서는 참조만 합니다.
+# reportlab 의 TTF 서브셋 인코딩은 문서마다 다르므로 PDF 바이트는 문서 사이에 재사용할 수 없습니다.
+# 대신 그리기 명령 목록을 한 번만 만들어 캐시하고, 다음 문서에서는 목록을 그대로 재생합니다.
+class _OpRecorder:
+    # 캔버스 메서드 호출을 (이름, 위치 인자, 키워드 인자) 목록으로 기록합니다.
+    def __init__(self):
+        self.ops = []
+
+    def __getattr__(self, name):
+        def record(*args, **kwargs):
+            self.ops.append((name, args, kwargs))
+        return record
+
+
+def _header_band_ops(c, style):
+    c.setFillColor(style["primary_color"])
+    c.rect(CONTENT_X_START, A4[1] - 60, CONTENT_WIDTH, 60, fill=1, stroke=0) # 높이 60으로 조정
+    c.setFont(style["font_bold"], 32)
+    c.setFillColor(style["invoice_title_color"]) # 텍스트 색상을 청구서 제목 색상으로 변경
+    c.drawString(CONTENT_X_START + 20, A4[1] - 45, style["doc_type_text"])
+
+
+def _table_header_ops(c, style, y_pos_item_table=0):
+    t = I18N[style["lang"]]
+    c.setFillColor(style["primary_color"])
+    c.rect(CONTENT_X_START, y_pos_item_table - 5, CONTENT_WIDTH, 20, fill=1, stroke=0) # 높이 20으로 조정
+    c.setFont(style["font_bold"], 10)
+    c.setFillColor(style["light_text_color"])
+
+    # 헤더 중앙 정렬
+    current_x = CONTENT_X_START
+    for width, header in zip(COL_WIDTHS, (t["item"], t["quantity"], t["unit_price"], t["amount"])):
+        c.drawCentredString(current_x + width / 2, y_pos_item_table, header)
+        current_x += width
+
+
+def _supplier_block_ops(c, style):
+    lang, supplier, font, font_bold = style["lang"], style["supplier"], style["font"], style["font_bold"]
+    t = I18N[lang]
+    y_pos_supplier_customer_start = SUPPLIER_BLOCK_TOP
+    c.setFont(font_bold, 12)
+    c.setFillColor(style["text_color"])
+    c.drawString(CONTENT_X_START, y_pos_supplier_customer_start, t["from"])
+    c.drawString(CONTENT_X_START + CONTENT_WIDTH / 2, y_pos_supplier_customer_start, t["to"])
+
+    c.setStrokeColor(style["border_color"])
+    c.line(CONTENT_X_START, y_pos_supplier_customer_start - 10, CONTENT_X_START + CONTENT_WIDTH / 2 - 20, y_pos_supplier_customer_start - 10)
+    c.line(CONTENT_X_START + CONTENT_WIDTH / 2, y_pos_supplier_customer_start - 10, CONTENT_X_START + CONTENT_WIDTH, y_pos_supplier_customer_start - 10)
+
+    y_pos_supplier_customer_content_start = y_pos_supplier_customer_start - 30
+    c.setFont(font, 10)
+    # 공급자 정보
+    c.drawString(CONTENT_X_START, y_pos_supplier_customer_content_start, supplier['name'])
+    c.setFont(font, 9)
+    c.setFillColor(colors.gray)
+    c.drawString(CONTENT_X_START, y_pos_supplier_customer_content_start - 15, f"{t['reg_num']} {supplier['reg_num']}")
+    if lang == 'en':
+        c.drawString(CONTENT_X_START, y_pos_supplier_customer_content_start - 30, supplier['address'][0])
+        c.drawString(CONTENT_X_START, y_pos_supplier_customer_content_start - 45, supplier['address'][1])
+        c.drawString(CONTENT_X_START, y_pos_supplier_customer_content_start - 60, f"{t['phone']} {supplier['phone']}")
+        c.drawString(CONTENT_X_START, y_pos_supplier_customer_content_start - 75, f"{t['email']} {supplier['email']}")
+    else:
+        c.drawString(CONTENT_X_START, y_pos_supplier_customer_content_start - 30, supplier['address'])
+        c.drawString(CONTENT_X_START, y_pos_supplier_customer_content_start - 45, f"{t['phone']} {supplier['phone']}")
+        c.drawString(CONTENT_X_START, y_pos_supplier_customer_content_start - 60, f"{t['email']} {supplier['email']}")
+
+
+def _footer_ops(c, style):
+    lang, font, font_bold = style["lang"], style["font"], style["font_bold"]
+    t = I18N[lang]
+    # --- 8. 하단 중앙 문구 ---
+    c.setFont(font, 9)
+    c.setFillColor(style["text_color"])
+    if lang == 'ko':
+        footer_text = "궁금한 점 있으시면 편하게 연락해주세요."
+        footer_y_pos = 110 # Above bank info for Korean
+    else:
+        footer_text = "Please feel free to contact us if you have any questions."
+        footer_y_pos = 170 # Above bank info for English
+    c.drawRightString(CONTENT_X_START + CONTENT_WIDTH - 10, footer_y_pos, footer_text) # Adjusted Y position and right-aligned
+
+    # --- 6. 하단 정보 (계좌) ---
+    # Move bank info to the bottom of the page
+    if lang == 'ko':
+        y_pos_bank_info_start = 150 # Adjusted for Korean
+    else: # lang == 'en'
+        y_pos_bank_info_start = 160 # Adjusted for English (more lines)
+
+    c.setFont(font_bold, 12) # 글꼴 크기 키우고 볼드 처리
+    c.setFillColor(style["text_color"])
+    c.drawString(CONTENT_X_START, y_pos_bank_info_start, t["bank_info"])
+    c.setStrokeColor(style["border_color"])
+    c.line(CONTENT_X_START, y_pos_bank_info_start - 10, CONTENT_X_START + CONTENT_WIDTH / 2 - 20, y_pos_bank_info_start - 10)
+    y_pos_bank_info_start -= 25
+    c.setFont(font, 9)
+    if lang == 'ko':
+        c.drawString(CONTENT_X_START, y_pos_bank_info_start, "은행명: 국민은행")
+        c.drawString(CONTENT_X_START, y_pos_bank_info_start - 15, "계좌번호: 823701-04-343660")
+        c.drawString(CONTENT_X_START, y_pos_bank_info_start - 30, "예금주: 주식회사 애드캐리")
+    else:
+        c.drawString(CONTENT_X_START, y_pos_bank_info_start, "Name of Bank Holder: ADCARRY Corp.")
+        c.drawString(CONTENT_X_START, y_pos_bank_info_start - 15, "Bank name: Citibank")
+        c.drawString(CONTENT_X_START, y_pos_bank_info_start - 30, "Account Number: 73380000000193674")
+        c.drawString(CONTENT_X_START, y_pos_bank_info_start - 45, "Routing Number: 031100209")
+        c.drawString(CONTENT_X_START, y_pos_bank_info_start - 60, "Bank Address: 111 Wall Street, New york, New York 10043, United States")
+
+
+def _page_frame_ops(c, style):
+    # 모든 페이지의 머리글 띠와 하단 줄
+    _header_band_ops(c, style)
+    c.setStrokeColor(style["primary_color"])
+    c.setLineWidth(2) # 두꺼운 줄
+    c.line(CONTENT_X_START, 30, CONTENT_X_START + CONTENT_WIDTH, 30) # 페이지 하단에 줄 추가
+
+
+def _continued_page_ops(c, style):
+    # 품목 표가 이어지는 페이지: 머리글 띠, 하단 줄, 품목 표 머리글을 폼 하나로
+    _page_frame_ops(c, style)
+    _table_header_ops(c, style, CONTINUATION_TABLE_TOP)
+
+
+# 폼 하나마다 PDF 객체와 페이지 리소스 항목이 늘어나므로, 처음 나올 때는 명령을 페이지에 바로 그리고
+# 같은 영역이 다시 나올 때(여러 페이지 문서) 폼으로 정의합니다. 이어지는 페이지에 함께 나오는
+# 머리글 띠, 하단 줄, 품목 표 머리글은 폼 하나(ContinuedPage)로 묶습니다.
+STATIC_REGIONS = {
+    "PageFrame": _page_frame_ops,
+    "TableHeader": _table_header_ops,
+    "ContinuedPage": _continued_page_ops,
+    "SupplierBlock": _supplier_block_ops,
+    "FooterBlock": _footer_ops
+}
+_static_ops_cache = {}
+_STATIC_OPS_CACHE_SIZE = 256
+
+
+def _static_region_ops(region, data, fonts):
+    key = (region, data["lang"], data["doc_type_text"], tuple(sorted(data["colors"].items())), repr(data["supplier"]), fonts)
+    ops = _static_ops_cache.get(key)
+    if ops is None:
+        palette = {name: colors.HexColor(value) for name, value in data["colors"].items()}
+        style = dict(palette, lang=data["lang"], doc_type_text=data["doc_type_text"], supplier=data["supplier"], font=fonts[0], font_bold=fonts[1])
+        recorder = _OpRecorder()
+        STATIC_REGIONS[region](recorder, style)
+        ops = tuple(recorder.ops)
+        if len(_static_ops_cache) >= _STATIC_OPS_CACHE_SIZE:
+            _static_ops_cache.clear()
+        _static_ops_cache[key] = ops
+    return ops
+
+
+def draw_static_region(c, region, data, fonts):
+    for name, args, kwargs in _static_region_ops(region, data, fonts):
+        getattr(c, name)(*args, **kwargs)
+
+
+def define_static_form(c, region, data, fonts):
+    # 고정 영역을 폼 XObject 로 정의합니다. beginForm/endForm 이 캔버스 상태를 저장/복원하므로
+    # 페이지를 그리는 중간에 정의해도 됩니다.
+    c.beginForm(region, lowery=-A4[1]) # 아래로 옮겨 배치하는 폼(표 머리글)이 잘리지 않도록
+    draw_static_region(c, region, data, fonts)
+    c.endForm()
+
+
+class PageTotalCanvas(canvas.Canvas):
+    # "Page X/Y" 의 전체 페이지 수(Y)를 save() 시점에 채워 넣는 캔버스.
+    # 각 페이지에는 페이지 번호 폼(XObject)의 참조만 남겨두고, 폼 내용은 save() 에서
+    # 한꺼번에 정의합니다. 따라서 문서를 한 번만 그리면 되고 페이지 수를 세기 위해
+    # PDF를 다시 읽을 필요가 없습니다.
+    def __init__(self, *args, **kwargs):
+        canvas.Canvas.__init__(self, *args, **kwargs)
+        self._page_labels = []
+
+    def draw_page_label(self, x, y, font_name, font_size, fill_color):
+        page_number = self.getPageNumber()
+        form_name = f"PageLabel{page_number}"
+        self._page_labels.append((form_name, page_number, x, y, font_name, font_size, fill_color))
+        self.doForm(form_name)
+
+    def save(self):
+        if len(self._code): self.showPage()
+        total_pages = self.getPageNumber() - 1
+        for form_name, page_number, x, y, font_name, font_size, fill_color in self._page_labels:
+            self.beginForm(form_name)
+            self.setFont(font_name, font_size)
+            self.setFillColor(fill_color)
+            self.drawCentredString(x, y, f"Page {page_number}/{total_pages}")
+            self.endForm()
+        canvas.Canvas.save(self)
+
+
+def draw_pdf(buffer, data, fonts=None):
+    # data 는 build_document() 가 만든 문서 데이터입니다.
+    font, font_bold = fonts or register_fonts()
+    palette = data["colors"]
+    doc_type_text = data["doc_type_text"]
+
+    lang, symbol = data["lang"], I18N[data["lang"]]["currency_symbol"]
+    t = I18N[lang]
+    scale = data["money_scale"]
+
+    def money(minor): # 최소 단위 정수 금액 -> 통화 표기
+        amount = format_money(minor, scale)
+        return f"{amount} {symbol}" if lang == 'ko' else f"{symbol}{amount}"
+    
+    c = PageTotalCanvas(buffer, pagesize=A4)
+    width, height = A4 # A4 사이즈로 변경
+
+    # 일관된 내용 영역 정의
+    content_x_start = CONTENT_X_START
+    content_width = CONTENT_WIDTH
+
+    # --- 새로운 디자인 색상 및 글꼴 설정 ---
+    primary_color = colors.HexColor(palette["primary_color"])
+    secondary_color = colors.HexColor(palette["secondary_color"])
+    text_color = colors.HexColor(palette["text_color"])
+    light_text_color = colors.HexColor(palette["light_text_color"])
+    border_color = colors.HexColor(palette["border_color"])
+
+    col_widths = COL_WIDTHS
+    x_start = content_x_start
+    right_align_x = content_x_start + content_width - 10 # Define the right alignment x-coordinate
+
+    # 고정 영역: 처음에는 바로 그리고, 다시 나오면 폼으로 한 번 정의한 뒤 참조만 합니다.
+    regions_drawn = set()
+    forms_defined = set()
+    def draw_static(region):
+        if region not in regions_drawn:
+            regions_drawn.add(region)
+            c.saveState()
+            draw_static_region(c, region, data, (font, font_bold))
+            c.restoreState()
+            return
+        if region not in forms_defined:
+            define_static_form(c, region, data, (font, font_bold))
+            forms_defined.add(region)
+        c.doForm(region)
+
+    def set_item_row_style():
+        c.setFont(font, 9)
+        c.setFillColor(text_color)
+        c.setStrokeColor(border_color)
+
+    # --- 품목 테이블 머리글 (첫 페이지는 고객 정보 아래, 이어지는 페이지는 ContinuedPage 폼에 포함) ---
+    def draw_table_header(y_pos_item_table):
+        c.saveState()
+        c.translate(0, y_pos_item_table)
+        draw_static("TableHeader")
+        c.restoreState()
+        set_item_row_style()
+        return y_pos_item_table - 30
+
+    # --- 7. 페이지 번호 (모든 페이지) ---
+    def finish_page():
+        c.draw_page_label(content_x_start + content_width / 2, 15, font, 8, colors.gray)
+
+    def next_page(table_header=True):
+        finish_page()
+        c.showPage()
+        if table_header:
+            draw_static("ContinuedPage")
+            set_item_row_style()
+            return CONTINUATION_TABLE_TOP - 30
+        draw_static("PageFrame")
+        return CONTINUATION_TABLE_TOP
+
+    # --- 1. 상단 헤더, 하단 줄 (모든 페이지) ---
+    draw_static("PageFrame")
+
+    # --- 2. 문서 번호, 작성일, 납부기한/유효기간, 발행자 정보 ---
+    y_pos_doc_info_box_top = height - 80 # 조정된 헤더 높이에 맞춰 시작 위치 조정
+    box_height = 70 # Adjusted height for 3 lines of text + padding
+    c.setFillColor(secondary_color)
+    c.rect(content_x_start, y_pos_doc_info_box_top - box_height, content_width, box_height, fill=1, stroke=0) # x, y (bottom-left), width, height
+    
+    y_pos_text_start = y_pos_doc_info_box_top - 15 # Start text slightly below box top
+
+    c.setFont(font_bold, 9)
+    c.setFillColor(text_color)
+    c.drawString(content_x_start + 20, y_pos_text_start, t['doc_num'])
+    c.drawString(content_x_start + 20, y_pos_text_start - 18, t['date'])
+    
+    if data['doc_type'] == 'invoice':
+        c.drawString(content_x_start + 20, y_pos_text_start - 36, t['due_date'])
+    else:
+        c.drawString(content_x_start + 20, y_pos_text_start - 36, t['validity_period'])
+
+    c.drawString(content_x_start + content_width / 2 + 20, y_pos_text_start, t['issuer_info'])
+
+    c.setFont(font, 9)
+    c.drawString(content_x_start + 70, y_pos_text_start, data['doc_number']) # Adjusted X
+    c.drawString(content_x_start + 70, y_pos_text_start - 18, data['doc_date']) # Adjusted X
+    c.drawString(content_x_start + 70, y_pos_text_start - 36, data['due_date']) # This is the calculated due_date/validity_period
+
+    c.drawString(content_x_start + content_width / 2 + 20, y_pos_text_start - 15, f"{data['issuer']['name']} ({data['issuer']['title']})")
+    c.drawString(content_x_start + content_width / 2 + 20, y_pos_text_start - 30, data['issuer']['email'])
+    c.drawString(content_x_start + content_width / 2 + 20, y_pos_text_start - 45, data['issuer']['phone'])
+
+    # --- 3. 공급자 및 고객 정보 ---
+    y_pos_supplier_customer_start = y_pos_doc_info_box_top - box_height - 20 # Gap of 20 points below doc info box
+    draw_static("SupplierBlock") # 공급자/고객 제목, 구분선, 공급자 정보
+    y_pos_supplier_customer_content_start = y_pos_supplier_customer_start - 30
+
+    # 고객 정보
+    y_pos_customer_content_start = y_pos_supplier_customer_start - 30 # Same starting Y as supplier content
+    c.setFont(font, 10)
+    c.setFillColor(text_color)
+    c.drawString(content_x_start + content_width / 2, y_pos_customer_content_start, f"{data['customer']['name']} {t['dear']}")
+    c.setFont(font, 9)
+    c.setFillColor(colors.gray)
+    if lang == 'ko':
+        c.drawString(content_x_start + content_width / 2, y_pos_customer_content_start - 15, f"{t['reg_num']} {data['customer']['reg_num']}")
+        c.drawString(content_x_start + content_width / 2, y_pos_customer_content_start - 30, data['customer']['address'])
+        c.drawString(content_x_start + content_width / 2, y_pos_customer_content_start - 45, f"{t['phone']} {data['customer']['phone']}")
+        c.drawString(content_x_start + content_width / 2, y_pos_customer_content_start - 60, f"{t['email']} {data['customer']['email']}")
+        c.drawString(content_x_start + content_width / 2, y_pos_customer_content_start - 15, data['customer']['address'])
+        c.drawString(content_x_start + content_width / 2, y_pos_customer_content_start - 30, f"{t['phone']} {data['customer']['phone']}")
+        c.drawString(content_x_start + content_width / 2, y_pos_customer_content_start - 45, f"{t['email']} {data['customer']['email']}")
+
+    # --- 4. 품목 테이블 ---
+    # 품목을 한 줄씩 흘려 보내며 배치하고, 페이지가 넘치면 새 페이지에 머리글을 반복합니다.
+    lowest_point_supplier_customer = y_pos_supplier_customer_content_start - 60 # Lowest text point
+    y_pos_item_table = lowest_point_supplier_customer - 50 # 50 points gap below supplier/customer info (increased by 20)
+    y_pos_item_table_content_start = draw_table_header(y_pos_item_table)
+    for name, quantity, unit_price, amount in data["items"]:
+        if y_pos_item_table_content_start - 13 < TABLE_BOTTOM:
+            c.line(x_start, y_pos_item_table_content_start + 12, x_start + content_width, y_pos_item_table_content_start + 12)
+            y_pos_item_table_content_start = next_page()
+
+        c.line(x_start, y_pos_item_table_content_start + 12, x_start + content_width, y_pos_item_table_content_start + 12)
+
+        # 내용 정렬
+        c.drawCentredString(x_start + col_widths[0] / 2, y_pos_item_table_content_start, name) # Center align item name
+        c.drawCentredString(x_start + col_widths[0] + col_widths[1] / 2, y_pos_item_table_content_start, f"{quantity:,}") # Quantity remains centered
+        c.drawRightString(right_align_x - col_widths[3], y_pos_item_table_content_start, money(unit_price))
+        c.drawRightString(right_align_x, y_pos_item_table_content_start, money(amount))
+        y_pos_item_table_content_start -= 25
+    c.line(x_start, y_pos_item_table_content_start + 12, x_start + content_width, y_pos_item_table_content_start + 12)
+
+    # 합계, 계좌 정보, 하단 문구는 마지막 페이지에 둡니다. 공간이 모자라면 새 페이지로 넘깁니다.
+    if y_pos_item_table_content_start - SUMMARY_HEIGHT[lang] < FOOTER_BLOCK_TOP[lang]:
+        y_pos_item_table_content_start = next_page(table_header=False)
+        c.setFillColor(text_color)
+        c.setStrokeColor(border_color)
+
+    # --- 5. 합계 ---
+    y_pos_summary_start = y_pos_item_table_content_start - 10 # Gap below item table
+    total_x_start = content_x_start + content_width / 2 # Align with right half of content area
+    if lang == 'ko':
+        c.setFont(font, 10)
+        c.drawString(total_x_start, y_pos_summary_start, t["supply_amount"])
+        c.drawRightString(content_x_start + content_width - 10, y_pos_summary_start, money(data['supply_amount']))
+        y_pos_summary_start -= 20 # 간격 조정
+        c.drawString(total_x_start, y_pos_summary_start, t["vat"])
+        c.drawRightString(content_x_start + content_width - 10, y_pos_summary_start, money(data['vat']))
+        y_pos_summary_start -= 20 # 간격 조정
+        c.setStrokeColor(border_color)
+        c.line(total_x_start, y_pos_summary_start, content_x_start + content_width, y_pos_summary_start)
+        y_pos_summary_start -= 5
+
+    c.setFillColor(primary_color)
+    c.rect(total_x_start - 20, y_pos_summary_start - 20, content_width / 2 + 20, 30, fill=1, stroke=0) # 높이 30으로 조정
+    c.setFont(font_bold, 12)
+    c.setFillColor(light_text_color)
+    c.drawString(total_x_start, y_pos_summary_start - 10, t["total_amount"])
+    c.drawRightString(content_x_start + content_width - 10, y_pos_summary_start - 10, money(data['total_amount']))
+
+    # --- Bank Fee Note (English only) ---
+    if lang == 'en':
+        fee_note_y_pos = y_pos_summary_start - 40 # Adjust Y position as needed
+        c.setFont(font_bold, 9) # Smaller font for note, but bold
+        c.setFillColor(text_color)
+        c.drawString(content_x_start + content_width / 2, fee_note_y_pos, "All bank fees should be covered by the sender.")
+
+    # --- 8. 하단 중앙 문구, 6. 하단 정보 (계좌) ---
+    draw_static("FooterBlock")
+
+    finish_page()
+    c.save()
+
+
+def render_pdf(data, fonts=None):
+    # 문서 데이터를 받아 PDF 바이트를 반환합니다.
+    buffer = io.BytesIO()
+    draw_pdf(buffer, data, fonts=fonts)
+    return buffer.getvalue()
@@ -0,0 +1,245 @@
+# 로컬 HTTP 렌더링 서비스
+#
+# 사용 예:
+#   python render_service.py                      # http://127.0.0.1:8765
+#   python render_service.py --port 9000 -j 4 --queue 16 --timeout 20
+#
+#   curl -X POST --data @invoice.json http://127.0.0.1:8765/render -o invoice.pdf
+#   curl http://127.0.0.1:8765/health
+#
+# POST /render 는 batch.py 의 JSONL 한 줄과 같은 문서 JSON(GUI 가 만드는 것과 같은 구조)을 받아 PDF 를 돌려줍니다.
+# doc_number 가 없으면 문서 번호 데이터베이스(doc_numbers.db)에서 번호를 받아 X-Doc-Number 헤더로 알려 줍니다.
+# 렌더링은 미리 띄워 둔 작업자 프로세스(글꼴 등록, 렌더 캐시 포함)에서 합니다. 처리 중이거나 기다리는 요청이
+# --queue 개를 넘으면 바로 503 을, --timeout 초 안에 끝나지 않으면 504 를 돌려줍니다.
+# 외부 서비스 없이 이 컴퓨터(127.0.0.1)에서만 요청을 받습니다.
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import quote, urlsplit
+
+import render_engine
+from batch import init_worker, render_job_bytes, load_number_format
+from render_cache import RENDER_CACHE_DIR, DEFAULT_MAX_BYTES
+from doc_numbers import DocNumberAllocator, DOC_NUMBER_DB, DEFAULT_FORMAT, parse_doc_date
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_TIMEOUT = 30 # 요청 하나를 기다리는 최대 시간(초)
+MAX_BODY_BYTES = 8 * 1024 * 1024 # 요청 본문 최대 크기 (품목 수만 개도 충분)
+RETRY_AFTER = 1 # 503 응답의 Retry-After (초)
+
+
+class ServiceBusy(Exception):
+    pass
+
+
+class RenderService:
+    def __init__(self, jobs=None, max_pending=None, timeout=DEFAULT_TIMEOUT, cache_dir=RENDER_CACHE_DIR, cache_bytes=DEFAULT_MAX_BYTES, allocator=None):
+        self.jobs = jobs or os.cpu_count() or 1
+        self.max_pending = max_pending or self.jobs * 4
+        self.timeout = timeout
+        self.cache_dir = cache_dir
+        self.cache_bytes = cache_bytes
+        # allocator 를 주지 않으면 settings.json 의 번호 형식으로 doc_numbers.db 를 열고, close() 에서 닫습니다.
+        # (번호 없이 렌더링하면 현재 시각 번호가 되어 동시 요청끼리 겹치므로 항상 발급합니다.)
+        self._owns_allocator = allocator is None
+        self.allocator = allocator or DocNumberAllocator(DOC_NUMBER_DB, load_number_format())
+        self._slots = threading.BoundedSemaphore(self.max_pending) # 처리 중 + 대기 중인 요청 수 제한
+        self._lock = threading.Lock()
+        self.stats = {"rendered": 0, "failed": 0, "rejected": 0, "timed_out": 0}
+        self.in_flight = 0
+        self._executor = None
+        self._start_pool()
+
+    def _start_pool(self):
+        # 작업자를 미리 띄워 글꼴 등록/캐시 열기를 첫 요청 전에 끝내 둡니다.
+        self._executor = ProcessPoolExecutor(max_workers=self.jobs, initializer=init_worker, initargs=(self.cache_dir, self.cache_bytes))
+        for future in [self._executor.submit(render_engine.fonts_available) for _ in range(self.jobs)]:
+            future.result()
+
+    def _restart_pool(self, broken):
+        # 작업자가 비정상 종료되면(BrokenProcessPool) 새 작업자로 바꿉니다. 여러 요청이 동시에 알아채도 한 번만.
+        with self._lock:
+            if self._executor is not broken:
+                return
+            print("DEBUG: Render worker pool broken, restarting", file=sys.stderr)
+            broken.shutdown(wait=False, cancel_futures=True)
+            self._start_pool()
+
+    def render(self, spec):
+        # (파일 이름, PDF 바이트). 대기열이 가득 차면 ServiceBusy, 시간 안에 끝나지 않으면 TimeoutError.
+        if not self._slots.acquire(blocking=False):
+            self._count("rejected")
+            raise ServiceBusy(f"{self.max_pending} requests already in progress")
+        try:
+            if not spec.get("doc_number"):
+                spec["doc_number"] = self.allocator.allocate(parse_doc_date(spec.get("doc_date")))
+            executor = self._executor
+            try:
+                future = executor.submit(render_job_bytes, spec, False)
+            except BrokenProcessPool: # 이전 요청 처리 중 작업자가 죽은 경우: 새 작업자로 한 번 더
+                self._restart_pool(executor)
+                executor = self._executor
+                future = executor.submit(render_job_bytes, spec, False)
+        except BaseException:
+            self._slots.release()
+            raise
+        with self._lock:
+            self.in_flight += 1
+        # 시간 초과로 응답을 먼저 돌려줘도, 작업자가 실제로 끝날 때까지 자리를 차지한 것으로 셉니다.
+        future.add_done_callback(self._release)
+        try:
+            result = future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            future.cancel() # 아직 시작하지 않았으면 취소
+            self._count("timed_out")
+            raise TimeoutError(f"render did not finish within {self.timeout}s") from None
+        except BrokenProcessPool: # 이 요청을 처리하던 작업자가 죽은 경우
+            self._count("failed")
+            self._restart_pool(executor)
+            raise
+        except Exception:
+            self._count("failed")
+            raise
+        self._count("rendered")
+        return result
+
+    def health(self):
+        with self._lock:
+            return dict(self.stats, status="ok", workers=self.jobs, in_flight=self.in_flight, max_pending=self.max_pending, timeout=self.timeout)
+
+    def close(self):
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        if self._owns_allocator:
+            self.allocator.close()
+
+    def _release(self, future):
+        with self._lock:
+            self.in_flight -= 1
+        self._slots.release()
+
+    def _count(self, name):
+        with self._lock:
+            self.stats[name] += 1
+
+
+class RenderRequestHandler(BaseHTTPRequestHandler):
+    server_version = "InvoiceRender/1.0"
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        if urlsplit(self.path).path != "/health":
+            return self._send_error(HTTPStatus.NOT_FOUND, "not found")
+        self._send_json(HTTPStatus.OK, self.server.service.health())
+
+    def do_POST(self):
+        if urlsplit(self.path).path != "/render":
+            return self._send_error(HTTPStatus.NOT_FOUND, "not found")
+        try:
+            length = int(self.headers.get("Content-Length", ""))
+        except ValueError:
+            return self._send_error(HTTPStatus.LENGTH_REQUIRED, "Content-Length required")
+        if length > MAX_BODY_BYTES:
+            self.close_connection = True # 본문을 읽지 않았으므로 연결을 재사용하지 않음
+            return self._send_error(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, f"request body larger than {MAX_BODY_BYTES} bytes")
+        try:
+            spec = json.loads(self.rfile.read(length))
+        except ValueError as e:
+            return self._send_error(HTTPStatus.BAD_REQUEST, f"invalid JSON: {e}")
+        if not isinstance(spec, dict):
+            return self._send_error(HTTPStatus.BAD_REQUEST, "document must be a JSON object")
+
+        try:
+            file_name, pdf_bytes = self.server.service.render(spec)
+        except ServiceBusy as e:
+            return self._send_error(HTTPStatus.SERVICE_UNAVAILABLE, str(e), {"Retry-After": str(RETRY_AFTER)})
+        except TimeoutError as e:
+            return self._send_error(HTTPStatus.GATEWAY_TIMEOUT, str(e))
+        except BrokenProcessPool as e:
+            return self._send_error(HTTPStatus.SERVICE_UNAVAILABLE, f"render worker stopped: {e}", {"Retry-After": str(RETRY_AFTER)})
+        except (ValueError, KeyError, TypeError) as e: # 문서 데이터 오류 (숫자가 아닌 수량, 없는 언어 등)
+            return self._send_error(HTTPStatus.UNPROCESSABLE_ENTITY, f"{type(e).__name__}: {e}")
+        except Exception as e:
+            print(f"DEBUG: Error rendering document: {e}", file=sys.stderr)
+            return self._send_error(HTTPStatus.INTERNAL_SERVER_ERROR, f"{type(e).__name__}: {e}")
+
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", "application/pdf")
+        self.send_header("Content-Length", str(len(pdf_bytes)))
+        self.send_header("Content-Disposition", f"attachment; filename*=UTF-8''{quote(file_name)}")
+        self.send_header("X-Doc-Number", quote(spec.get("doc_number") or ""))
+        self.end_headers()
+        self.wfile.write(pdf_bytes)
+
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_error(self, status, message, headers=None):
+        self._send_json(status, {"error": message}, headers)
+
+
+class RenderServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, service):
+        self.service = service
+        super().__init__(address, RenderRequestHandler)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="문서 JSON 을 받아 청구서/견적서 PDF 를 돌려주는 로컬 HTTP 서비스입니다.")
+    parser.add_argument("--host", default=DEFAULT_HOST, help=f"받을 주소 (기본값: {DEFAULT_HOST})")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"포트 (기본값: {DEFAULT_PORT})")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="작업자 프로세스 수 (기본값: CPU 코어 수)")
+    parser.add_argument("--queue", type=int, default=None, help="처리 중 + 대기 중인 요청 최대 수, 넘으면 503 (기본값: 작업자 수 x 4)")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help=f"요청 하나의 최대 처리 시간(초), 넘으면 504 (기본값: {DEFAULT_TIMEOUT})")
+    parser.add_argument("--cache-dir", default=RENDER_CACHE_DIR, help=f"렌더 캐시 폴더 (기본값: {RENDER_CACHE_DIR})")
+    parser.add_argument("--cache-size", type=int, default=DEFAULT_MAX_BYTES // (1024 * 1024), help="렌더 캐시 최대 크기 MB (기본값: %(default)s)")
+    parser.add_argument("--no-cache", action="store_true", help="렌더 캐시를 사용하지 않음")
+    parser.add_argument("--number-db", default=DOC_NUMBER_DB, help=f"문서 번호 데이터베이스 (기본값: {DOC_NUMBER_DB})")
+    parser.add_argument("--number-format", default=None, help="문서 번호 형식 (기본값: settings.json 의 doc_number_format 또는 " + DEFAULT_FORMAT.replace("%", "%%") + ")")
+    args = parser.parse_args(argv)
+
+    if not render_engine.fonts_available():
+        print("Font Warning: Malgun Gothic font not found. PDF text may not display correctly.", file=sys.stderr)
+
+    try:
+        allocator = DocNumberAllocator(args.number_db, args.number_format or load_number_format())
+    except ValueError as e:
+        parser.error(str(e))
+    service = RenderService(
+        args.jobs, args.queue, args.timeout,
+        cache_dir=None if args.no_cache else args.cache_dir, cache_bytes=args.cache_size * 1024 * 1024, allocator=allocator
+    )
+    try:
+        server = RenderServer((args.host, args.port), service)
+        print(f"Listening on http://{args.host}:{server.server_address[1]} ({service.jobs} workers, queue {service.max_pending}, timeout {service.timeout}s)")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+    finally:
+        service.close()
+        allocator.close()
+    return 0
+
+
+if __name__ == '__main__':
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -0,0 +1,108 @@
+# 프리셋 검색용 접두어 색인
+# (토큰, 키) 를 정렬된 리스트로 보관하고 bisect 로 접두어 범위를 찾습니다.
+# 처음 한 번 만들고, 프리셋을 추가/삭제할 때는 해당 키의 토큰만 넣고 뺍니다.
+import heapq
+import re
+from bisect import bisect_left, bisect_right
+
+MAX_RESULTS = 100 # 콤보박스 목록에 표시할 최대 개수
+
+_WORD_SPLIT = re.compile(r"[\s,()/]+")
+_NON_DIGITS = re.compile(r"\D+")
+
+
+def tokenize(text):
+    # "삼성전자 주식회사" -> 전체 문자열과 단어별 토큰, "123-45-67890" -> 숫자만 남긴 토큰도 추가,
+    # "kim@example.com" -> 전체 주소와 @ 앞/뒤 부분
+    text = str(text or "").strip().lower()
+    if not text:
+        return set()
+    tokens = {text}
+    tokens.update(word for word in _WORD_SPLIT.split(text) if word)
+    digits = _NON_DIGITS.sub("", text)
+    if digits:
+        tokens.add(digits)
+    if "@" in text:
+        tokens.update(part for part in text.split("@") if part)
+    return tokens
+
+
+class PrefixIndex:
+    # 토큰 리스트와 같은 위치의 키 번호 리스트를 함께 유지합니다.
+    # 접두어 범위는 bisect 두 번으로 찾고, 해당 구간을 잘라 한 번에 집합으로 만듭니다.
+    def __init__(self):
+        self._tokens = [] # 정렬된 토큰
+        self._ids = [] # 각 토큰이 속한 키 번호 (추가된 순서이므로 검색 결과 정렬에 사용)
+        self._tokens_by_key = {}
+        self._id_by_key = {}
+        self._key_by_id = {}
+        self._next_id = 0
+
+    def build(self, records):
+        # records: (키, 검색할 문자열 목록) 반복자
+        self.__init__()
+        entries = []
+        for key, texts in records:
+            key_id = self._register(key, texts)
+            entries.extend((token, key_id) for token in self._tokens_by_key[key])
+        entries.sort()
+        self._tokens = [token for token, _ in entries]
+        self._ids = [key_id for _, key_id in entries]
+
+    def add(self, key, texts):
+        if key in self._tokens_by_key:
+            self._remove_tokens(key)
+        key_id = self._register(key, texts)
+        for token in self._tokens_by_key[key]:
+            i = bisect_left(self._tokens, token)
+            self._tokens.insert(i, token)
+            self._ids.insert(i, key_id)
+
+    def remove(self, key):
+        self._remove_tokens(key)
+        key_id = self._id_by_key.pop(key, None)
+        self._key_by_id.pop(key_id, None)
+
+    def search(self, query, limit=MAX_RESULTS):
+        # 공백으로 나눈 모든 단어가 어떤 토큰의 접두어이면 일치 (AND 검색)
+        words = [word for word in _WORD_SPLIT.split(str(query).strip().lower()) if word]
+        if not words:
+            ids = self._key_by_id.keys()
+        else:
+            ids = None
+            for word in sorted(words, key=len, reverse=True): # 긴 단어가 후보를 더 빨리 줄임
+                lo = bisect_left(self._tokens, word)
+                hi = bisect_left(self._tokens, word + "\U0010ffff", lo)
+                matched = set(self._ids[lo:hi])
+                ids = matched if ids is None else ids & matched
+                if not ids:
+                    return []
+        if limit is None or len(ids) <= limit:
+            ids = sorted(ids)
+        else:
+            ids = heapq.nsmallest(limit, ids)
+        return [self._key_by_id[key_id] for key_id in ids]
+
+    def __len__(self):
+        return len(self._tokens_by_key)
+
+    def _register(self, key, texts):
+        tokens = set()
+        for text in texts:
+            tokens |= tokenize(text)
+        self._tokens_by_key[key] = tokens
+        key_id = self._id_by_key.get(key) # 다시 추가된 키는 목록에서의 순서를 유지
+        if key_id is None:
+            key_id = self._id_by_key[key] = self._next_id
+            self._key_by_id[key_id] = key
+            self._next_id += 1
+        return key_id
+
+    def _remove_tokens(self, key):
+        key_id = self._id_by_key.get(key)
+        for token in self._tokens_by_key.pop(key, ()):
+            lo = bisect_left(self._tokens, token)
+            hi = bisect_right(self._tokens, token, lo)
+            i = self._ids.index(key_id, lo, hi)
+            del self._tokens[i]
+            del self._ids[i]
@@ -0,0 +1,39 @@
+# asyncio 렌더링 API 테스트: 번호가 없는 문서를 동시에 렌더링해도 문서 번호가 겹치지 않는지 확인합니다.
+import asyncio
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from async_render import AsyncRenderer
+from doc_numbers import DocNumberAllocator
+
+DOCUMENT_COUNT = 8
+
+
+class ConcurrentDocNumberTest(unittest.TestCase):
+    def test_concurrent_renders_get_distinct_numbers(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            allocator = DocNumberAllocator(os.path.join(temp_dir, "doc_numbers.db"))
+            spec = {"customer": {"name": "Same"}, "items": [{"name": "Item", "quantity": "1", "unit_price": "100"}]}
+
+            async def render_all():
+                async with AsyncRenderer(max_concurrency=4, cache_dir=None, allocator=allocator) as renderer:
+                    return await asyncio.gather(*[renderer.render(spec) for _ in range(DOCUMENT_COUNT)])
+
+            try:
+                results = asyncio.run(render_all())
+            finally:
+                allocator.close()
+            file_names = [file_name for file_name, _ in results]
+            # 파일 이름은 "<문서 번호>_<고객 이름>.pdf" 이므로 번호가 다르면 이름도 모두 다릅니다.
+            self.assertEqual(len(set(file_names)), DOCUMENT_COUNT)
+            self.assertNotIn("doc_number", spec) # 호출한 쪽의 문서 데이터는 바꾸지 않음
+            for _, pdf_bytes in results:
+                self.assertTrue(pdf_bytes.startswith(b"%PDF"))
+
+
+if __name__ == '__main__':
+    unittest.main()
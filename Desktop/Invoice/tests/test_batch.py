@@ -0,0 +1,77 @@
+# 일괄 생성 테스트: 고객 이름/파일 이름에 경로 문자가 있어도 출력이 출력 폴더(ZIP) 밖으로 나가지 않는지 확인합니다.
+# 실행: python -m unittest discover -s tests (Desktop/Invoice 에서)
+import io
+import json
+import os
+import sys
+import tempfile
+import unittest
+import zipfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import batch
+from batch_output import ZipSink
+from invoice_data import make_file_name
+
+UNSAFE_SPECS = [
+    {"doc_number": "N1", "customer": {"name": "A/S 센터"}},
+    {"doc_number": "N2", "customer": {"name": "../../up"}},
+    {"doc_number": "N3", "customer": {"name": "B"}, "file_name": "../../escaped"},
+    {"doc_number": "N4", "customer": {"name": "C"}, "file_name": "sub/dir\\name"},
+    {"doc_number": "N5", "customer": {"name": ".."}, "file_name": ".."},
+]
+
+
+class UnsafeFileNameTest(unittest.TestCase):
+    def setUp(self):
+        self._temp = tempfile.TemporaryDirectory()
+        self.root = self._temp.name
+        self.input_path = os.path.join(self.root, "in.jsonl")
+        with open(self.input_path, "w", encoding="utf-8") as f:
+            for spec in UNSAFE_SPECS:
+                spec = dict(spec, items=[{"name": "Item", "quantity": "1", "unit_price": "100"}])
+                f.write(json.dumps(spec, ensure_ascii=False) + "\n")
+
+    def tearDown(self):
+        self._temp.cleanup()
+
+    def run_batch(self, output_dir, sink=None):
+        return batch.run_batch(self.input_path, output_dir, jobs=1, log=io.StringIO(), sink=sink, cache_dir=None)
+
+    def test_make_file_name_strips_path_parts(self):
+        for base in ("../../escaped", "a/b", "a\\b", "..", "/abs"):
+            file_name = make_file_name("X", "Invoice", base, add_date_prefix=False)
+            self.assertEqual(file_name, os.path.basename(file_name))
+            self.assertNotIn("..", file_name)
+            self.assertNotIn("\\", file_name)
+
+    def test_files_stay_in_output_dir(self):
+        output_dir = os.path.join(self.root, "out")
+        succeeded, failures = self.run_batch(output_dir)
+        self.assertEqual(failures, [])
+        self.assertEqual(succeeded, len(UNSAFE_SPECS))
+        written = []
+        for dir_path, _, file_names in os.walk(self.root):
+            written += [os.path.join(dir_path, name) for name in file_names if name.endswith(".pdf")]
+        self.assertEqual(len(written), len(UNSAFE_SPECS))
+        for path in written:
+            self.assertEqual(os.path.dirname(path), output_dir)
+
+    def test_zip_entries_stay_in_archive(self):
+        zip_path = os.path.join(self.root, "out.zip")
+        with ZipSink(zip_path) as sink:
+            succeeded, failures = self.run_batch(None, sink)
+        self.assertEqual(failures, [])
+        self.assertEqual(succeeded, len(UNSAFE_SPECS))
+        with zipfile.ZipFile(zip_path) as archive:
+            names = archive.namelist()
+        self.assertEqual(len(names), len(UNSAFE_SPECS))
+        for name in names:
+            self.assertNotIn("/", name)
+            self.assertNotIn("\\", name)
+            self.assertFalse(name.startswith("."))
+
+
+if __name__ == '__main__':
+    unittest.main()
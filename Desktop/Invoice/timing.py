@@ -0,0 +1,81 @@
+# 구간 시간 측정
+# 미리보기 단계(모델 스냅숏, reportlab 그리기, fitz.open, get_pixmap, Image.frombytes, 크기 조절,
+# PhotoImage 생성 등)의 소요 시간을 기록합니다. 작업자 스레드와 메인 스레드에서 함께 사용하며,
+# 단계마다 최근 window 개의 측정값으로 백분위(p50/p90/p99)를 계산합니다.
+import json
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from datetime import datetime
+
+ROLLING_WINDOW = 200 # 단계마다 보관하는 최근 측정값 수
+PERCENTILES = (50, 90, 99)
+
+
+def percentile(sorted_values, p):
+    # 정렬된 값 목록에서 nearest-rank 백분위
+    if not sorted_values:
+        return None
+    rank = max(1, -(-len(sorted_values) * p // 100)) # ceil(n * p / 100)
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class SpanTimer:
+    def __init__(self, window=ROLLING_WINDOW):
+        self.window = window
+        self._lock = threading.Lock()
+        self._samples = OrderedDict() # 단계 이름 -> 최근 측정값(초) deque, 처음 기록된 순서 유지
+        self._counts = {} # 단계 이름 -> 전체 측정 횟수
+
+    @contextmanager
+    def span(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def record(self, name, seconds):
+        with self._lock:
+            samples = self._samples.get(name)
+            if samples is None:
+                samples = self._samples[name] = deque(maxlen=self.window)
+            samples.append(seconds)
+            self._counts[name] = self._counts.get(name, 0) + 1
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+            self._counts.clear()
+
+    def stats(self):
+        # 단계 이름 -> {"count", "last_ms", "p50_ms", "p90_ms", "p99_ms", "max_ms"} (밀리초)
+        with self._lock:
+            snapshot = [(name, list(samples), self._counts[name]) for name, samples in self._samples.items()]
+        stats = OrderedDict()
+        for name, samples, count in snapshot:
+            ordered = sorted(samples)
+            stage = {"count": count, "last_ms": samples[-1] * 1000}
+            for p in PERCENTILES:
+                stage[f"p{p}_ms"] = percentile(ordered, p) * 1000
+            stage["max_ms"] = ordered[-1] * 1000
+            stats[name] = stage
+        return stats
+
+    def format_lines(self):
+        # 화면 표시용 표 (단계, 마지막, p50, p90, p99, 측정 수)
+        lines = [f"{'stage':<16}{'last':>8}{'p50':>8}{'p90':>8}{'p99':>8}{'n':>6}"]
+        for name, stage in self.stats().items():
+            lines.append(f"{name:<16}{stage['last_ms']:8.1f}{stage['p50_ms']:8.1f}{stage['p90_ms']:8.1f}{stage['p99_ms']:8.1f}{stage['count']:6d}")
+        return lines
+
+    def dump(self, path):
+        # 현재 통계를 로그 파일에 JSON 한 줄로 덧붙입니다.
+        stats = self.stats()
+        if not stats:
+            return False
+        record = {"time": datetime.now().isoformat(timespec="seconds"), "window": self.window, "stages": stats}
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+        return True